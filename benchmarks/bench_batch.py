@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark: batch mode throughput against concurrency.
+
+Runs one instruction over a set of synthetic files, one request per file,
+against the local fake Messages API at increasing concurrency and reports
+files per minute. A final run caps the server's concurrent requests below
+the job's concurrency to exercise the 429 backoff.
+
+Usage:
+    python benchmarks/bench_batch.py --files 32 --latency 0.5
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fake_api_server import FakeAPIServer, use_temporary_cache_dir
+
+use_temporary_cache_dir()
+
+from src.api_client import ClaudeAPIClient
+from src.batch import BatchJob
+from src.models import CodeSegment
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=32)
+    parser.add_argument('--latency', type=float, default=0.5, help="seconds per answer")
+    args = parser.parse_args()
+    
+    segments = [
+        CodeSegment(f"src/module_{i}.py", "backend", f"def function_{i}(value):\n    return value * {i}\n")
+        for i in range(args.files)
+    ]
+    server = FakeAPIServer(tokens=50, inference_delay=args.latency).start()
+    client = ClaudeAPIClient()
+    client.cache = None  # every group must reach the server
+    client.connect("sk-fake", base_url=server.base_url)
+    
+    baseline = None
+    for concurrency in (1, 2, 4, 8):
+        job = BatchJob(client, "Gere docstrings.", concurrency=concurrency)
+        result = job.run(segments)
+        rate = result.files_per_minute()
+        baseline = baseline or rate
+        print(f"concurrency {concurrency:2}: {rate:7.0f} files/min ({rate / baseline:4.1f}x), "
+              f"{len(result.failed)} failed")
+    
+    server.max_concurrent = 4
+    limited = server.rate_limited
+    job = BatchJob(client, "Gere docstrings.", concurrency=8, backoff=0.2)
+    result = job.run(segments)
+    print(f"concurrency  8, server limit 4: {result.files_per_minute():7.0f} files/min, "
+          f"{server.rate_limited - limited} rate-limited request(s), {len(result.failed)} failed")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
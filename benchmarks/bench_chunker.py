@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: chunking large real-world source files at syntax boundaries.
+
+The corpus is the largest files of each code extension found under the
+given directories, by default the Python standard library (whose largest
+modules run to thousands of lines). Each file is read once and then
+chunked several times; the best time is reported with the chunk count,
+the longest chunk and the throughput, and the chunks are checked to cover
+the file without gaps. Files of 10k lines and more are summed apart.
+
+Usage:
+    python benchmarks/bench_chunker.py --per-extension 5 /usr/include ~/.cargo/registry
+"""
+
+import argparse
+import os
+import sys
+import sysconfig
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.chunker import CodeChunker, split_lines
+from src.config import config
+from bench_scan import time_call
+
+LARGE_LINES = 10_000
+
+
+def find_corpus(roots, per_extension):
+    """Pick the largest files of each code extension under roots."""
+    found = {}
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in config.IGNORE_DIRS]
+            for name in filenames:
+                extension = os.path.splitext(name)[1].lower()
+                if extension not in config.CODE_EXTENSIONS:
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    found.setdefault(extension, []).append((os.path.getsize(path), path))
+                except OSError:
+                    pass
+    corpus = []
+    for extension in sorted(found):
+        corpus.extend(path for _, path in sorted(found[extension], reverse=True)[:per_extension])
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('roots', nargs='*', default=[sysconfig.get_paths()['stdlib']])
+    parser.add_argument('--per-extension', type=int, default=10)
+    parser.add_argument('--max-lines', type=int, default=config.CHUNK_MAX_LINES)
+    args = parser.parse_args()
+    
+    chunker = CodeChunker(args.max_lines)
+    total_lines = total_time = 0
+    large_lines = large_time = 0
+    for path in find_corpus(args.roots, args.per_extension):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        lines = len(split_lines(text))
+        if not lines:
+            continue
+        
+        chunks = chunker.chunk(path, text)
+        assert chunks[0].start_line == 1 and chunks[-1].end_line == lines, path
+        assert all(a.end_line + 1 == b.start_line for a, b in zip(chunks, chunks[1:])), path
+        
+        elapsed = time_call(chunker.chunk, path, text)
+        total_lines += lines
+        total_time += elapsed
+        if lines >= LARGE_LINES:
+            large_lines += lines
+            large_time += elapsed
+        print(f"{elapsed * 1000:7.1f} ms {lines:7d} lines {len(chunks):5d} chunks "
+              f"(longest {max(c.line_count for c in chunks):4d})  {os.path.relpath(path)}")
+    
+    if total_time:
+        print(f"total: {total_lines} lines in {total_time * 1000:.1f} ms, "
+              f"{total_lines / total_time / 1000:.0f} lines/ms")
+    if large_time:
+        print(f"files of {LARGE_LINES}+ lines: {large_lines / large_time / 1000:.0f} lines/ms, "
+              f"{large_time * 1000 * LARGE_LINES / large_lines:.1f} ms per {LARGE_LINES} lines")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ingesting a mixed set of files.
+
+Creates UTF-8 sources, cp1252 and latin-1 text, UTF-16 files, binaries
+and a few multi-megabyte files, then adds them all the way add_file
+used to (whole file decoded as UTF-8, one after the other, failures
+printed) and through the FileIngestor pipeline. Reports the time, what
+each approach kept, and the prompt text produced for the kept files.
+
+Usage:
+    python benchmarks/bench_ingest.py --files 2000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import config
+from src.file_manager import FileManager
+from src.prompt_builder import PromptBuilder
+
+
+def write_files(root, count):
+    """Create count files of mixed kinds and return their paths."""
+    random.seed(7)
+    kinds = ["utf8"] * 14 + ["cp1252"] * 2 + ["latin1", "utf16", "binary", "binary"]
+    source = "def função_{i}(x):\n    return x * {i}  # olá\n"
+    paths = []
+    for i in range(count):
+        kind = kinds[i % len(kinds)]
+        if i % 400 == 0:
+            kind = "large"
+        path = os.path.join(root, f"file_{i}.{'bin' if kind == 'binary' else 'py'}")
+        if kind == "utf8":
+            data = "".join(source.format(i=j) for j in range(random.randint(20, 200))).encode()
+        elif kind == "cp1252":
+            data = ("# café “aspas” — travessão\n" * 50).encode("cp1252")
+        elif kind == "latin1":
+            data = bytes(range(0x80, 0xa0)) + ("# ação\n" * 50).encode("latin-1")
+        elif kind == "utf16":
+            data = ("# ü texto\n" * 50).encode("utf-16")
+        elif kind == "binary":
+            data = os.urandom(random.randint(4096, 65536))
+        else:
+            data = "".join(source.format(i=j) for j in range(60000)).encode()
+        with open(path, "wb") as f:
+            f.write(data)
+        paths.append(path)
+    return paths
+
+
+def legacy_ingest(paths):
+    """Read every file whole as UTF-8, one by one, as add_file used to."""
+    segments = []
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                segments.append((path, f.read()))
+        except Exception as e:
+            print(f"Error reading file {path}: {e}")
+    return segments
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=2000)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_files(tmp, args.files)
+        total = sum(os.path.getsize(p) for p in paths)
+        print(f"{len(paths)} files, {total / 1024 / 1024:.1f}MB, "
+              f"cap {config.MAX_FILE_BYTES // 1024}KB, {config.LOAD_WORKERS} threads")
+        
+        with contextlib.redirect_stdout(io.StringIO()) as errors:
+            start = time.perf_counter()
+            legacy = legacy_ingest(paths)
+            legacy_time = time.perf_counter() - start
+        legacy_chars = sum(len(text) for _, text in legacy)
+        print(f"legacy:    {legacy_time * 1000:8.1f} ms, kept {len(legacy)}, "
+              f"{errors.getvalue().count(chr(10))} printed errors, {legacy_chars / 1024 / 1024:.1f}M chars")
+        
+        manager = FileManager()
+        start = time.perf_counter()
+        results = manager.add_files((p, 'backend') for p in paths)
+        ingest_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        prompt = PromptBuilder.build_prompt("Revise", manager.code_segments)
+        prompt_time = time.perf_counter() - start
+        
+        statuses = Counter(r.status for r in results)
+        encodings = Counter(r.encoding for r in results if r.added)
+        truncated = sum(1 for r in results if r.truncated)
+        print(f"ingestor:  {ingest_time * 1000:8.1f} ms, kept {statuses['added']}, "
+              f"{statuses['binary']} binary skipped, {truncated} truncated, {statuses['error']} errors")
+        print(f"           encodings: {dict(encodings)}")
+        print(f"           prompt built in {prompt_time * 1000:.1f} ms, {len(prompt) / 1024 / 1024:.1f}M chars")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: login latency and TCP connections per login.
+
+Logs in repeatedly against a local fake Messages API, first the way
+connect() used to (a new SDK client per login, validated with a real
+messages.create call), then with the current connect() using the shared
+keep-alive pool and a models lookup. The fake server's inference delay
+stands in for the model round-trip the old check paid for.
+
+Usage:
+    python benchmarks/bench_login.py --logins 20 --inference-delay 0.8
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fake_api_server import FakeAPIServer, use_temporary_cache_dir
+
+use_temporary_cache_dir()
+
+import anthropic
+
+from src.api_client import ClaudeAPIClient
+from src.config import config
+
+
+def legacy_login(api_key, base_url):
+    """Login as shipped before connection reuse."""
+    client = anthropic.Anthropic(api_key=api_key, base_url=base_url)
+    client.messages.create(
+        model=config.DEFAULT_MODEL,
+        max_tokens=10,
+        messages=[{"role": "user", "content": "test"}]
+    )
+    return client
+
+
+def measure(label, server, logins, login):
+    connections = server.connections
+    start = time.perf_counter()
+    for _ in range(logins):
+        login()
+    elapsed = time.perf_counter() - start
+    print(f"{label:22} {elapsed / logins * 1000:8.1f} ms/login, "
+          f"{server.connections - connections} TCP connection(s) for {logins} logins")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--logins', type=int, default=20)
+    parser.add_argument('--inference-delay', type=float, default=0.8)
+    args = parser.parse_args()
+    
+    server = FakeAPIServer(tokens=10, inference_delay=args.inference_delay).start()
+    
+    clients = []
+    measure("new client + inference:", server, args.logins,
+            lambda: clients.append(legacy_login("sk-fake", server.base_url)))
+    
+    client = ClaudeAPIClient()
+    
+    def login():
+        response = client.connect("sk-fake", base_url=server.base_url)
+        if not response.success:
+            sys.exit(f"connect failed: {response.error}")
+    
+    measure("pooled + models lookup:", server, args.logins, login)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
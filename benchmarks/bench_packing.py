@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark: packing thousands of segments into a token budget.
+
+Attaches synthetic files as lazy segments, then packs them into the
+configured context budget cold (every file read and counted) and warm
+(counts reused from the cached counter), as happens when the preview is
+regenerated after editing the instructions.
+
+Usage:
+    python benchmarks/bench_packing.py --files 5000 --size 16384
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import config, CategoryConfig
+from src.file_manager import FileManager
+from src.prompt_builder import PromptBuilder
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=5000)
+    parser.add_argument('--size', type=int, default=16 * 1024, help="bytes per file")
+    parser.add_argument('--budget', type=int, default=config.CONTEXT_TOKEN_BUDGET)
+    args = parser.parse_args()
+    
+    categories = list(CategoryConfig.PRIORITIES)
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = FileManager()
+        for i in range(args.files):
+            line = f"def function_{i}(value):\n    return value * {i}  # filler\n"
+            path = os.path.join(tmp, f"module_{i}.py")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write((line * (args.size // len(line) + 1))[:args.size])
+            manager.add_file(path, categories[i % len(categories)])
+        
+        segments = manager.code_segments
+        print(f"{args.files} segments, {args.files * args.size / 1024 / 1024:.1f} MB, "
+              f"budget {args.budget} tokens")
+        
+        for label, instructions in (("cold pack:", "Revise o código."),
+                                    ("warm pack:", "Revise o código e os testes.")):
+            start = time.perf_counter()
+            pack = PromptBuilder.pack(instructions, segments, args.budget)
+            elapsed = time.perf_counter() - start
+            print(f"{label:11} {elapsed * 1000:8.1f} ms  {pack.tokens} tokens, "
+                  f"{len(pack.segments)} kept, {len(pack.truncated)} truncated, "
+                  f"{len(pack.summarized)} summarized, {len(pack.dropped)} dropped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: regenerating the prompt preview after an instruction edit.
+
+Attaches a synthetic context of the requested size, then times what the
+preview did on every click (build the whole prompt with its statistics
+and hand it all to a textbox) against the cached path: blocks and their
+statistics reused from the previous build, and the text indexed for the
+paged viewer, which then shows one screenful. Widgets need a display, so
+the size of the text a textbox would have laid out is reported instead.
+
+Usage:
+    python benchmarks/bench_preview.py --megabytes 20 --files 400
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.file_manager import FileManager
+from src.prompt_builder import PromptBuilder, PromptCache, PromptStats
+from src.text_index import TextIndex
+
+CATEGORIES = ["backend", "frontend", "tests", "docs"]
+
+
+def write_files(root, megabytes, count):
+    """Create count source files totalling about megabytes."""
+    line = "    value = compute(item, factor=3)  # processa o item\n"
+    lines = megabytes * 1024 * 1024 // count // len(line)
+    paths = []
+    for i in range(count):
+        path = os.path.join(root, f"module_{i}.py")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"def handler_{i}(item):\n" + line * lines)
+        paths.append(path)
+    return paths
+
+
+def full_preview(request, segments):
+    """Build the whole prompt and its statistics, as every click used to."""
+    stats = PromptStats()
+    text = "".join(stats.track(PromptBuilder.iter_prompt(request, segments)))
+    return text, stats.to_dict()
+
+
+def cached_preview(request, segments, cache, view):
+    """Build through the cache and index the text for the viewer."""
+    stats = PromptStats(cache=cache)
+    view.set_text("".join(stats.track(PromptBuilder.iter_prompt(request, segments, cache=cache))))
+    return view.window(0, 60), stats.to_dict()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--megabytes', type=int, default=20)
+    parser.add_argument('--files', type=int, default=400)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_files(tmp, args.megabytes, args.files)
+        manager = FileManager()
+        manager.add_files((p, CATEGORIES[i % len(CATEGORIES)]) for i, p in enumerate(paths))
+        segments = manager.code_segments
+        print(f"{len(segments)} files, {manager.get_total_size() / 1024 / 1024:.1f}MB")
+        
+        requests = [f"Revise o código, passo {i}" for i in range(4)]
+        
+        start = time.perf_counter()
+        for request in requests:
+            text, full_stats = full_preview(request, segments)
+        full_time = (time.perf_counter() - start) / len(requests)
+        print(f"full rebuild:   {full_time * 1000:8.1f} ms per click, "
+              f"{len(text) / 1024 / 1024:.1f}M chars replaced in the textbox")
+        
+        cache = PromptCache()
+        view = TextIndex()
+        start = time.perf_counter()
+        cached_preview("Revise", segments, cache, view)
+        print(f"first cached:   {(time.perf_counter() - start) * 1000:8.1f} ms")
+        
+        start = time.perf_counter()
+        for request in requests:
+            screen, stats = cached_preview(request, segments, cache, view)
+        cached_time = (time.perf_counter() - start) / len(requests)
+        print(f"after an edit:  {cached_time * 1000:8.1f} ms per click, "
+              f"{len(view)} lines indexed, {len(screen)} chars laid out")
+        
+        # Tokens are counted per chunk, so they may differ by a few per file
+        assert view.text == text, "cached preview differs"
+        assert stats['words'] == full_stats['words'] and stats['lines'] == full_stats['lines']
+        print(f"estimated tokens: {full_stats['estimated_tokens']} full, {stats['estimated_tokens']} cached")
+
+
+if __name__ == "__main__":
+    main()
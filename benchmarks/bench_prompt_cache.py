@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: asking several questions about the same files.
+
+Sends a series of different questions about one synthetic code context to
+the local fake Messages API, first as single request-first prompts, then
+as context-first prompts whose code block is marked for prompt caching.
+Reports time to first token and the input tokens read from the cache.
+
+Usage:
+    python benchmarks/bench_prompt_cache.py --questions 5 --context-kb 200
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fake_api_server import FakeAPIServer, use_temporary_cache_dir
+
+use_temporary_cache_dir()
+
+from src.api_client import ClaudeAPIClient
+from src.models import CodeSegment
+from src.prompt_builder import PromptBuilder
+
+QUESTIONS = (
+    "Explique a arquitetura do módulo.",
+    "Encontre possíveis bugs.",
+    "Sugira melhorias de performance.",
+    "Revise a segurança do código.",
+    "Proponha testes unitários.",
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--questions', type=int, default=5)
+    parser.add_argument('--context-kb', type=int, default=200)
+    parser.add_argument('--prefill-ms-per-ktok', type=float, default=20.0)
+    args = parser.parse_args()
+    
+    line = "def handler_{0}(request):\n    return process(request, retries={0})\n"
+    body = "".join(line.format(i) for i in range(args.context_kb * 1024 // len(line)))
+    segments = [CodeSegment("src/handlers.py", "backend", body)]
+    
+    server = FakeAPIServer(
+        tokens=50,
+        first_token_delay=0.05,
+        token_delay=0,
+        prefill_delay=args.prefill_ms_per_ktok / 1000 / 1000
+    ).start()
+    client = ClaudeAPIClient()
+    client.cache = None  # every question must reach the server
+    client.connect("sk-fake", base_url=server.base_url)
+    
+    for layout in ("request_first", "context_first"):
+        first_tokens = []
+        cache_read = 0
+        for i in range(args.questions):
+            question = QUESTIONS[i % len(QUESTIONS)] + f" ({i})"
+            if layout == "context_first":
+                context, prompt = PromptBuilder.split_prompt(question, segments)
+            else:
+                context = None
+                prompt = PromptBuilder.build_prompt(question, segments)
+            response = client.stream_message(prompt, lambda text: None, context=context)
+            first_tokens.append(response.time_to_first_token)
+            cache_read += response.cache_read_tokens or 0
+        
+        print(f"{layout:14} first token: first question {first_tokens[0]:.3f}s, "
+              f"later questions {sum(first_tokens[1:]) / max(len(first_tokens) - 1, 1):.3f}s avg, "
+              f"{cache_read} input tokens read from the prompt cache")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
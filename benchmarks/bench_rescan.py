@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: incremental rescans through the persistent directory index.
+
+Times a cold scan, a warm refresh of an unchanged tree, and a refresh after
+adding, deleting and renaming files, checking each result against a full
+scan without the index.
+
+Usage:
+    python benchmarks/bench_rescan.py --files 100000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import config
+from src.file_manager import FileManager
+from src.scanner import RepositoryScanner
+from bench_scan import build_tree
+
+
+def timed(func):
+    """Run func and return (result, seconds)."""
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=100_000)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as cache:
+        config.CACHE_DIR = cache
+        project = os.path.join(tmp, "project")
+        os.mkdir(project)
+        print(f"Building synthetic tree with {args.files} files...")
+        build_tree(project, args.files)
+        
+        def full_scan():
+            scanner = RepositoryScanner()
+            return scanner.render_tree(scanner.scan(project))
+        
+        manager = FileManager()
+        manager.set_project_path(project)
+        cold, cold_time = timed(manager.scan_directory)
+        print(f"cold scan (builds index):     {cold_time:8.3f}s "
+              f"({manager.dir_index.listed} dirs listed)")
+        
+        # New FileManager so the index is loaded from disk, like a new session
+        manager = FileManager()
+        manager.set_project_path(project)
+        warm, warm_time = timed(manager.scan_directory)
+        print(f"warm refresh, unchanged tree: {warm_time:8.3f}s "
+              f"({manager.dir_index.listed} listed, {manager.dir_index.reused} reused)")
+        assert warm == cold, "warm refresh differs from cold scan"
+        
+        first = os.path.join(project, "pkg_0")
+        Path(first, "added_file.py").write_text("print('new')\n")
+        os.remove(os.path.join(first, "module_0.py"))
+        os.rename(os.path.join(first, "module_1.js"), os.path.join(first, "renamed.ts"))
+        os.rename(os.path.join(project, "pkg_1"), os.path.join(project, "moved_pkg"))
+        
+        changed, changed_time = timed(manager.scan_directory)
+        print(f"refresh after add/del/rename: {changed_time:8.3f}s "
+              f"({manager.dir_index.listed} listed, {manager.dir_index.reused} reused)")
+        assert changed == full_scan(), "incremental result differs from full scan"
+        print("incremental results match full scans")
+
+
+if __name__ == "__main__":
+    main()
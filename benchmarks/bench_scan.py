@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: parallel os.scandir scanner vs. the legacy recursive scan.
+
+Builds a synthetic project tree and times both implementations.
+
+Usage:
+    python benchmarks/bench_scan.py --files 100000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import config
+from src.scanner import RepositoryScanner
+
+
+def legacy_scan_directory(scan_path: str) -> str:
+    """Recursive Path.iterdir() scan as shipped before the scanner module."""
+    tree_lines = [f"📂 {Path(scan_path).name}\n"]
+    
+    def scan_dir(current_path: str, prefix: str = ""):
+        try:
+            items = sorted(
+                Path(current_path).iterdir(),
+                key=lambda x: (not x.is_dir(), x.name.lower())
+            )
+            for idx, item in enumerate(items):
+                if item.name in config.IGNORE_DIRS:
+                    continue
+                is_last = idx == len(items) - 1
+                connector = "└── " if is_last else "├── "
+                if item.is_dir():
+                    tree_lines.append(f"{prefix}{connector}📁 {item.name}\n")
+                    extension = "    " if is_last else "│   "
+                    scan_dir(str(item), prefix + extension)
+                elif item.suffix in config.CODE_EXTENSIONS:
+                    size = item.stat().st_size
+                    size_str = f"{size/1024:.1f}KB" if size > 1024 else f"{size}B"
+                    tree_lines.append(f"{prefix}{connector}📄 {item.name} ({size_str})\n")
+        except PermissionError:
+            pass
+    
+    scan_dir(scan_path)
+    return "".join(tree_lines)
+
+
+def build_tree(root: str, total_files: int, files_per_dir: int = 50, fanout: int = 8):
+    """Create a synthetic tree with roughly total_files files."""
+    extensions = ['.py', '.js', '.ts', '.md', '.json', '.png', '.lock']
+    dirs = [root]
+    created = 0
+    queue = [root]
+    while created < total_files:
+        parent = queue.pop(0)
+        for i in range(fanout):
+            child = os.path.join(parent, f"pkg_{i}")
+            os.mkdir(child)
+            dirs.append(child)
+            queue.append(child)
+            for j in range(files_per_dir):
+                ext = extensions[j % len(extensions)]
+                with open(os.path.join(child, f"module_{j}{ext}"), 'w') as f:
+                    f.write("x" * (j * 37 % 4000))
+                created += 1
+                if created >= total_files:
+                    return len(dirs), created
+    return len(dirs), created
+
+
+def time_call(func, *args, repeat: int = 3) -> float:
+    """Return the best wall time of several runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=100_000)
+    parser.add_argument('--workers', type=int, default=config.SCAN_MAX_WORKERS)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    scanner = RepositoryScanner(max_workers=args.workers)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Building synthetic tree with {args.files} files...")
+        dir_count, file_count = build_tree(tmp, args.files)
+        print(f"  {dir_count} directories, {file_count} files")
+        
+        legacy = time_call(legacy_scan_directory, tmp, repeat=args.repeat)
+        parallel = time_call(
+            lambda p: scanner.render_tree(scanner.scan(p)), tmp, repeat=args.repeat
+        )
+        scan_only = time_call(scanner.scan, tmp, repeat=args.repeat)
+        
+        print(f"legacy recursive scan:   {legacy:8.3f}s")
+        print(f"scandir + {args.workers} workers:     {parallel:8.3f}s "
+              f"(scan only {scan_only:.3f}s)")
+        print(f"speedup:                 {legacy / parallel:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark: building, updating and querying the project search index.
+
+Creates a synthetic repository of the requested size, with identifiers
+drawn from a skewed vocabulary so that some terms are in most files and
+others in a few, then times a full index build, an update with nothing
+changed, an update after editing some files, and queries of the kind
+the prompt page sends.
+
+Usage:
+    python benchmarks/bench_search_index.py --files 100000 --changed 200
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.scanner import RepositoryScanner
+from src.search_index import SearchIndex
+
+WORDS = (
+    "user account session token cache request response handler service client "
+    "order invoice payment customer product price cart checkout shipping address "
+    "report export import parser config loader writer reader stream buffer queue "
+    "worker scheduler job task retry timeout error logger metric event listener "
+    "login password hash email notify message template render view model schema "
+    "query index search filter sort page limit offset cursor batch upload file"
+).split()
+
+QUERIES = [
+    "Corrija o erro de timeout no retry do payment client",
+    "Adicione paginação com cursor na search query",
+    "o login falha quando o password hash muda",
+    "Explique como o scheduler distribui os jobs entre os workers",
+    "melhore o export de invoice para o report",
+    "handler",
+]
+
+
+def write_repo(root, count, rng):
+    """Create count source files in nested packages."""
+    weights = [1 / (rank + 1) for rank in range(len(WORDS))]
+    for i in range(count):
+        folder = os.path.join(root, f"pkg_{i % 100}", f"mod_{i // 100 % 50}")
+        os.makedirs(folder, exist_ok=True)
+        names = rng.choices(WORDS, weights, k=60)
+        lines = [
+            f"def {names[j]}_{names[j + 1]}({names[j + 2]}Id, {names[j + 3]}):\n"
+            f"    return {names[j + 4]}Service.get{names[j + 5].title()}({names[j + 2]}Id)\n"
+            for j in range(0, 54, 6)
+        ]
+        with open(os.path.join(folder, f"{names[0]}_{names[1]}_{i}.py"), "w", encoding="utf-8") as f:
+            f.write("".join(lines) * 3)
+
+
+def timed(func, *args):
+    """Run func and return (result, seconds)."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=100_000)
+    parser.add_argument('--changed', type=int, default=200)
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+    
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = os.path.join(tmp, "repo")
+        _, write_time = timed(write_repo, repo, args.files, rng)
+        print(f"{args.files} files written in {write_time:.1f}s")
+        
+        scanner = RepositoryScanner()
+        tree = scanner.scan(repo)
+        index = SearchIndex(repo, cache_dir=os.path.join(tmp, "cache"))
+        
+        (indexed, _), build_time = timed(index.update, tree)
+        size = os.path.getsize(index.path) / 1024 / 1024
+        print(f"full build:     {build_time:8.1f} s, {indexed} files, {size:.0f}MB on disk")
+        
+        (indexed, _), idle_time = timed(index.update, tree)
+        print(f"no changes:     {idle_time:8.2f} s, {indexed} files read")
+        
+        files = [node.path for node in tree.iter_files()]
+        for path in rng.sample(files, min(args.changed, len(files))):
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("def refundPayment(orderId):\n    return None\n")
+        (indexed, _), changed_time = timed(index.update, tree)
+        print(f"after edits:    {changed_time:8.2f} s, {indexed} files read")
+        
+        # Reopened, as after a restart
+        index.close()
+        index = SearchIndex(repo, cache_dir=os.path.join(tmp, "cache"))
+        worst = 0.0
+        for query in QUERIES:
+            index.search(query, args.top)
+            results, query_time = timed(index.search, query, args.top)
+            worst = max(worst, query_time)
+            print(f"query {query_time * 1000:6.1f} ms, {len(results):2d} files  {query!r}")
+        print(f"slowest query:  {worst * 1000:8.1f} ms")
+        hits = index.search("refund payment order", args.changed)
+        print(f"edited files found: {sum('refund' in open(p, encoding='utf-8').read() for p, _ in hits)}"
+              f"/{len(hits)}")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
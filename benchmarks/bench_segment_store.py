@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark: segment bookkeeping, plain list vs. SegmentStore.
+
+Runs the FileManager operations a batch job repeats, on growing numbers
+of in-memory lazy segments (no file is read): checking a path before
+adding it, listing and removing a category, listing the categories in
+use, totalling sizes, and taking the segment list for a prompt. The list
+column replays what FileManager did with its plain code_segments list.
+
+Usage:
+    python benchmarks/bench_segment_store.py --sizes 1000 10000 50000
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.models import CodeSegment
+from src.segment_store import SegmentStore
+from bench_scan import time_call
+
+CATEGORIES = ["backend", "frontend", "tests", "docs", "config", "api"]
+LOOKUPS = 1000
+
+
+def make_segments(count):
+    """Create lazy segments spread over the categories."""
+    return [
+        CodeSegment(f"/project/pkg_{i % 97}/file_{i}.py", CATEGORIES[i % len(CATEGORIES)], size=2048)
+        for i in range(count)
+    ]
+
+
+def list_ops(segments):
+    """The list operations FileManager used, keyed by benchmark name."""
+    return {
+        "duplicate check": lambda items: [
+            any(s.path == p.path for s in items) for p in segments[-LOOKUPS:]
+        ],
+        "files of category": lambda items: [s for s in items if s.category == "tests"],
+        "categories in use": lambda items: {s.category for s in items},
+        "total size": lambda items: sum(s.size for s in items),
+        "remove category": lambda items: [s for s in items if s.category != "tests"],
+        "prompt snapshot x100": lambda items: [list(items) for _ in range(100)],
+    }
+
+
+def store_ops(segments):
+    """The same operations on a SegmentStore."""
+    return {
+        "duplicate check": lambda store: [p.path in store for p in segments[-LOOKUPS:]],
+        "files of category": lambda store: list(store.snapshot("tests")),
+        "categories in use": lambda store: store.categories(),
+        "total size": lambda store: store.size,
+        "remove category": lambda store: store.remove_category("tests"),
+        "prompt snapshot x100": lambda store: [store.snapshot() for _ in range(100)],
+    }
+
+
+def fill(segments):
+    """Build a store holding the segments."""
+    store = SegmentStore()
+    for segment in segments:
+        store.add(segment)
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    args = parser.parse_args()
+    
+    for size in args.sizes:
+        segments = make_segments(size)
+        fill_time = time_call(fill, segments)
+        print(f"\n{size} segments (store filled in {fill_time * 1000:.1f} ms)")
+        print(f"{'operation':>22} | {'list':>10} | {'store':>10}")
+        
+        legacy = list_ops(segments)
+        indexed = store_ops(segments)
+        for name in legacy:
+            list_time = time_call(legacy[name], list(segments))
+            # Each run gets a fresh store so removals have work to do
+            stores = [fill(segments) for _ in range(3)]
+            store_time = min(time_call(indexed[name], store, repeat=1) for store in stores)
+            print(f"{name:>22} | {list_time * 1000:8.3f}ms | {store_time * 1000:8.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
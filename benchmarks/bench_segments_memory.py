@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory held by attached segments, eager vs. lazy content.
+
+Attaches the same set of files with the previous eager dataclass segments
+and with the lazy __slots__ CodeSegment, reporting memory retained by the
+attached segments as measured by tracemalloc.
+
+Usage:
+    python benchmarks/bench_segments_memory.py --files 5000 --size 32768
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.file_manager import FileManager
+from src.prompt_builder import PromptBuilder
+
+
+@dataclass
+class EagerSegment:
+    """Segment as shipped before lazy content: the full text is resident."""
+    path: str
+    category: str
+    content: str
+    selected: bool = True
+
+
+def attach_eager(paths):
+    segments = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            segments.append(EagerSegment(path, 'backend', f.read()))
+    return segments
+
+
+def attach_lazy(paths):
+    manager = FileManager()
+    for path in paths:
+        manager.add_file(path, 'backend')
+    return manager.code_segments
+
+
+def measure(attach, paths):
+    """Return (retained bytes, seconds) for attaching paths."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    segments = attach(paths)
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return segments, retained, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=5000)
+    parser.add_argument('--size', type=int, default=32 * 1024, help="bytes per file")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        line = "def generated_function(value):  return value * 2  # filler\n"
+        body = (line * (args.size // len(line) + 1))[:args.size]
+        paths = []
+        for i in range(args.files):
+            path = os.path.join(tmp, f"generated_{i}.py")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(body)
+            paths.append(path)
+        
+        total_mb = args.files * args.size / 1024 / 1024
+        print(f"{args.files} files, {total_mb:.1f} MB on disk")
+        
+        eager, eager_mem, eager_time = measure(attach_eager, paths)
+        del eager
+        lazy, lazy_mem, lazy_time = measure(attach_lazy, paths)
+        
+        print(f"eager segments: {eager_mem / 1024 / 1024:8.2f} MB retained, attach {eager_time:.3f}s")
+        print(f"lazy segments:  {lazy_mem / 1024 / 1024:8.2f} MB retained, attach {lazy_time:.3f}s")
+        print(f"per segment:    {lazy_mem / args.files:8.0f} B (lazy)")
+        
+        start = time.perf_counter()
+        prompt = PromptBuilder.build_prompt("Analyze", lazy)
+        print(f"prompt assembly from lazy segments: {time.perf_counter() - start:.3f}s, "
+              f"{len(prompt) / 1024 / 1024:.1f} MB prompt")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark: application startup time.
+
+Starts the application in fresh interpreters and measures the import time
+of src.app and the time until the first window paint, first as shipped
+(pages built on first navigation, anthropic loaded on first login), then
+emulating the old eager startup that imported the SDK and every UI module
+and built all five pages before the first paint.
+
+Needs customtkinter and a display (on a headless machine run it under
+xvfb-run).
+
+Usage:
+    python benchmarks/bench_startup.py --runs 5
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+if {eager!r}:
+    import anthropic, src.api_client, src.batch, src.ui.pages, src.ui.modern_pages
+from src.app import ClaudePromptGeneratorApp
+imported = time.perf_counter()
+app = ClaudePromptGeneratorApp()
+if {eager!r}:
+    for name in ("files", "prompt", "result", "docs"):
+        app.get_page(name)
+app.root.update()
+painted = time.perf_counter()
+print(json.dumps({{
+    "import": imported - start,
+    "paint": painted - start,
+    "anthropic": "anthropic" in sys.modules,
+    "pages": sorted(app.pages)
+}}))
+app.root.destroy()
+"""
+
+
+def launch(eager):
+    """Start the app in a new interpreter and return its timings."""
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD.format(root=str(ROOT), eager=eager)],
+        capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.splitlines()[-1])
+    result["process"] = time.perf_counter() - start
+    return result
+
+
+def measure(label, runs, eager):
+    results = [launch(eager) for _ in range(runs)]
+    
+    def median(key):
+        return statistics.median(r[key] for r in results) * 1000
+    
+    last = results[-1]
+    print(f"{label:7} import {median('import'):7.1f} ms, first paint {median('paint'):7.1f} ms, "
+          f"process {median('process'):7.1f} ms "
+          f"(anthropic loaded: {last['anthropic']}, pages: {', '.join(last['pages'])})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+    
+    # Warm the OS file cache so the first run is not an outlier
+    launch(False)
+    measure("eager:", args.runs, True)
+    measure("lazy:", args.runs, False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark: time until the user sees text, blocking vs. streaming.
+
+Sends the same request to a local fake Messages API twice: with
+send_message, where nothing can be shown until the whole answer arrived,
+and with stream_message, reporting time-to-first-token, tokens/sec and
+how many batched UI updates the deltas were coalesced into.
+
+Usage:
+    python benchmarks/bench_streaming.py --tokens 8000 --token-delay 0.005
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fake_api_server import FakeAPIServer, use_temporary_cache_dir
+
+use_temporary_cache_dir()
+
+from src.api_client import ClaudeAPIClient
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tokens', type=int, default=2000)
+    parser.add_argument('--first-token-delay', type=float, default=0.5)
+    parser.add_argument('--token-delay', type=float, default=0.002)
+    args = parser.parse_args()
+    
+    generation = args.first_token_delay + args.tokens * args.token_delay
+    server = FakeAPIServer(
+        tokens=args.tokens,
+        first_token_delay=args.first_token_delay,
+        token_delay=args.token_delay,
+        inference_delay=generation
+    ).start()
+    
+    client = ClaudeAPIClient()
+    response = client.connect("sk-fake", base_url=server.base_url)
+    if not response.success:
+        sys.exit(f"connect failed: {response.error}")
+    
+    start = time.perf_counter()
+    # Both calls must reach the server, not the response cache
+    response = client.send_message("Revise o código.", use_cache=False)
+    blocking = time.perf_counter() - start
+    print(f"send_message:   first text after {blocking:6.3f}s ({len(response.content)} chars)")
+    
+    updates = []
+    start = time.perf_counter()
+    response = client.stream_message("Revise o código.", updates.append, use_cache=False)
+    total = time.perf_counter() - start
+    if not response.success:
+        sys.exit(f"stream failed: {response.error}")
+    assert "".join(updates) == response.content
+    print(f"stream_message: first text after {response.time_to_first_token:6.3f}s, "
+          f"done in {total:.3f}s, {response.tokens_per_second:.0f} tokens/s, "
+          f"{args.tokens} deltas in {len(updates)} UI updates")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
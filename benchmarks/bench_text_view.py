@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: opening and searching a large text in the paged viewer.
+
+Builds a prompt-like text of the requested size and times what
+LargeTextView does with it: indexing the line offsets, slicing one
+screenful for the textbox, jumping to the middle and searching. Memory
+is the index itself as measured by tracemalloc, next to the text size;
+a textbox would instead lay out every line of the text.
+
+Usage:
+    python benchmarks/bench_text_view.py --megabytes 50
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.text_index import TextIndex
+
+SCREEN_LINES = 60
+
+
+def build_text(megabytes):
+    """Build a prompt-like text of about megabytes."""
+    block = "".join(
+        f"#### Arquivo: `module_{i}.py`\n```\n"
+        + "    value = compute(item, factor=3)  # processa o item\n" * 40
+        + "```\n\n"
+        for i in range(50)
+    )
+    return block * max(1, megabytes * 1024 * 1024 // len(block)) + "fim do prompt\n"
+
+
+def timed(func, *args):
+    """Run func and return (result, milliseconds)."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--megabytes', type=int, default=50)
+    args = parser.parse_args()
+    
+    text = build_text(args.megabytes)
+    print(f"{len(text) / 1024 / 1024:.1f}M chars")
+    
+    index, open_time = timed(TextIndex, text)
+    # Measured apart, since tracing allocations slows the indexing down
+    tracemalloc.start()
+    traced = TextIndex(text)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del traced
+    print(f"open:          {open_time:8.1f} ms, {len(index)} lines, index {memory / 1024 / 1024:.1f}MB")
+    
+    screen, first_time = timed(index.window, 0, SCREEN_LINES)
+    print(f"first screen:  {first_time:8.3f} ms, {len(screen)} chars laid out")
+    
+    _, jump_time = timed(index.window, len(index) // 2, SCREEN_LINES)
+    print(f"jump to half:  {jump_time:8.3f} ms")
+    
+    found, search_time = timed(index.find, "FIM DO PROMPT")
+    print(f"search (end):  {search_time:8.1f} ms, line {found[0] + 1}")
+    
+    found, next_time = timed(index.find, "module_7.py", found[1] + 1)
+    print(f"search (wrap): {next_time:8.1f} ms, line {found[0] + 1}")
+
+
+if __name__ == "__main__":
+    main()
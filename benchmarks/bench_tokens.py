@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark: token counting for a large prompt.
+
+Counts tokens of a synthetic 10 MB prompt (code plus Portuguese prose)
+cold, then re-counts it after only the user instructions changed, which
+should reuse the memoized per-segment counts.
+
+Usage:
+    python benchmarks/bench_tokens.py --mb 10
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.models import CodeSegment
+from src.prompt_builder import PromptBuilder, PromptStats
+from src.tokenizer import ApproxBPECounter, CachedTokenCounter
+
+CODE = '''
+class OrderService:
+    """Serviço de pedidos com validação de estoque."""
+
+    def __init__(self, repository, notifier=None):
+        self.repository = repository
+        self.notifier = notifier
+        self._cache = {}
+
+    def create_order(self, customer_id: int, items: list) -> dict:
+        if not items:
+            raise ValueError("Pedido sem itens")
+        total = sum(item["price"] * item["quantity"] for item in items)
+        order = {"customer_id": customer_id, "items": items, "total": total}
+        self.repository.save(order)
+        if self.notifier:
+            self.notifier.send(f"Pedido criado: {order['total']:.2f}")
+        return order
+'''
+
+PROSE = (
+    "Análise e modificação do código: verifique a configuração de produção, "
+    "as validações de segurança e a documentação das funções públicas.\n"
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--mb', type=float, default=10)
+    parser.add_argument('--segment-kb', type=int, default=64)
+    args = parser.parse_args()
+    
+    unit = CODE + PROSE
+    per_segment = args.segment_kb * 1024
+    body = unit * (per_segment // len(unit) + 1)
+    count = int(args.mb * 1024 * 1024 // per_segment)
+    segments = [
+        CodeSegment(f"src/module_{i}.py", "backend", f"# module {i}\n" + body[:per_segment])
+        for i in range(count)
+    ]
+    
+    prompt = PromptBuilder.build_prompt("Revise o código.", segments)
+    print(f"prompt: {len(prompt) / 1024 / 1024:.1f} MB in {count} segments")
+    
+    raw = ApproxBPECounter()
+    start = time.perf_counter()
+    tokens = raw.count(prompt)
+    elapsed = time.perf_counter() - start
+    print(f"approx BPE, whole prompt:     {elapsed:7.3f}s  {tokens} tokens "
+          f"({len(prompt) / tokens:.2f} chars/token, len//4 gives {len(prompt) // 4})")
+    
+    counter = CachedTokenCounter(ApproxBPECounter())
+    for label, instructions in (("cold preview:", "Revise o código."),
+                                ("after instruction edit:", "Revise o código e os testes.")):
+        stats = PromptStats(counter)
+        start = time.perf_counter()
+        for _ in stats.track(PromptBuilder.iter_prompt(instructions, segments)):
+            pass
+        elapsed = time.perf_counter() - start
+        print(f"{label:29} {elapsed:7.3f}s  {stats.tokens} tokens "
+              f"(cache hits {counter.hits}, misses {counter.misses})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: project tree display cost, full text vs. visible rows.
+
+Builds in-memory trees of growing size and compares the text the Files
+page used to insert into its textbox (the whole rendered tree) with what
+the virtualized tree view builds: the rows of the expanded folders and
+the text of one screenful of them. The tree view numbers should stay flat
+as the repository grows.
+
+Usage:
+    python benchmarks/bench_tree_view.py --sizes 1000 10000 100000 500000
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.models import TreeNode
+from src.scanner import RepositoryScanner
+from src.visible_tree import VisibleTree
+
+SCREEN_ROWS = 60
+
+
+def build_tree(total_files, files_per_dir=50, fanout=8):
+    """Build a synthetic scanned tree with total_files files."""
+    root = TreeNode(name="project", path="/project", is_dir=True)
+    queue = [root]
+    created = 0
+    while created < total_files:
+        parent = queue.pop(0)
+        for i in range(fanout):
+            child = TreeNode(name=f"dir{i}", path=f"{parent.path}/dir{i}", is_dir=True)
+            parent.children.append(child)
+            queue.append(child)
+        for i in range(min(files_per_dir, total_files - created)):
+            parent.children.append(TreeNode(
+                name=f"file{i}.py", path=f"{parent.path}/file{i}.py", is_dir=False, size=2048
+            ))
+        created += files_per_dir
+    RepositoryScanner.accumulate_sizes(root)
+    return root
+
+
+def timed(func):
+    """Run func and return (result, seconds)."""
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def show_tree(root):
+    """Build the rows and one screen of text, as the tree view does."""
+    view = VisibleTree()
+    view.set_root(root)
+    # Open the first folder too, like a user starting to browse
+    view.toggle_expanded(1)
+    return view, [view.format_row(row) for row in view.window(0, SCREEN_ROWS)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 500000])
+    args = parser.parse_args()
+    
+    print(f"{'files':>8} | {'full text':>10} {'time':>9} | {'rows':>6} {'memory':>9} {'time':>9}")
+    for size in args.sizes:
+        root = build_tree(size)
+        
+        text, text_time = timed(lambda: RepositoryScanner.render_tree(root))
+        
+        tracemalloc.start()
+        (view, _), view_time = timed(lambda: show_tree(root))
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        
+        print(f"{size:8} | {len(text.encode()) / 1024:8.0f}KB {text_time * 1000:7.1f}ms | "
+              f"{len(view):6} {memory / 1024:7.1f}KB {view_time * 1000:7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
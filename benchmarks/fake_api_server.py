@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Messages API, for benchmarks and manual testing.
+
+Serves POST /v1/messages (plain JSON or server-sent events when the request
+asks for "stream": true) and GET /v1/models[/<id>], with configurable latency, over
+HTTP/1.1 keep-alive. It counts TCP connections and requests so client-side
+connection reuse can be checked, and emulates prompt caching: text blocks
+marked with cache_control are remembered, reported as cache reads when seen
+again and prefilled ten times faster. With max_concurrent set, requests
+beyond that many in flight get a 429 with Retry-After. Point the app at it with
+ANTHROPIC_BASE_URL=http://127.0.0.1:<port>, and at a scratch cache with
+CODEX_CACHE_DIR so fake answers do not land in the real response cache.
+
+Usage:
+    python benchmarks/fake_api_server.py --port 8765 --tokens 2000
+"""
+
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MODEL = {
+    "type": "model",
+    "id": "claude-sonnet-4-5-20250929",
+    "display_name": "Claude Sonnet 4.5",
+    "created_at": "2025-09-29T00:00:00Z"
+}
+WORDS = ("Analisando", " o", " código", ",", " sugiro", " extrair", " a", " função",
+         " `create_order`", " e", " validar", " os", " itens", ".\n")
+
+
+def use_temporary_cache_dir() -> str:
+    """
+    Point the app's caches at a temporary directory removed at exit.
+    
+    Must run before src is imported, as its config reads CODEX_CACHE_DIR
+    once, so benchmark runs never touch the user's ~/.codex/cache.
+    """
+    path = tempfile.mkdtemp(prefix="codex-bench-")
+    atexit.register(shutil.rmtree, path, True)
+    os.environ["CODEX_CACHE_DIR"] = path
+    return path
+
+
+class FakeAPIServer(ThreadingHTTPServer):
+    """Threaded HTTP server answering like the Messages API."""
+    
+    daemon_threads = True
+    
+    def __init__(
+        self,
+        port: int = 0,
+        tokens: int = 200,
+        first_token_delay: float = 0.5,
+        token_delay: float = 0.005,
+        inference_delay: float = 0.5,
+        prefill_delay: float = 0.0,
+        max_concurrent: int = 0
+    ):
+        """
+        Initialize the server.
+        
+        Args:
+            port: Port to bind on 127.0.0.1 (0 picks a free one)
+            tokens: Number of text deltas in each answer
+            first_token_delay: Seconds before the first streamed delta
+            token_delay: Seconds between streamed deltas
+            inference_delay: Seconds before a non-streamed answer
+            prefill_delay: Extra seconds per uncached input token before answering
+            max_concurrent: Requests in flight before answering 429 (0 for no limit)
+        """
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.tokens = tokens
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.inference_delay = inference_delay
+        self.prefill_delay = prefill_delay
+        self.prompt_cache = set()
+        self.max_concurrent = max_concurrent
+        self.active = 0
+        self.connections = 0
+        self.requests = 0
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+    
+    @property
+    def base_url(self) -> str:
+        """Get the URL to pass as the client's base_url."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self) -> "FakeAPIServer":
+        """Serve on a background thread."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+    
+    def count(self, attr: str, step: int = 1):
+        """Increment a counter."""
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + step)
+    
+    def admit(self) -> bool:
+        """Take a request slot, or return False when over max_concurrent."""
+        with self._lock:
+            if self.max_concurrent and self.active >= self.max_concurrent:
+                self.rate_limited += 1
+                return False
+            self.active += 1
+            return True
+    
+    def prefill(self, messages: list):
+        """
+        Count input tokens the way the API reports them with prompt caching.
+        
+        Returns:
+            Tuple of (usage dict, seconds to spend on prefill)
+        """
+        usage = {"input_tokens": 0, "cache_read_input_tokens": 0,
+                 "cache_creation_input_tokens": 0, "output_tokens": 0}
+        prefix = ""
+        for message in messages:
+            content = message.get("content", "")
+            if isinstance(content, str):
+                content = [{"type": "text", "text": content}]
+            for block in content:
+                text = block.get("text", "")
+                prefix += text
+                tokens = len(text) // 4
+                if "cache_control" not in block:
+                    usage["input_tokens"] += tokens
+                    continue
+                key = hashlib.sha256(prefix.encode()).digest()
+                with self._lock:
+                    hit = key in self.prompt_cache
+                    self.prompt_cache.add(key)
+                usage["cache_read_input_tokens" if hit else "cache_creation_input_tokens"] += tokens
+        
+        uncached = usage["input_tokens"] + usage["cache_creation_input_tokens"]
+        delay = (uncached + usage["cache_read_input_tokens"] / 10) * self.prefill_delay
+        return usage, delay
+    
+    def answer_text(self) -> str:
+        """Get the full text of an answer."""
+        return "".join(WORDS[i % len(WORDS)] for i in range(self.tokens))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler; one instance per connection."""
+    
+    protocol_version = "HTTP/1.1"
+    
+    def setup(self):
+        super().setup()
+        # Headers and body are written separately; avoid Nagle/delayed-ACK stalls
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.count("connections")
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _send_json(self, payload: dict, status: int = 200, headers: dict = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _send_event(self, event: str, data: dict):
+        chunk = f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.flush()
+    
+    def do_GET(self):
+        self.server.count("requests")
+        path = self.path.split("?")[0]
+        if path == "/v1/models":
+            self._send_json({
+                "data": [MODEL],
+                "has_more": False,
+                "first_id": MODEL["id"],
+                "last_id": MODEL["id"]
+            })
+        elif path.startswith("/v1/models/"):
+            self._send_json(dict(MODEL, id=path.rsplit("/", 1)[1]))
+        else:
+            self._send_json({"type": "error", "error": {"type": "not_found_error"}}, 404)
+    
+    def do_POST(self):
+        self.server.count("requests")
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+        if not server.admit():
+            self._send_json(
+                {"type": "error", "error": {"type": "rate_limit_error", "message": "Too many requests"}},
+                429,
+                {"retry-after": "1"}
+            )
+            return
+        try:
+            self._answer(request)
+        finally:
+            server.count("active", -1)
+    
+    def _answer(self, request: dict):
+        server = self.server
+        usage, prefill = server.prefill(request.get("messages", []))
+        message = {
+            "id": "msg_fake",
+            "type": "message",
+            "role": "assistant",
+            "model": request.get("model", "fake"),
+            "content": [],
+            "stop_reason": None,
+            "stop_sequence": None,
+            "usage": usage
+        }
+        
+        if not request.get("stream"):
+            time.sleep(server.inference_delay + prefill)
+            message["content"] = [{"type": "text", "text": server.answer_text()}]
+            message["stop_reason"] = "end_turn"
+            message["usage"]["output_tokens"] = server.tokens
+            self._send_json(message)
+            return
+        
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        
+        self._send_event("message_start", {"type": "message_start", "message": message})
+        self._send_event("content_block_start", {
+            "type": "content_block_start", "index": 0,
+            "content_block": {"type": "text", "text": ""}
+        })
+        time.sleep(server.first_token_delay + prefill)
+        for i in range(server.tokens):
+            self._send_event("content_block_delta", {
+                "type": "content_block_delta", "index": 0,
+                "delta": {"type": "text_delta", "text": WORDS[i % len(WORDS)]}
+            })
+            if server.token_delay:
+                time.sleep(server.token_delay)
+        self._send_event("content_block_stop", {"type": "content_block_stop", "index": 0})
+        self._send_event("message_delta", {
+            "type": "message_delta",
+            "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+            "usage": {"output_tokens": server.tokens}
+        })
+        self._send_event("message_stop", {"type": "message_stop"})
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--tokens', type=int, default=2000)
+    parser.add_argument('--first-token-delay', type=float, default=0.5)
+    parser.add_argument('--token-delay', type=float, default=0.005)
+    args = parser.parse_args()
+    
+    server = FakeAPIServer(args.port, args.tokens, args.first_token_delay, args.token_delay)
+    print(f"serving on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -2,20 +2,29 @@
 """
 AI DEBUG TOOL - Main Entry Point
 A professional tool for generating optimized prompts for Claude AI.
+
+Run without arguments to open the application, or headless with:
+    python main.py run --repo PATH --category backend=src/** --instructions TEXT
 """
 
+import logging
 import sys
 from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from src.app import ClaudePromptGeneratorApp
-
 
 def main():
     """Main entry point."""
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+    if len(sys.argv) > 1:
+        # Headless mode never imports the UI modules
+        from src.cli import main as cli_main
+        sys.exit(cli_main())
+    
     try:
+        from src.app import ClaudePromptGeneratorApp
         app = ClaudePromptGeneratorApp()
         app.run()
     except KeyboardInterrupt:
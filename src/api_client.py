@@ -1,40 +1,101 @@
 """Claude API client module."""
 
+import copy
+import threading
+import time
 import anthropic
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from .models import APIResponse
 from .config import config
+from .response_cache import ResponseCache
+
+
+_http_client: Optional[Any] = None
+_http_lock = threading.Lock()
+
+
+def get_http_client():
+    """
+    Get the keep-alive HTTP client shared by every API client.
+    
+    Reusing pooled connections saves the TCP and TLS handshakes on every
+    request after the first, including logins with a different key.
+    
+    Returns:
+        The SDK's default httpx client with a longer keep-alive expiry
+    """
+    global _http_client
+    with _http_lock:
+        if _http_client is None or _http_client.is_closed:
+            # Build the limits with the SDK's own httpx flavour
+            limits = type(anthropic.DEFAULT_CONNECTION_LIMITS)
+            _http_client = anthropic.DefaultHttpxClient(
+                limits=limits(
+                    max_connections=config.HTTP_POOL_SIZE,
+                    max_keepalive_connections=config.HTTP_POOL_SIZE,
+                    keepalive_expiry=config.HTTP_KEEPALIVE_SECONDS
+                )
+            )
+        return _http_client
 
 
 class ClaudeAPIClient:
     """Handles communication with Claude API."""
     
-    def __init__(self):
-        """Initialize the API client."""
+    def __init__(self, cache: Optional[ResponseCache] = None):
+        """
+        Initialize the API client.
+        
+        Args:
+            cache: Response cache (default is a ResponseCache when enabled in config)
+        """
         self.client: Optional[anthropic.Anthropic] = None
         self.api_key: str = ""
+        self.base_url: Optional[str] = None
         self._connected: bool = False
+        if cache is None and config.RESPONSE_CACHE_ENABLED:
+            cache = ResponseCache()
+        self.cache = cache
+    
+    def without_retries(self) -> "ClaudeAPIClient":
+        """
+        Get a client whose requests the SDK does not retry.
+        
+        For callers with their own backoff, such as batch jobs. The copy
+        shares this client's connection pool and response cache.
+        """
+        clone = copy.copy(self)
+        if self.client is not None:
+            clone.client = self.client.with_options(max_retries=0)
+        return clone
     
-    def connect(self, api_key: str) -> APIResponse:
+    def connect(self, api_key: str, base_url: Optional[str] = None) -> APIResponse:
         """
         Connect to Claude API with provided key.
         
+        The key is validated by looking up the configured model, which is
+        not billed and needs no inference, over the shared connection pool.
+        
         Args:
             api_key: The API key for authentication
+            base_url: API endpoint (default from config, then the SDK default)
             
         Returns:
             APIResponse with connection status
         """
         try:
-            self.client = anthropic.Anthropic(api_key=api_key)
-            self.api_key = api_key
+            base_url = base_url or config.API_BASE_URL or None
+            if self.client is None or api_key != self.api_key or base_url != self.base_url:
+                self.client = anthropic.Anthropic(
+                    api_key=api_key,
+                    base_url=base_url,
+                    http_client=get_http_client()
+                )
+                self.api_key = api_key
+                self.base_url = base_url
             
             # Test connection
-            response = self.client.messages.create(
-                model=config.DEFAULT_MODEL,
-                max_tokens=config.TEST_MAX_TOKENS,
-                messages=[{"role": "user", "content": "test"}]
-            )
+            self.client.models.retrieve(config.DEFAULT_MODEL)
             
             self._connected = True
             return APIResponse(
@@ -50,13 +111,77 @@ class ClaudeAPIClient:
                 error=str(e)
             )
     
-    def send_message(self, prompt: str, max_tokens: Optional[int] = None) -> APIResponse:
+    def _lookup(
+        self,
+        prompt: str,
+        max_tokens: int,
+        use_cache: bool
+    ) -> Tuple[Optional[str], Optional[APIResponse]]:
+        """
+        Look a request up in the response cache.
+        
+        Returns:
+            Tuple of (cache key or None when caching is off, cached response or None)
+        """
+        if self.cache is None:
+            return None, None
+        
+        key = ResponseCache.make_key(config.DEFAULT_MODEL, max_tokens, prompt)
+        if not use_cache:
+            return key, None
+        return key, self.cache.get(key, len(prompt.encode('utf-8', errors='surrogatepass')))
+    
+    @staticmethod
+    def _error_details(error: Exception) -> Dict[str, Any]:
+        """Get the HTTP status and Retry-After delay of a failed request, if any."""
+        details = {"status_code": getattr(error, "status_code", None), "retry_after": None}
+        response = getattr(error, "response", None)
+        if response is not None:
+            try:
+                details["retry_after"] = float(response.headers.get("retry-after"))
+            except (TypeError, ValueError):
+                pass
+        return details
+    
+    @staticmethod
+    def _messages(prompt: str, context: Optional[str]) -> List[Dict]:
+        """Build the request messages, marking the context as a cacheable prefix."""
+        if not context:
+            return [{"role": "user", "content": prompt}]
+        
+        block = {"type": "text", "text": context}
+        if config.PROMPT_CACHING:
+            block["cache_control"] = {"type": "ephemeral"}
+        return [{"role": "user", "content": [block, {"type": "text", "text": prompt}]}]
+    
+    @staticmethod
+    def _usage(usage) -> Dict[str, int]:
+        """Get token counts from response usage, including prompt cache reads and writes."""
+        cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+        cache_creation = getattr(usage, "cache_creation_input_tokens", None) or 0
+        return {
+            "tokens_used": usage.input_tokens + cache_read + cache_creation + usage.output_tokens,
+            "cache_read_tokens": cache_read,
+            "cache_creation_tokens": cache_creation
+        }
+    
+    def send_message(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        use_cache: bool = True,
+        context: Optional[str] = None
+    ) -> APIResponse:
         """
         Send a message to Claude API.
         
         Args:
-            prompt: The prompt to send
+            prompt: The prompt to send (the instructions when context is given)
             max_tokens: Maximum tokens for response (default from config)
+            use_cache: Answer from the response cache when possible; when
+                False the request is always sent and its answer re-cached
+            context: Stable text sent before the prompt as a prompt-cached
+                block, e.g. from PromptBuilder.split_prompt()
             
         Returns:
             APIResponse with the result
@@ -67,26 +192,131 @@ class ClaudeAPIClient:
                 error="Not connected to API. Please login first."
             )
         
+        tokens = max_tokens or config.MAX_TOKENS
+        key, cached = self._lookup((context or "") + prompt, tokens, use_cache)
+        if cached is not None:
+            return cached
+        
         try:
-            tokens = max_tokens or config.MAX_TOKENS
-            
             response = self.client.messages.create(
                 model=config.DEFAULT_MODEL,
                 max_tokens=tokens,
-                messages=[{"role": "user", "content": prompt}]
+                messages=self._messages(prompt, context)
             )
             
-            return APIResponse(
+            result = APIResponse(
                 success=True,
                 content=response.content[0].text,
                 model=config.DEFAULT_MODEL,
-                tokens_used=response.usage.input_tokens + response.usage.output_tokens
+                **self._usage(response.usage)
             )
+            if key is not None:
+                self.cache.put(key, result)
+            return result
             
         except Exception as e:
             return APIResponse(
                 success=False,
-                error=str(e)
+                error=str(e),
+                **self._error_details(e)
+            )
+    
+    def stream_message(
+        self,
+        prompt: str,
+        on_text: Callable[[str], None],
+        max_tokens: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        use_cache: bool = True,
+        context: Optional[str] = None
+    ) -> APIResponse:
+        """
+        Send a message to Claude API and stream the answer as it is generated.
+        
+        Text deltas are coalesced and handed to on_text at most once per
+        flush interval (the first delta is passed on immediately), so a UI
+        is not flooded with one update per token. on_text is called on the
+        calling thread.
+        
+        Args:
+            prompt: The prompt to send (the instructions when context is given)
+            on_text: Called with each batch of new text
+            max_tokens: Maximum tokens for response (default from config)
+            flush_interval: Seconds between on_text calls (default from config)
+            use_cache: Answer from the response cache when possible (a cached
+                answer is passed to on_text in one call)
+            context: Stable text sent before the prompt as a prompt-cached block
+            
+        Returns:
+            APIResponse with the full text and streaming timings; on failure
+            the error and any text received before it
+        """
+        if not self.is_connected():
+            return APIResponse(
+                success=False,
+                error="Not connected to API. Please login first."
+            )
+        
+        tokens = max_tokens or config.MAX_TOKENS
+        key, cached = self._lookup((context or "") + prompt, tokens, use_cache)
+        if cached is not None:
+            on_text(cached.content)
+            return cached
+        
+        if flush_interval is None:
+            flush_interval = config.STREAM_FLUSH_MS / 1000
+        
+        received = []
+        pending = []
+        start = time.perf_counter()
+        first_token = None
+        last_flush = start
+        try:
+            with self.client.messages.stream(
+                model=config.DEFAULT_MODEL,
+                max_tokens=tokens,
+                messages=self._messages(prompt, context)
+            ) as stream:
+                for text in stream.text_stream:
+                    now = time.perf_counter()
+                    if first_token is None:
+                        first_token = now
+                        last_flush = now - flush_interval
+                    received.append(text)
+                    pending.append(text)
+                    if now - last_flush >= flush_interval:
+                        on_text("".join(pending))
+                        pending.clear()
+                        last_flush = now
+                message = stream.get_final_message()
+            
+            if pending:
+                on_text("".join(pending))
+            end = time.perf_counter()
+            
+            output_tokens = message.usage.output_tokens
+            generating = end - first_token if first_token is not None else 0
+            result = APIResponse(
+                success=True,
+                content="".join(received),
+                model=config.DEFAULT_MODEL,
+                time_to_first_token=first_token - start if first_token is not None else None,
+                tokens_per_second=output_tokens / generating if generating > 0 else None,
+                **self._usage(message.usage)
+            )
+            if key is not None:
+                self.cache.put(key, result)
+            return result
+            
+        except Exception as e:
+            if pending:
+                on_text("".join(pending))
+            return APIResponse(
+                success=False,
+                content="".join(received) or None,
+                error=str(e),
+                time_to_first_token=first_token - start if first_token is not None else None,
+                **self._error_details(e)
             )
     
     def is_connected(self) -> bool:
@@ -97,4 +327,5 @@ class ClaudeAPIClient:
         """Disconnect from API."""
         self.client = None
         self.api_key = ""
+        self.base_url = None
         self._connected = False
@@ -1,18 +1,20 @@
 """Main application module."""
 
+import threading
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
 from pathlib import Path
-import threading
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
 from .config import config, theme, CategoryConfig
-from .api_client import ClaudeAPIClient
 from .file_manager import FileManager
-from .prompt_builder import PromptBuilder
-from .ui.pages import FilesPage, DocsPage
-from .ui.modern_pages import ModernLoginPage, ModernPromptPage, ModernResultPage
-from .ui.modern_widgets import ModernStatusBadge, ModernDivider
+from .models import ChangeBatch, IngestResult, TreeNode
+from .category_rules import CategoryRules, load_rules_text, rules_path, save_rules_text
+from .prompt_builder import PromptBuilder, PromptCache, PromptStats
+from .scanner import format_size
+from .tasks import TaskRunner
+from .watcher import FileWatcher, create_watcher
+from .ui.modern_widgets import ModernStatusBadge, ModernDivider, ModernProgressBar
 
 
 class ClaudePromptGeneratorApp:
@@ -33,12 +35,26 @@ class ClaudePromptGeneratorApp:
         # Configure window background
         self.root.configure(fg_color=theme.BG_PRIMARY)
         
-        # Initialize components
-        self.api_client = ClaudeAPIClient()
+        # Initialize components; the API client (and anthropic) is loaded on first login
+        self.api_client = None
         self.file_manager = FileManager()
+        self.prompt_cache = PromptCache()
+        self._preview_lock = threading.Lock()
+        self._preview_parts: Optional[Tuple[str, str]] = None  # (context, instructions)
+        self.watcher: Optional[FileWatcher] = None
+        self._scan_kind: Optional[str] = None  # "open", "refresh" or "changes"
+        self._pending_changes: Optional[ChangeBatch] = None
+        self._batch_job = None
         
         # Setup UI
         self.setup_ui()
+        
+        # Blocking work runs here; results come back on the main loop
+        self.tasks = TaskRunner(
+            self.root,
+            on_progress=self._show_task_progress,
+            on_error=self._show_task_error
+        )
     
     def setup_ui(self):
         """Setup the user interface."""
@@ -167,6 +183,9 @@ class ClaudePromptGeneratorApp:
             justify="left"
         )
         self.status_label.pack(anchor="w")
+        
+        # Background task progress
+        self.task_progress = ModernProgressBar(footer_frame)
     
     def setup_main_content(self):
         """Setup the main content area."""
@@ -185,54 +204,81 @@ class ClaudePromptGeneratorApp:
         self.main_container.grid_rowconfigure(0, weight=1)
         self.main_container.grid_columnconfigure(0, weight=1)
         
-        # Create pages
-        self.pages = {}
+        # Pages are built on first use
+        self.pages: Dict[str, ctk.CTkFrame] = {}
         
-        self.pages["login"] = ModernLoginPage(
-            self.main_container,
-            on_login=self.handle_login,
-            on_test=self.handle_test_connection
-        )
+        # Show initial page
+        self.show_page("login")
+    
+    def get_page(self, page_name: str) -> ctk.CTkFrame:
+        """Get a page, building it the first time it is needed."""
+        page = self.pages.get(page_name)
+        if page is None:
+            page = self.pages[page_name] = self._create_page(page_name)
+        return page
+    
+    def _create_page(self, page_name: str) -> ctk.CTkFrame:
+        """Build a page, importing its UI module on demand."""
+        if page_name == "login":
+            from .ui.modern_pages import ModernLoginPage
+            return ModernLoginPage(
+                self.main_container,
+                on_login=self.handle_login,
+                on_test=self.handle_test_connection
+            )
         
-        self.pages["files"] = FilesPage(
-            self.main_container,
-            on_open=self.handle_open_repository,
-            on_refresh=self.handle_refresh_files,
-            on_add=self.handle_add_to_category,
-            on_remove=self.handle_remove_from_category
-        )
+        if page_name == "files":
+            from .ui.pages import FilesPage
+            return FilesPage(
+                self.main_container,
+                on_open=self.handle_open_repository,
+                on_refresh=self.handle_refresh_files,
+                on_add=self.handle_add_to_category,
+                on_remove=self.handle_remove_from_category,
+                on_watch=self.handle_toggle_watch,
+                on_rules=self.handle_edit_rules,
+                on_add_deps=self.handle_add_with_dependencies
+            )
         
-        self.pages["prompt"] = ModernPromptPage(
-            self.main_container,
-            on_generate=self.handle_generate_preview,
-            on_copy=self.handle_copy_prompt,
-            on_save=self.handle_save_prompt,
-            on_send=self.handle_send_to_claude,
-            on_clear=self.handle_clear_prompt
-        )
+        if page_name == "prompt":
+            from .ui.modern_pages import ModernPromptPage
+            return ModernPromptPage(
+                self.main_container,
+                on_generate=self.handle_generate_preview,
+                on_copy=self.handle_copy_prompt,
+                on_save=self.handle_save_prompt,
+                on_send=self.handle_send_to_claude,
+                on_clear=self.handle_clear_prompt,
+                on_suggest=self.handle_suggest_files
+            )
         
-        self.pages["result"] = ModernResultPage(
-            self.main_container,
-            on_copy=self.handle_copy_result,
-            on_save=self.handle_save_result,
-            on_apply=self.handle_apply_changes
-        )
+        if page_name == "result":
+            from .ui.modern_pages import ModernResultPage
+            return ModernResultPage(
+                self.main_container,
+                on_copy=self.handle_copy_result,
+                on_save=self.handle_save_result,
+                on_apply=self.handle_apply_changes,
+                on_cancel=self.handle_cancel_batch
+            )
         
-        self.pages["docs"] = DocsPage(
-            self.main_container,
-            on_docstrings=self.handle_generate_docstrings,
-            on_readme=self.handle_generate_readme,
-            on_api_docs=self.handle_generate_api_docs,
-            on_analyze=self.handle_analyze_code
-        )
+        if page_name == "docs":
+            from .ui.pages import DocsPage
+            return DocsPage(
+                self.main_container,
+                on_docstrings=self.handle_generate_docstrings,
+                on_readme=self.handle_generate_readme,
+                on_api_docs=self.handle_generate_api_docs,
+                on_analyze=self.handle_analyze_code
+            )
         
-        # Show initial page
-        self.show_page("login")
+        raise KeyError(page_name)
     
     def show_page(self, page_name: str):
-        """Show a specific page."""
-        for name, page in self.pages.items():
-            if name == page_name:
+        """Show a specific page, building it on first navigation."""
+        current = self.get_page(page_name)
+        for page in self.pages.values():
+            if page is current:
                 page.grid(row=0, column=0, sticky="nsew")
             else:
                 page.grid_forget()
@@ -254,10 +300,27 @@ class ClaudePromptGeneratorApp:
         """Update status message."""
         self.status_label.configure(text=message)
     
+    def _show_task_progress(self, labels: List[str]):
+        """Show background tasks that are running, or hide the progress bar."""
+        if labels:
+            self.update_status(labels[-1] + "...")
+            if not self.task_progress.winfo_ismapped():
+                self.task_progress.pack(fill="x", pady=(config.SPACING_SM, 0))
+                self.task_progress.start()
+        elif self.task_progress.winfo_ismapped():
+            self.task_progress.stop()
+            self.task_progress.pack_forget()
+    
+    def _show_task_error(self, label: str, error: Exception):
+        """Report a background task that failed without its own error handler."""
+        task = label or "Tarefa em segundo plano"
+        self.update_status(f"{task}: falhou")
+        messagebox.showerror("Erro", f"{task} falhou:\n{error}")
+    
     # Login handlers
     def handle_login(self):
         """Handle login button click."""
-        login_page = self.pages["login"]
+        login_page = self.get_page("login")
         api_key = login_page.get_api_key()
         
         if not api_key:
@@ -265,11 +328,29 @@ class ClaudePromptGeneratorApp:
             return
         
         login_page.set_loading(True)
-        self.root.update()
-        
-        response = self.api_client.connect(api_key)
-        
-        login_page.set_loading(False)
+        self.tasks.submit(
+            self._connect,
+            api_key,
+            on_done=self._handle_login_response,
+            on_error=self._handle_login_error,
+            label="Conectando ao Claude API",
+            key="login"
+        )
+    
+    def _connect(self, api_key: str):
+        """Connect on a worker thread, importing the API client on first use."""
+        if self.api_client is None:
+            from .api_client import ClaudeAPIClient
+            self.api_client = ClaudeAPIClient()
+        return self.api_client.connect(api_key)
+    
+    def is_connected(self) -> bool:
+        """Check if a login succeeded."""
+        return self.api_client is not None and self.api_client.is_connected()
+    
+    def _handle_login_response(self, response):
+        """Handle the outcome of a login task."""
+        self.get_page("login").set_loading(False)
         
         if response.success:
             self.connection_indicator.set_status("connected", "Conectado")
@@ -280,9 +361,16 @@ class ClaudePromptGeneratorApp:
             self.connection_indicator.set_status("error", "Erro de conexão")
             messagebox.showerror("Erro de Conexão", f"Falha ao conectar:\n{response.error}")
     
+    def _handle_login_error(self, error: Exception):
+        """Handle a login task that raised."""
+        self.get_page("login").set_loading(False)
+        self.connection_indicator.set_status("error", "Erro de conexão")
+        self.update_status("Falha ao conectar")
+        messagebox.showerror("Erro de Conexão", f"Falha ao conectar:\n{error}")
+    
     def handle_test_connection(self):
         """Handle test connection button click."""
-        login_page = self.pages["login"]
+        login_page = self.get_page("login")
         if not login_page.get_api_key():
             messagebox.showwarning("Aviso", "Insira uma API Key primeiro")
             return
@@ -294,22 +382,97 @@ class ClaudePromptGeneratorApp:
         folder = filedialog.askdirectory(title="Selecione o Repositório")
         
         if folder:
+            self._stop_watcher()
+            self._pending_changes = None
             if self.file_manager.set_project_path(folder):
-                files_page = self.pages["files"]
+                files_page = self.get_page("files")
                 files_page.set_project_path(folder)
                 
-                tree = self.file_manager.scan_directory()
-                files_page.set_files_content(tree)
+                # Browsable right away, folders listed as they are opened
+                files_page.set_tree(
+                    TreeNode(name=Path(folder).name, path=folder, is_dir=True),
+                    lister=self.file_manager.scanner.list_directory
+                )
                 
-                self.update_status(f"Projeto carregado: {Path(folder).name}")
+                self._submit_scan(
+                    "open",
+                    self.file_manager.scan_project,
+                    on_done=lambda root: self._handle_project_loaded(folder, root),
+                    label=f"Lendo {Path(folder).name}"
+                )
+    
+    def _handle_project_loaded(self, folder: str, root: Optional[TreeNode]):
+        """Show the tree of a newly opened project."""
+        files_page = self.get_page("files")
+        if root is not None:
+            files_page.set_tree(root)
+        
+        if files_page.is_watching():
+            self._start_watcher()
+        
+        self.update_status(f"Projeto carregado: {Path(folder).name}")
+        self._update_search_index()
     
     def handle_refresh_files(self):
         """Handle refresh files button click."""
-        if self.file_manager.project_path:
-            files_page = self.pages["files"]
-            tree = self.file_manager.scan_directory()
-            files_page.set_files_content(tree)
-            self.update_status("Arquivos atualizados")
+        if not self.file_manager.project_path:
+            return
+        if self._scan_kind in ("open", "refresh"):
+            # The running scan already reads the whole project
+            self.update_status("Leitura do projeto já em andamento")
+            return
+        
+        self._submit_scan(
+            "refresh",
+            self.file_manager.scan_project,
+            on_done=self._handle_files_refreshed,
+            label="Atualizando arquivos"
+        )
+    
+    def _handle_files_refreshed(self, root: Optional[TreeNode]):
+        """Show the rescanned project tree."""
+        if root is not None:
+            self.get_page("files").set_tree(root)
+        
+        index = self.file_manager.dir_index
+        listed = index.listed if index else 0
+        self.update_status(f"Arquivos atualizados ({listed} pasta(s) relida(s))")
+        self._update_search_index()
+    
+    def _submit_scan(self, kind: str, func: Callable, *args, on_done: Callable, label: str):
+        """
+        Run a task that reads or updates the project tree.
+        
+        These tasks share the "scan" key. Watcher batches arriving meanwhile
+        are kept and applied once the task is done, whether it failed or not.
+        
+        Args:
+            kind: "open", "refresh" or "changes"
+            func: Function to run in the background
+            on_done: Called with the function's result on the UI thread
+            label: Text shown while the task runs
+        """
+        def finish(result):
+            self._scan_kind = None
+            on_done(result)
+            self._flush_changes()
+        
+        def fail(error: Exception):
+            self._scan_kind = None
+            self._show_task_error(label, error)
+            self._flush_changes()
+        
+        self._scan_kind = kind
+        self.tasks.submit(func, *args, on_done=finish, on_error=fail, label=label, key="scan")
+    
+    def _update_search_index(self):
+        """Index new and changed project files in the background."""
+        if self.file_manager.project_tree is not None:
+            self.tasks.submit(
+                self.file_manager.update_search_index,
+                label="Indexando arquivos",
+                key="search"
+            )
     
     def handle_add_to_category(self, category: str):
         """Handle add to category button click."""
@@ -317,59 +480,350 @@ class ClaudePromptGeneratorApp:
             messagebox.showwarning("Aviso", "Abra um repositório primeiro")
             return
         
-        files = filedialog.askopenfilenames(
-            initialdir=self.file_manager.project_path,
-            title="Selecione arquivos"
-        )
+        # Files checked in the tree go straight in; otherwise pick them
+        files_page = self.get_page("files")
+        files = files_page.get_checked_files()
+        if files:
+            files_page.clear_checked()
+        else:
+            files = filedialog.askopenfilenames(
+                initialdir=self.file_manager.project_path,
+                title="Selecione arquivos"
+            )
         
         if files:
-            files_page = self.pages["files"]
-            widget = files_page.get_category_widget(category)
-            
-            for filepath in files:
-                if self.file_manager.add_file(filepath, category):
-                    filename = Path(filepath).name
-                    widget.add_file(filename)
-            
-            count = self.file_manager.get_segment_count()
-            self.update_status(f"{len(files)} arquivo(s) adicionado(s). Total: {count}")
+            self.tasks.submit(
+                self.file_manager.add_files,
+                [(f, category) for f in files],
+                on_done=self._handle_files_added,
+                on_error=self._handle_add_error,
+                label=f"Carregando {len(files)} arquivo(s)"
+            )
+    
+    def handle_add_with_dependencies(self, depth: int):
+        """Attach the checked files and the project files they import."""
+        if not self.file_manager.project_path:
+            messagebox.showwarning("Aviso", "Abra um repositório primeiro")
+            return
+        if self.file_manager.project_tree is None:
+            messagebox.showwarning("Aviso", "Aguarde a leitura do projeto")
+            return
+        
+        files_page = self.get_page("files")
+        files = files_page.get_checked_files()
+        if not files:
+            messagebox.showwarning("Aviso", "Marque arquivos na árvore primeiro")
+            return
+        files_page.clear_checked()
+        
+        self.tasks.submit(
+            self.file_manager.add_with_dependencies,
+            files,
+            depth,
+            on_done=lambda results: self._handle_files_added(results, "Dependências: "),
+            on_error=self._handle_add_error,
+            label="Resolvendo dependências"
+        )
+    
+    def _handle_files_added(self, results: List[IngestResult], prefix: str = ""):
+        """List files loaded by a background task and report the skipped ones."""
+        files_page = self.get_page("files")
+        by_category: Dict[str, List[str]] = {}
+        for result in results:
+            if result.added:
+                by_category.setdefault(result.category, []).append(Path(result.path).name)
+        for category, names in by_category.items():
+            files_page.get_category_widget(category).add_files(names)
+        self._sync_watched_files()
+        
+        added = sum(1 for r in results if r.added)
+        parts = [f"{added} arquivo(s) adicionado(s)"]
+        binary = sum(1 for r in results if r.status == "binary")
+        if binary:
+            parts.append(f"{binary} binário(s) ignorado(s)")
+        duplicates = sum(1 for r in results if r.status == "duplicate")
+        if duplicates:
+            parts.append(f"{duplicates} já anexado(s)")
+        truncated = sum(1 for r in results if r.truncated)
+        if truncated:
+            parts.append(f"{truncated} truncado(s) em {format_size(config.MAX_FILE_BYTES)}")
+        errors = [r for r in results if r.status == "error"]
+        if errors:
+            parts.append(f"{len(errors)} com erro")
+        parts.append(f"Total: {self.file_manager.get_segment_count()}")
+        self.update_status(prefix + ", ".join(parts))
+        
+        if errors:
+            details = "\n".join(f"{Path(r.path).name}: {r.error}" for r in errors[:10])
+            messagebox.showwarning("Aviso", f"Não foi possível ler {len(errors)} arquivo(s):\n{details}")
+    
+    def _handle_add_error(self, error: Exception):
+        """Handle an add-files task that raised."""
+        self._sync_watched_files()
+        self.update_status("Falha ao adicionar arquivos")
+        messagebox.showerror("Erro", f"Falha ao adicionar arquivos:\n{error}")
+    
+    def handle_edit_rules(self):
+        """Open the category rules editor for the current project."""
+        project = self.file_manager.project_path
+        if not project:
+            messagebox.showwarning("Aviso", "Abra um repositório primeiro")
+            return
+        
+        window = ctk.CTkToplevel(self.root)
+        window.title("Regras de Categorias")
+        window.geometry("700x500")
+        
+        title = ctk.CTkLabel(
+            window,
+            text=f"Regras de {Path(project).name}",
+            font=ctk.CTkFont(size=20, weight="bold")
+        )
+        title.pack(pady=20)
+        
+        text = ctk.CTkTextbox(window, font=ctk.CTkFont(size=12, family="Courier"))
+        text.pack(fill="both", expand=True, padx=20, pady=(0, 10))
+        text.insert("1.0", load_rules_text(project))
+        
+        apply_btn = ctk.CTkButton(
+            window,
+            text="Salvar e Aplicar",
+            command=lambda: self._apply_rules(window, text.get("1.0", "end-1c")),
+            height=40,
+            font=ctk.CTkFont(size=14)
+        )
+        apply_btn.pack(pady=20)
+    
+    def _apply_rules(self, window, text: str):
+        """Save the edited rules and add every matching file."""
+        try:
+            rules = CategoryRules.parse(text)
+        except ValueError as e:
+            messagebox.showerror("Erro nas Regras", str(e), parent=window)
+            return
+        
+        if self.file_manager.project_tree is None or self.tasks.is_running("scan"):
+            messagebox.showwarning("Aviso", "Aguarde a leitura do projeto", parent=window)
+            return
+        
+        project = self.file_manager.project_path
+        if not save_rules_text(project, text):
+            messagebox.showerror(
+                "Erro",
+                f"Não foi possível salvar as regras em:\n{rules_path(project)}",
+                parent=window
+            )
+            return
+        window.destroy()
+        self.tasks.submit(
+            self.file_manager.apply_rules,
+            rules,
+            on_done=lambda results: self._handle_files_added(results, "Regras: "),
+            on_error=self._handle_add_error,
+            label="Aplicando regras"
+        )
     
     def handle_remove_from_category(self, category: str):
         """Handle remove from category button click."""
-        files_page = self.pages["files"]
+        files_page = self.get_page("files")
         widget = files_page.get_category_widget(category)
         widget.clear()
         
         removed = self.file_manager.remove_files_by_category(category)
+        self._sync_watched_files()
         count = self.file_manager.get_segment_count()
         self.update_status(f"{removed} arquivo(s) removido(s). Total: {count}")
     
+    def handle_toggle_watch(self, enabled: bool):
+        """Handle watch switch toggle."""
+        if enabled:
+            if not self.file_manager.project_path:
+                messagebox.showwarning("Aviso", "Abra um repositório primeiro")
+                self.get_page("files").watch_switch.deselect()
+                return
+            self._start_watcher()
+            self.update_status("Monitorando alterações no projeto")
+        else:
+            self._stop_watcher()
+            self.update_status("Monitoramento desativado")
+    
+    def _start_watcher(self):
+        """Start (or restart) watching the current project."""
+        self._stop_watcher()
+        self.watcher = create_watcher(
+            self.file_manager.project_path,
+            lambda batch: self.root.after(0, self._apply_file_changes, batch)
+        )
+        self._sync_watched_files()
+    
+    def _stop_watcher(self):
+        """Stop the project watcher if running."""
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+    
+    def _sync_watched_files(self):
+        """Tell the watcher which segment files to track."""
+        if self.watcher is not None:
+            self.watcher.set_files(s.path for s in self.file_manager.code_segments)
+    
+    def _apply_file_changes(self, batch: ChangeBatch):
+        """Apply a watcher change batch in the background."""
+        if self.watcher is None:
+            return
+        
+        pending = self._pending_changes
+        if pending is not None:
+            pending.dirs |= batch.dirs
+            pending.files |= batch.files
+            pending.overflow |= batch.overflow
+            batch = pending
+        
+        if self.tasks.is_running("scan"):
+            # Applied together once the running scan is done
+            self._pending_changes = batch
+            return
+        self._pending_changes = None
+        
+        self._submit_scan(
+            "changes",
+            self.file_manager.apply_changes,
+            batch,
+            on_done=lambda _: self._handle_changes_applied(batch),
+            label="Aplicando alterações"
+        )
+    
+    def _flush_changes(self):
+        """Apply watcher batches held back while a scan was running."""
+        if self._pending_changes is not None and not self.tasks.is_running("scan"):
+            self._apply_file_changes(ChangeBatch())
+    
+    def _handle_changes_applied(self, batch: ChangeBatch):
+        """Show the tree after a change batch."""
+        # The live tree may have been replaced by a full rescan
+        self.get_page("files").set_tree(self.file_manager.project_tree)
+        
+        changed = len(batch.dirs) + len(batch.files)
+        self.update_status(f"{changed} alteração(ões) detectada(s) no projeto")
+    
     # Prompt handlers
-    def handle_generate_preview(self):
-        """Handle generate preview button click."""
-        if not self.file_manager.code_segments:
+    def handle_generate_preview(self, on_ready: Optional[Callable[[], None]] = None):
+        """
+        Handle generate preview button click.
+        
+        Args:
+            on_ready: Called on the UI thread once the preview is shown
+        """
+        if not self.file_manager.get_segment_count():
             messagebox.showwarning("Aviso", "Adicione arquivos às categorias primeiro")
             return
         
-        prompt_page = self.pages["prompt"]
-        user_request = prompt_page.get_user_instructions()
-        
-        prompt = PromptBuilder.build_prompt(
-            user_request,
-            self.file_manager.code_segments
+        prompt_page = self.get_page("prompt")
+        self.tasks.submit(
+            self._build_preview,
+            prompt_page.get_user_instructions(),
+            prompt_page.is_packing_enabled(),
+            on_done=lambda built: self._handle_preview_built(*built, on_ready),
+            on_error=self._handle_preview_error,
+            label="Gerando preview",
+            key="preview"
         )
+    
+    def _build_preview(self, user_request: str, packing: bool):
+        """Pack and render the prompt (worker thread)."""
+        # Builds share the block cache, so a replaced build finishes first
+        with self._preview_lock:
+            pack = None
+            if packing:
+                pack = PromptBuilder.pack(
+                    user_request,
+                    self.file_manager.code_segments,
+                    config.CONTEXT_TOKEN_BUDGET
+                )
+            
+            # Unchanged files reuse their rendered blocks and memoized statistics
+            stats = PromptStats(cache=self.prompt_cache)
+            segments = self.file_manager.code_segments
+            parts = None
+            if config.PROMPT_LAYOUT == "context_first" and PromptBuilder.has_context(segments, pack):
+                # Kept apart so that sending marks the context as cacheable
+                parts = (
+                    "".join(stats.track(PromptBuilder.iter_context(segments, pack, self.prompt_cache))),
+                    "".join(stats.track(PromptBuilder.iter_instructions(user_request)))
+                )
+                text = "".join(parts)
+            else:
+                text = "".join(stats.track(PromptBuilder.iter_prompt(
+                    user_request,
+                    segments,
+                    pack,
+                    cache=self.prompt_cache
+                )))
+            return text, parts, stats.to_dict(), pack
+    
+    def _handle_preview_built(
+        self,
+        text: str,
+        parts: Optional[Tuple[str, str]],
+        stats: Dict[str, int],
+        pack,
+        on_ready=None
+    ):
+        """Show a prompt built in the background."""
+        self.get_page("prompt").set_prompt_preview(text)
+        self._preview_parts = parts
+        status = f"Preview gerado: {stats['characters']} chars, ~{stats['estimated_tokens']} tokens"
+        if pack is not None and pack.has_omissions():
+            status += (
+                f" ({len(pack.truncated)} truncado(s), {len(pack.summarized)} resumido(s), "
+                f"{len(pack.dropped)} omitido(s))"
+            )
+        self.update_status(status)
+        if on_ready is not None:
+            on_ready()
+    
+    def _handle_preview_error(self, error: Exception):
+        """Handle a preview task that raised."""
+        self.update_status("Falha ao gerar o preview")
+        messagebox.showerror("Erro", f"Não foi possível gerar o prompt:\n{error}")
+    
+    def handle_suggest_files(self):
+        """Attach the project files most relevant to the instructions."""
+        if not self.file_manager.project_path:
+            messagebox.showwarning("Aviso", "Abra um repositório primeiro")
+            return
         
-        prompt_page.set_prompt_preview(prompt)
+        user_request = self.get_page("prompt").get_user_instructions()
+        if not user_request:
+            messagebox.showwarning("Aviso", "Descreva o que você quer fazer primeiro")
+            return
+        if self.file_manager.search_index is None:
+            # Opened in the background, after the project is read
+            messagebox.showinfo("Aviso", "Índice em construção, tente novamente em instantes")
+            return
         
-        stats = PromptBuilder.get_prompt_stats(prompt)
-        self.update_status(
-            f"Preview gerado: {stats['characters']} chars, "
-            f"~{stats['estimated_tokens']} tokens"
+        # A query during indexing sees the files indexed so far
+        self.tasks.submit(
+            self.file_manager.suggest_files,
+            user_request,
+            on_done=lambda results: self._handle_files_added(results, "Sugestão: "),
+            on_error=self._handle_add_error,
+            label="Buscando arquivos relevantes"
+        )
+    
+    def _pack_segments(self, user_request: str):
+        """Pack segments into the context budget when enabled on the prompt page."""
+        if not self.get_page("prompt").is_packing_enabled():
+            return None
+        return PromptBuilder.pack(
+            user_request,
+            self.file_manager.code_segments,
+            config.CONTEXT_TOKEN_BUDGET
         )
     
     def handle_copy_prompt(self):
         """Handle copy prompt button click."""
-        prompt_page = self.pages["prompt"]
+        prompt_page = self.get_page("prompt")
         prompt = prompt_page.get_prompt_preview()
         
         if prompt:
@@ -381,12 +835,15 @@ class ClaudePromptGeneratorApp:
     
     def handle_save_prompt(self):
         """Handle save prompt button click."""
-        prompt_page = self.pages["prompt"]
-        prompt = prompt_page.get_prompt_preview()
+        prompt_page = self.get_page("prompt")
         
-        if not prompt:
-            messagebox.showwarning("Aviso", "Gere um preview primeiro")
-            return
+        # The preview is read-only, so the prompt is streamed straight from the segments
+        prompt = None
+        if not self.file_manager.get_segment_count():
+            prompt = prompt_page.get_prompt_preview()
+            if not prompt:
+                messagebox.showwarning("Aviso", "Gere um preview primeiro")
+                return
         
         filename = filedialog.asksaveasfilename(
             defaultextension=".txt",
@@ -400,7 +857,16 @@ class ClaudePromptGeneratorApp:
         if filename:
             try:
                 with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(prompt)
+                    if prompt is None:
+                        user_request = prompt_page.get_user_instructions()
+                        PromptBuilder.write_prompt(
+                            f,
+                            user_request,
+                            self.file_manager.code_segments,
+                            self._pack_segments(user_request)
+                        )
+                    else:
+                        f.write(prompt)
                 self.update_status(f"Prompt salvo: {Path(filename).name}")
                 messagebox.showinfo("Sucesso", "Prompt salvo com sucesso!")
             except Exception as e:
@@ -408,27 +874,34 @@ class ClaudePromptGeneratorApp:
     
     def handle_clear_prompt(self):
         """Handle clear prompt button click."""
-        prompt_page = self.pages["prompt"]
+        prompt_page = self.get_page("prompt")
         prompt_page.clear_all()
+        self._preview_parts = None
         self.update_status("Prompt limpo")
     
     def handle_send_to_claude(self):
         """Handle send to Claude button click."""
-        if not self.api_client.is_connected():
+        if not self.is_connected():
             messagebox.showerror("Erro", "Faça login primeiro!")
             return
         
-        if not self.file_manager.code_segments:
+        if not self.file_manager.get_segment_count():
             messagebox.showwarning("Aviso", "Adicione código primeiro")
             return
         
-        prompt_page = self.pages["prompt"]
+        prompt_page = self.get_page("prompt")
         prompt = prompt_page.get_prompt_preview()
         
         if not prompt:
-            self.handle_generate_preview()
-            prompt = prompt_page.get_prompt_preview()
-        
+            # Sent once the preview is built
+            self.handle_generate_preview(on_ready=self._send_preview)
+            return
+        self._send_preview()
+    
+    def _send_preview(self):
+        """Send the previewed prompt to Claude."""
+        prompt_page = self.get_page("prompt")
+        prompt = prompt_page.get_prompt_preview()
         if not prompt:
             messagebox.showerror("Erro", "Não foi possível gerar o prompt")
             return
@@ -438,30 +911,85 @@ class ClaudePromptGeneratorApp:
         self.update_status("Enviando para Claude...")
         self.show_page("result")
         
+        streaming = config.STREAM_RESPONSES
+        if streaming:
+            self.get_page("result").set_result("")
+        
+        # A context-first preview goes out as cacheable context plus instructions
+        context = None
+        if self._preview_parts is not None:
+            context, prompt = self._preview_parts
+        
         # Send in background thread
-        thread = threading.Thread(
-            target=self._send_to_claude_thread,
-            args=(prompt,)
+        self.tasks.submit(
+            self._send_to_claude_thread,
+            prompt,
+            context,
+            streaming,
+            prompt_page.is_cache_enabled(),
+            on_done=lambda response: self._handle_claude_response(response, streaming),
+            on_error=self._handle_send_error,
+            key="send"
         )
-        thread.daemon = True
-        thread.start()
     
-    def _send_to_claude_thread(self, prompt: str):
+    def _send_to_claude_thread(
+        self,
+        prompt: str,
+        context: Optional[str] = None,
+        streaming: bool = False,
+        use_cache: bool = True
+    ):
         """Send message to Claude in background thread."""
-        response = self.api_client.send_message(prompt)
-        self.root.after(0, self._handle_claude_response, response)
+        if streaming:
+            return self.api_client.stream_message(
+                prompt,
+                self._post_result_text,
+                use_cache=use_cache,
+                context=context
+            )
+        return self.api_client.send_message(prompt, use_cache=use_cache, context=context)
+    
+    def _post_result_text(self, text: str):
+        """Hand a streamed chunk from the worker thread to the UI thread."""
+        self.root.after(0, self._append_result_text, text)
+    
+    def _append_result_text(self, text: str):
+        """Append a streamed chunk to the result page."""
+        self.get_page("result").append_result(text)
+        self.update_status("Recebendo resposta...")
     
-    def _handle_claude_response(self, response):
+    def _handle_send_error(self, error: Exception):
+        """Handle a send task that raised."""
+        self.get_page("prompt").show_progress(False)
+        self.update_status("Falha ao enviar para Claude")
+        messagebox.showerror("Erro", f"Falha ao enviar para Claude:\n{error}")
+    
+    def _handle_claude_response(self, response, streamed: bool = False):
         """Handle Claude API response."""
-        prompt_page = self.pages["prompt"]
+        prompt_page = self.get_page("prompt")
         prompt_page.show_progress(False)
         
         if response.success:
-            result_page = self.pages["result"]
-            result_page.set_result(response.content)
+            result_page = self.get_page("result")
+            if not streamed:
+                result_page.set_result(response.content)
             
             tokens = response.tokens_used or 0
-            self.update_status(f"Resposta recebida ({tokens} tokens)")
+            if response.cached:
+                cache = self.api_client.cache
+                status = (
+                    f"Resposta do cache ({tokens} tokens, acertos {cache.hit_rate():.0%}, "
+                    f"{format_size(cache.bytes_saved)} economizados"
+                )
+            else:
+                status = f"Resposta recebida ({tokens} tokens"
+            if response.cache_read_tokens:
+                status += f", {response.cache_read_tokens} do cache de prompt"
+            if response.time_to_first_token is not None:
+                status += f", primeiro token em {response.time_to_first_token:.2f}s"
+            if response.tokens_per_second is not None:
+                status += f", {response.tokens_per_second:.1f} tokens/s"
+            self.update_status(status + ")")
         else:
             self.update_status(f"Erro: {response.error}")
             messagebox.showerror(
@@ -472,7 +1000,7 @@ class ClaudePromptGeneratorApp:
     # Result handlers
     def handle_copy_result(self):
         """Handle copy result button click."""
-        result_page = self.pages["result"]
+        result_page = self.get_page("result")
         result = result_page.get_result()
         
         if result:
@@ -482,7 +1010,7 @@ class ClaudePromptGeneratorApp:
     
     def handle_save_result(self):
         """Handle save result button click."""
-        result_page = self.pages["result"]
+        result_page = self.get_page("result")
         result = result_page.get_result()
         
         if not result.strip():
@@ -521,7 +1049,7 @@ class ClaudePromptGeneratorApp:
     
     def _open_apply_changes_window(self):
         """Open apply changes review window."""
-        result_page = self.pages["result"]
+        result_page = self.get_page("result")
         result = result_page.get_result()
         
         window = ctk.CTkToplevel(self.root)
@@ -562,21 +1090,20 @@ class ClaudePromptGeneratorApp:
         if not self._check_prerequisites():
             return
         
-        prompt_page = self.pages["prompt"]
+        prompt_page = self.get_page("prompt")
         prompt_page.set_user_instructions(
             "Gere docstrings detalhadas no formato apropriado para cada função, "
             "classe e módulo no código. Use o formato padrão da linguagem."
         )
         
-        self.show_page("prompt")
-        self.handle_generate_preview()
+        self._run_tool()
     
     def handle_generate_readme(self):
         """Handle generate README tool."""
         if not self._check_prerequisites():
             return
         
-        prompt_page = self.pages["prompt"]
+        prompt_page = self.get_page("prompt")
         prompt_page.set_user_instructions(
             "Gere um README.md completo incluindo:\n"
             "- Descrição do projeto\n"
@@ -595,7 +1122,7 @@ class ClaudePromptGeneratorApp:
         if not self._check_prerequisites():
             return
         
-        prompt_page = self.pages["prompt"]
+        prompt_page = self.get_page("prompt")
         prompt_page.set_user_instructions(
             "Gere documentação completa de API incluindo:\n"
             "- Endpoints disponíveis\n"
@@ -614,7 +1141,7 @@ class ClaudePromptGeneratorApp:
         if not self._check_prerequisites():
             return
         
-        prompt_page = self.pages["prompt"]
+        prompt_page = self.get_page("prompt")
         prompt_page.set_user_instructions(
             "Análise completa do código incluindo:\n"
             "- Qualidade e organização\n"
@@ -626,16 +1153,74 @@ class ClaudePromptGeneratorApp:
             "- Documentação"
         )
         
-        self.show_page("prompt")
-        self.handle_generate_preview()
+        self._run_tool()
+    
+    def _run_tool(self):
+        """Preview a tool's prompt, or run it over every file in batch mode."""
+        if self.get_page("docs").is_batch_enabled():
+            self._run_batch(self.get_page("prompt").get_user_instructions())
+        else:
+            self.show_page("prompt")
+            self.handle_generate_preview()
+    
+    def _run_batch(self, instruction: str):
+        """Send an instruction over groups of files concurrently and show the merged report."""
+        if self.tasks.is_running("batch"):
+            messagebox.showwarning("Aviso", "Um lote já está em execução")
+            return
+        
+        from .batch import BatchJob
+        
+        job = BatchJob(self.api_client, instruction)
+        self._batch_job = job
+        result_page = self.get_page("result")
+        result_page.set_result("")
+        result_page.show_cancel(True)
+        self.show_page("result")
+        self.tasks.submit(
+            job.run,
+            list(self.file_manager.code_segments),
+            lambda done, total: self.root.after(
+                0, self.update_status, f"Lote: {done}/{total} grupo(s) concluído(s)"
+            ),
+            on_done=self._handle_batch_result,
+            on_error=self._handle_batch_error,
+            label="Processando lote",
+            key="batch"
+        )
+    
+    def handle_cancel_batch(self):
+        """Stop sending the groups of the running batch that have not started yet."""
+        if self._batch_job is not None:
+            self._batch_job.cancel()
+            self.update_status("Cancelando lote...")
+    
+    def _handle_batch_result(self, result):
+        """Show the merged report of a batch run."""
+        self._batch_job = None
+        result_page = self.get_page("result")
+        result_page.show_cancel(False)
+        result_page.set_result(result.report())
+        outcome = "cancelado" if result.cancelled else "concluído"
+        self.update_status(
+            f"Lote {outcome}: {result.file_count} arquivo(s) em {result.elapsed:.1f}s "
+            f"({result.files_per_minute():.0f} arquivos/min, {result.tokens_used()} tokens, "
+            f"{len(result.failed)} falha(s))"
+        )
+    
+    def _handle_batch_error(self, error: Exception):
+        """Handle a batch task that raised."""
+        self._batch_job = None
+        self.get_page("result").show_cancel(False)
+        self._show_task_error("Processando lote", error)
     
     def _check_prerequisites(self) -> bool:
         """Check if prerequisites are met for documentation tools."""
-        if not self.api_client.is_connected():
+        if not self.is_connected():
             messagebox.showerror("Erro", "Faça login primeiro!")
             return False
         
-        if not self.file_manager.code_segments:
+        if not self.file_manager.get_segment_count():
             messagebox.showwarning("Aviso", "Adicione código primeiro")
             return False
         
@@ -644,3 +1229,5 @@ class ClaudePromptGeneratorApp:
     def run(self):
         """Run the application."""
         self.root.mainloop()
+        self.tasks.shutdown()
+        self._stop_watcher()
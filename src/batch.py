@@ -0,0 +1,205 @@
+"""Batch mode: one instruction sent over many groups of files."""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from .models import APIResponse, CodeSegment
+from .config import config, CategoryConfig
+from .api_client import ClaudeAPIClient
+from .prompt_builder import PromptBuilder
+
+
+RETRYABLE_STATUS = {408, 409, 429}
+
+
+@dataclass
+class BatchItem:
+    """Represents one group of files and its answer."""
+    
+    name: str
+    segments: List[CodeSegment]
+    response: Optional[APIResponse] = None
+    attempts: int = 0
+
+
+@dataclass
+class BatchResult:
+    """Represents the outcome of a batch run."""
+    
+    instruction: str
+    items: List[BatchItem] = field(default_factory=list)
+    elapsed: float = 0.0
+    cancelled: bool = False
+    
+    @property
+    def file_count(self) -> int:
+        """Get the number of files sent."""
+        return sum(len(item.segments) for item in self.items)
+    
+    @property
+    def failed(self) -> List[BatchItem]:
+        """Get the groups that did not get an answer."""
+        return [i for i in self.items if i.response is None or not i.response.success]
+    
+    def files_per_minute(self) -> float:
+        """Get the throughput of the run."""
+        return self.file_count * 60 / self.elapsed if self.elapsed else 0.0
+    
+    def tokens_used(self) -> int:
+        """Get the total tokens billed for the run."""
+        return sum(i.response.tokens_used or 0 for i in self.items if i.response)
+    
+    def report(self) -> str:
+        """Merge every answer into one Markdown report, in group order."""
+        lines = [f"# Relatório em Lote\n\n## Solicitação:\n{self.instruction}\n"]
+        for item in self.items:
+            lines.append(f"\n---\n\n## {item.name}\n\n")
+            if item.response is None:
+                lines.append("_Não processado (lote cancelado)._\n")
+            elif item.response.success:
+                lines.append(item.response.content.rstrip() + "\n")
+            else:
+                lines.append(f"_Erro: {item.response.error}_\n")
+        
+        if self.failed:
+            lines.append(f"\n---\n\n{len(self.failed)} de {len(self.items)} grupo(s) sem resposta.\n")
+        return "".join(lines)
+
+
+class BatchJob:
+    """
+    Sends one instruction over groups of segments concurrently.
+    
+    At most `concurrency` requests are in flight. Rate-limit and overload
+    errors pause every worker until the server's Retry-After delay (or an
+    exponential backoff with jitter) has passed, then the group is retried.
+    """
+    
+    def __init__(
+        self,
+        api_client: ClaudeAPIClient,
+        instruction: str,
+        concurrency: Optional[int] = None,
+        group_by: Optional[str] = None,
+        max_retries: Optional[int] = None,
+        backoff: Optional[float] = None
+    ):
+        """
+        Initialize the job.
+        
+        Args:
+            api_client: Connected API client
+            instruction: Instruction applied to every group
+            concurrency: Maximum requests in flight (default from config)
+            group_by: "file" or "category" (default from config)
+            max_retries: Retries per group on retryable errors (default from config)
+            backoff: Base backoff delay in seconds (default from config)
+        """
+        # The job's own backoff is the only retry layer
+        self.api_client = api_client.without_retries()
+        self.instruction = instruction
+        self.concurrency = max(1, concurrency or config.BATCH_CONCURRENCY)
+        self.group_by = group_by or config.BATCH_GROUP_BY
+        self.max_retries = max_retries if max_retries is not None else config.BATCH_MAX_RETRIES
+        self.backoff = backoff if backoff is not None else config.BATCH_BACKOFF_SECONDS
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._resume_at = 0.0
+    
+    @staticmethod
+    def make_groups(segments: List[CodeSegment], group_by: str = "file") -> List[Tuple[str, List[CodeSegment]]]:
+        """
+        Split selected segments into named groups.
+        
+        Args:
+            segments: Segments to split
+            group_by: "file" for one group per file, "category" for one per category
+        
+        Returns:
+            List of (group name, segments) in the order segments were given
+        """
+        selected = [s for s in segments if s.selected]
+        if group_by == "category":
+            groups: Dict[str, List[CodeSegment]] = {}
+            for segment in selected:
+                groups.setdefault(segment.category, []).append(segment)
+            return [(CategoryConfig.get_display_name(c), g) for c, g in groups.items()]
+        return [(f"Arquivo: `{Path(s.path).name}`", [s]) for s in selected]
+    
+    def cancel(self):
+        """Stop sending groups that have not started yet."""
+        self._cancelled.set()
+    
+    def run(
+        self,
+        segments: List[CodeSegment],
+        on_progress: Optional[Callable[[int, int], None]] = None
+    ) -> BatchResult:
+        """
+        Send every group and wait for the answers.
+        
+        Args:
+            segments: Segments to process
+            on_progress: Called from worker threads with (done, total)
+        
+        Returns:
+            BatchResult with one item per group
+        """
+        result = BatchResult(self.instruction, [
+            BatchItem(name, group) for name, group in self.make_groups(segments, self.group_by)
+        ])
+        total = len(result.items)
+        done = [0]
+        
+        def process(item: BatchItem):
+            self._send(item)
+            with self._lock:
+                done[0] += 1
+                finished = done[0]
+            if on_progress is not None:
+                on_progress(finished, total)
+        
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="batch") as executor:
+            list(executor.map(process, result.items))
+        result.elapsed = time.perf_counter() - start
+        result.cancelled = self._cancelled.is_set()
+        return result
+    
+    def _send(self, item: BatchItem):
+        """Send one group, retrying rate-limited and transient failures."""
+        prompt = PromptBuilder.build_prompt(self.instruction, item.segments)
+        while not self._cancelled.is_set():
+            self._wait_for_slot()
+            if self._cancelled.is_set():
+                return
+            
+            item.attempts += 1
+            item.response = self.api_client.send_message(prompt)
+            if item.response.success or not self._should_retry(item):
+                return
+            
+            delay = item.response.retry_after
+            if delay is None:
+                delay = self.backoff * 2 ** (item.attempts - 1) * random.uniform(0.5, 1.0)
+            with self._lock:
+                self._resume_at = max(self._resume_at, time.monotonic() + delay)
+    
+    def _should_retry(self, item: BatchItem) -> bool:
+        """Check if a failed group should be sent again."""
+        status = item.response.status_code
+        if status is None or item.attempts > self.max_retries:
+            return False
+        return status in RETRYABLE_STATUS or status >= 500
+    
+    def _wait_for_slot(self):
+        """Sleep while the job is backing off after a rate limit."""
+        while True:
+            with self._lock:
+                delay = self._resume_at - time.monotonic()
+            if delay <= 0 or self._cancelled.wait(min(delay, 0.5)):
+                return
@@ -0,0 +1,309 @@
+"""Glob rules that assign scanned files to categories."""
+
+import hashlib
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+from .models import TreeNode
+from .config import config, CategoryConfig
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_RULES = """# categoria: padrão, padrão, !exclusão
+# '*' não atravessa '/', '**' atravessa; padrões sem '/' valem em qualquer pasta
+# Linhas '!padrão' excluem arquivos de todas as regras; a primeira regra que casar vence
+tests: **/test_*.py, **/*_test.py, **/*.test.js, **/*.spec.ts
+docs: *.md
+config: *.json, *.yaml, *.yml
+!**/vendor/**
+"""
+
+# Folder and file names hinting at a category, checked from the file up
+NAME_HINTS = (
+    ('database', {'db', 'database', 'migrations', 'migration', 'repositories', 'repository', 'dao', 'sql'}),
+    ('models', {'models', 'model', 'entities', 'entity', 'schemas', 'schema', 'domain'}),
+    ('api', {'api', 'routes', 'router', 'routers', 'controllers', 'controller', 'endpoints', 'handlers'}),
+    ('utils', {'utils', 'util', 'helpers', 'helper', 'common', 'lib', 'shared'}),
+    ('frontend', {'frontend', 'client', 'components', 'ui', 'pages', 'views', 'static', 'public', 'web'}),
+    ('config', {'config', 'configs', 'settings', 'conf'}),
+    ('docs', {'docs', 'doc'}),
+)
+EXTENSION_CATEGORIES = {
+    '.md': 'docs', '.rst': 'docs', '.txt': 'docs',
+    '.json': 'config', '.yaml': 'config', '.yml': 'config', '.toml': 'config',
+    '.ini': 'config', '.cfg': 'config', '.xml': 'config',
+    '.sql': 'database',
+    '.jsx': 'frontend', '.tsx': 'frontend', '.vue': 'frontend', '.svelte': 'frontend',
+    '.css': 'frontend', '.scss': 'frontend', '.html': 'frontend',
+}
+TEST_NAME = re.compile(r'(?:^test_|_test\.|\.(?:test|spec)\.)')
+
+
+@dataclass
+class CategoryRule:
+    """Represents one category line of a rule set."""
+    
+    category: str
+    includes: List[str] = field(default_factory=list)
+    excludes: List[str] = field(default_factory=list)
+
+
+def glob_to_regex(pattern: str) -> str:
+    """
+    Translate a glob into a regular expression over '/'-separated paths.
+    
+    '*' and '?' stay within one path segment, '**' spans segments and
+    '[...]' is a character class ('[!...]' negated). A pattern without '/'
+    matches a file name in any directory; a trailing '/' matches everything
+    below a directory.
+    
+    Args:
+        pattern: Glob relative to the project root
+    
+    Returns:
+        Regular expression source, without anchors
+    """
+    if "/" not in pattern:
+        pattern = "**/" + pattern
+    elif pattern.endswith("/"):
+        pattern += "**"
+    pattern = pattern.lstrip("/")
+    
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**", i):
+            i += 2
+            if i < n and pattern[i] == "/":
+                out.append("(?:.*/)?")
+                i += 1
+            else:
+                out.append(".*")
+            continue
+        
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = i + 1
+            if j < n and pattern[j] == "!":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            end = pattern.find("]", j)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end + 1
+                continue
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class CategoryRules:
+    """
+    Compiled rule set mapping project-relative paths to categories.
+    
+    Every rule becomes one named alternative of a single regular expression,
+    in rule order, with the rule's excludes as a negative lookahead, so one
+    match per file finds the first rule that applies. Global excludes are
+    combined into a second expression checked first.
+    """
+    
+    def __init__(self, rules: List[CategoryRule], excludes: Optional[List[str]] = None):
+        """
+        Compile a rule set.
+        
+        Args:
+            rules: Category rules, first match wins
+            excludes: Globs no rule may match
+        
+        Raises:
+            ValueError: If a pattern does not compile
+        """
+        self.rules = [r for r in rules if r.includes]
+        self.excludes = excludes or []
+        
+        alternatives = []
+        for index, rule in enumerate(self.rules):
+            body = "|".join(glob_to_regex(p) for p in rule.includes)
+            if rule.excludes:
+                guard = "|".join(glob_to_regex(p) for p in rule.excludes)
+                body = f"(?!(?:{guard})\\Z)(?:{body})"
+            alternatives.append(f"(?P<r{index}>(?:{body})\\Z)")
+        
+        try:
+            self._matcher = re.compile("|".join(alternatives)) if alternatives else None
+            self._excluder = re.compile(
+                "(?:" + "|".join(glob_to_regex(p) for p in self.excludes) + ")\\Z"
+            ) if self.excludes else None
+        except re.error as e:
+            raise ValueError(f"padrão inválido: {e}") from e
+    
+    @classmethod
+    def parse(cls, text: str) -> "CategoryRules":
+        """
+        Parse rule text.
+        
+        Lines read 'category: glob, glob, !glob'; lines starting with '!' are
+        global excludes and '#' starts a comment.
+        
+        Args:
+            text: Rule text
+        
+        Returns:
+            Compiled rule set
+        
+        Raises:
+            ValueError: On unknown categories or malformed lines
+        """
+        rules: List[CategoryRule] = []
+        excludes: List[str] = []
+        for number, raw in enumerate(text.splitlines(), 1):
+            line = raw.split("#", 1)[0].strip()
+            if not line:
+                continue
+            
+            if line.startswith("!"):
+                excludes.extend(p.strip() for p in line[1:].split(",") if p.strip())
+                continue
+            
+            category, sep, patterns = line.partition(":")
+            category = category.strip()
+            if not sep:
+                raise ValueError(f"linha {number}: esperado 'categoria: padrão'")
+            if category not in CategoryConfig.CATEGORIES:
+                raise ValueError(f"linha {number}: categoria desconhecida '{category}'")
+            
+            rule = CategoryRule(category)
+            for pattern in (p.strip() for p in patterns.split(",")):
+                if pattern.startswith("!"):
+                    rule.excludes.append(pattern[1:].strip())
+                elif pattern:
+                    rule.includes.append(pattern)
+            rules.append(rule)
+        return cls(rules, excludes)
+    
+    def __bool__(self) -> bool:
+        """Check if any rule can match."""
+        return self._matcher is not None
+    
+    def match(self, rel_path: str) -> Optional[str]:
+        """
+        Get the category of a path.
+        
+        Args:
+            rel_path: Path relative to the project root, '/'-separated
+        
+        Returns:
+            Category of the first matching rule, or None
+        """
+        if self._matcher is None:
+            return None
+        if self._excluder is not None and self._excluder.match(rel_path):
+            return None
+        found = self._matcher.match(rel_path)
+        if found is None:
+            return None
+        return self.rules[int(found.lastgroup[1:])].category
+    
+    def apply(self, root: TreeNode) -> List[Tuple[str, str]]:
+        """
+        Match every file of a scanned tree in one pass.
+        
+        Args:
+            root: Root node of the scanned project
+        
+        Returns:
+            (path, category) pairs in tree order
+        """
+        if self._matcher is None:
+            return []
+        
+        prefix = len(root.path.rstrip(os.sep)) + 1
+        matches = []
+        for node in root.iter_files():
+            rel = node.path[prefix:]
+            if os.sep != "/":
+                rel = rel.replace(os.sep, "/")
+            category = self.match(rel)
+            if category is not None:
+                matches.append((node.path, category))
+        return matches
+
+
+def guess_category(rel_path: str) -> str:
+    """
+    Guess the category of a file no rule matches.
+    
+    Test files are recognized by name, data and markup files by extension,
+    and code files by the nearest folder (or file) named like a category,
+    e.g. 'models/' or 'routes.py'. Anything else is backend code.
+    
+    Args:
+        rel_path: Path relative to the project root, '/'-separated
+    
+    Returns:
+        A category key
+    """
+    parts = rel_path.lower().split("/")
+    name = parts[-1]
+    if TEST_NAME.search(name) or any(p in ('test', 'tests', '__tests__') for p in parts[:-1]):
+        return 'tests'
+    stem, extension = os.path.splitext(name)
+    if extension in EXTENSION_CATEGORIES and EXTENSION_CATEGORIES[extension] != 'frontend':
+        return EXTENSION_CATEGORIES[extension]
+    for part in [stem] + parts[-2::-1]:
+        for category, names in NAME_HINTS:
+            if part in names:
+                return category
+    return EXTENSION_CATEGORIES.get(extension, 'backend')
+
+
+def rules_path(project_path: str, cache_dir: Optional[str] = None) -> str:
+    """Get the file holding a project's saved rules."""
+    digest = hashlib.sha1(os.path.abspath(project_path).encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir or config.CACHE_DIR, f"rules-{digest[:16]}.txt")
+
+
+def load_rules_text(project_path: str) -> str:
+    """
+    Get a project's saved rule text.
+    
+    Returns:
+        The saved text, or DEFAULT_RULES if none was saved
+    """
+    try:
+        with open(rules_path(project_path), 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return DEFAULT_RULES
+
+
+def save_rules_text(project_path: str, text: str) -> bool:
+    """
+    Save a project's rule text.
+    
+    Returns:
+        True if the rules were written, False on write errors
+    """
+    path = rules_path(project_path)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    except OSError as e:
+        logger.warning("Could not save rules %s: %s", path, e)
+        return False
+    return True
@@ -0,0 +1,321 @@
+"""Splitting of source files into chunks at syntax boundaries."""
+
+import ast
+import io
+import os
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+from .models import CodeChunk
+from .config import config
+
+# (first line, last line, kind, name), 1-based and inclusive
+Span = Tuple[int, int, str, str]
+
+BRACE_EXTENSIONS = {
+    '.js', '.jsx', '.ts', '.tsx', '.java', '.cpp', '.c', '.h', '.cs', '.php',
+    '.go', '.rs', '.swift', '.kt', '.css', '.scss', '.vue', '.svelte'
+}
+
+
+def split_lines(text: str, keepends: bool = False) -> List[str]:
+    """
+    Split text at '\\n', '\\r\\n' and '\\r' only, the line ends ast counts.
+    
+    str.splitlines() also breaks at form feeds and other separators,
+    which would shift chunk line numbers away from the syntax tree's.
+    """
+    lines = io.StringIO(text, newline='').readlines()
+    if keepends:
+        return lines
+    return [line.rstrip('\r\n') for line in lines]
+
+
+class CodeChunker:
+    """
+    Splits source files into chunks of whole lines at definition boundaries.
+    
+    Python files are cut between the top-level statements of their syntax
+    tree, and classes longer than max_lines between their methods. Brace
+    languages are cut where the brace depth returns to zero, and other
+    files at unindented lines following a blank line. Chunks cover the file
+    without gaps: comments and blank lines go with the definition after
+    them. A chunk still longer than max_lines is cut into parts, at a blank
+    line when there is one near the cut.
+    
+    Chunks are scored for packing: the file header (module docstring,
+    imports) first, then classes, then functions, with private names and
+    later parts of a split definition lower, and loose blocks last.
+    """
+    
+    SCORES = {"header": 4.0, "class": 3.0, "function": 2.0, "method": 2.0, "block": 1.0}
+    PRIVATE_FACTOR = 0.5
+    PART_FACTOR = 0.8
+    
+    STRING = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|`[^`]*`')
+    LINE_COMMENT = re.compile(r'//.*|/\*.*?\*/')
+    DEFINITION = re.compile(
+        r'\b(class|interface|struct|enum|trait|impl|object|module|namespace|type'
+        r'|fn|func|function|def|fun|sub)\s+([A-Za-z_$][\w$]*)'
+    )
+    CALL_NAME = re.compile(r'([A-Za-z_$][\w$]*)\s*\(')
+    CLASS_WORDS = {"class", "interface", "struct", "enum", "trait", "impl", "object", "module", "namespace", "type"}
+    NOT_NAMES = {"if", "for", "while", "switch", "catch", "return", "sizeof", "defined", "func", "function", "fn"}
+    CONTINUED_END = (",", "(", "=", "|", "&", "+", "-", "?", ":", "<")
+    CONTINUING_START = ("{", ")", ".", ":", ",", "?", "<")
+    PREFIX_LINE = re.compile(r'\s*(?://|/\*|\*|@|#\[|\[)')
+    COMMENT_STARTS = ("#", "//", "--", "/*", "*", "@")
+    CLOSING_LINE = re.compile(r'\s*(?:end\b|[}\])]|</)')
+    
+    def __init__(self, max_lines: Optional[int] = None):
+        """
+        Initialize the chunker.
+        
+        Args:
+            max_lines: Longest chunk before definitions are split further
+                (default from config)
+        """
+        self.max_lines = max_lines or config.CHUNK_MAX_LINES
+    
+    def chunk(self, path: str, text: str) -> List[CodeChunk]:
+        """
+        Split a file into scored chunks.
+        
+        Args:
+            path: File path; its extension picks the splitting strategy
+            text: File content
+        
+        Returns:
+            Chunks in line order, covering every line
+        """
+        lines = split_lines(text)
+        if not lines:
+            return []
+        
+        extension = os.path.splitext(path)[1].lower()
+        spans = self._python_spans(text, len(lines)) if extension == '.py' else None
+        if spans is None:
+            if extension in BRACE_EXTENSIONS:
+                spans = self._brace_spans(lines)
+            else:
+                spans = self._indent_spans(lines)
+        
+        chunks: List[CodeChunk] = []
+        for start, end, kind, name in spans:
+            chunks.extend(self._split(lines, start, end, kind, name))
+        return chunks
+    
+    @staticmethod
+    def ranked(chunks: Sequence[CodeChunk]) -> List[CodeChunk]:
+        """Order chunks from most to least worth keeping."""
+        return sorted(chunks, key=lambda c: (-c.score, c.start_line))
+    
+    @staticmethod
+    def text_of(lines: Sequence[str], chunk: CodeChunk) -> str:
+        """Get a chunk's text from the file's lines (kept ends)."""
+        return "".join(lines[chunk.start_line - 1:chunk.end_line])
+    
+    def _score(self, kind: str, name: str, part: int) -> float:
+        """Score a chunk by kind, visibility and position in its definition."""
+        score = self.SCORES[kind]
+        last = name.rsplit(".", 1)[-1]
+        if last.startswith("_") and not last.endswith("__"):
+            score *= self.PRIVATE_FACTOR
+        if part:
+            score *= self.PART_FACTOR
+        return score
+    
+    def _split(self, lines: List[str], start: int, end: int, kind: str, name: str) -> List[CodeChunk]:
+        """Make chunks of a span, cutting it into parts if it is too long."""
+        chunks = []
+        part = 0
+        while end - start + 1 > self.max_lines:
+            cut = start + self.max_lines - 1
+            # Prefer ending a part at a blank line in its last quarter
+            for line in range(cut, cut - self.max_lines // 4, -1):
+                if not lines[line - 1].strip():
+                    cut = line
+                    break
+            label = f"{name} (parte {part + 1})" if name else ""
+            chunks.append(CodeChunk(start, cut, kind, label, self._score(kind, name, part)))
+            start = cut + 1
+            part += 1
+        if part and name:
+            name = f"{name} (parte {part + 1})"
+        chunks.append(CodeChunk(start, end, kind, name, self._score(kind, name, part)))
+        return chunks
+    
+    @staticmethod
+    def _contiguous(spans: List[Span], first: int, last: int) -> List[Span]:
+        """Stretch spans to cover first..last, each starting after the previous one."""
+        covered = []
+        position = first
+        for index, (start, end, kind, name) in enumerate(spans):
+            if index == len(spans) - 1:
+                end = last
+            covered.append((position, max(end, position), kind, name))
+            position = max(end, position) + 1
+        return covered
+    
+    def _python_spans(self, text: str, total: int) -> Optional[List[Span]]:
+        """Cut a Python module between top-level statements, or None if it does not parse."""
+        try:
+            tree = ast.parse(text)
+        except (SyntaxError, ValueError):
+            return None
+        if not tree.body:
+            return [(1, total, "header", "")]
+        
+        spans: List[Span] = []
+        for node in tree.body:
+            start = min([node.lineno] + [d.lineno for d in getattr(node, 'decorator_list', ())])
+            end = node.end_lineno or start
+            if isinstance(node, ast.ClassDef):
+                spans.extend(self._class_spans(node, start, end))
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                spans.append((start, end, "function", node.name))
+            elif spans and spans[-1][2] in ("header", "block"):
+                # Consecutive plain statements make one chunk
+                spans[-1] = (spans[-1][0], end, spans[-1][2], "")
+            else:
+                spans.append((start, end, "block" if spans else "header", ""))
+        return self._contiguous(spans, 1, total)
+    
+    def _class_spans(self, node: ast.ClassDef, start: int, end: int) -> List[Span]:
+        """Cut a long class between its methods."""
+        methods = [n for n in node.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
+        if end - start + 1 <= self.max_lines or not methods:
+            return [(start, end, "class", node.name)]
+        
+        spans: List[Span] = []
+        first = min([methods[0].lineno] + [d.lineno for d in methods[0].decorator_list])
+        if first > start:
+            spans.append((start, first - 1, "class", node.name))
+        for method in methods:
+            method_start = min([method.lineno] + [d.lineno for d in method.decorator_list])
+            spans.append((method_start, method.end_lineno or method_start, "method", f"{node.name}.{method.name}"))
+        return self._contiguous(spans, start, end)
+    
+    def _definition(self, line: str) -> Tuple[str, str]:
+        """Guess the kind and name of a definition from its first line."""
+        found = self.DEFINITION.search(line)
+        if found:
+            return ("class" if found.group(1) in self.CLASS_WORDS else "function"), found.group(2)
+        for name in self.CALL_NAME.findall(line.split("{", 1)[0]):
+            if name not in self.NOT_NAMES:
+                return "function", name
+        head = line.split("{", 1)[0].strip() or line.strip()
+        return "function", head.split("\n", 1)[0][:40]
+    
+    def _brace_spans(self, lines: List[str]) -> List[Span]:
+        """Cut a brace language file where the brace depth returns to zero."""
+        spans: List[Span] = []
+        depth = 0
+        in_comment = False
+        start = 1  # first line of the current span
+        statement = 0  # first line of the statement being read at depth 0
+        previous = ""  # code of the last line read at depth 0
+        head = 0  # first line of the block open at depth 0
+        plain_end = 0  # last code line outside any block
+        
+        for number, raw in enumerate(lines, 1):
+            line = raw
+            if in_comment:
+                close = line.find("*/")
+                if close < 0:
+                    continue
+                line = line[close + 2:]
+                in_comment = False
+            line = self.LINE_COMMENT.sub("", self.STRING.sub('""', line))
+            opening = line.find("/*")
+            if opening >= 0:
+                line = line[:opening]
+                in_comment = True
+            code = line.strip()
+            if not code:
+                continue
+            
+            if depth == 0:
+                # Signatures may run over several lines, or leave the brace
+                # to a line of its own
+                if not (statement and (previous.endswith(self.CONTINUED_END)
+                                       or code.startswith(self.CONTINUING_START))):
+                    statement = number
+                previous = code
+            
+            opened = depth
+            depth = max(0, depth + code.count("{") - code.count("}"))
+            if opened == 0 and depth > 0:
+                # A block starts: plain lines before its statement (and the
+                # comments or annotations right above it) end the current span
+                first = statement
+                while first > start and self.PREFIX_LINE.match(lines[first - 2]):
+                    first -= 1
+                if plain_end >= start and first > start:
+                    spans.append((start, first - 1, "block" if spans else "header", ""))
+                    start = first
+                head = statement
+            elif depth == 0:
+                if head:
+                    kind, name = self._definition("\n".join(lines[head - 1:number]))
+                    spans.append((start, number, kind, name))
+                    start = number + 1
+                    head = 0
+                    statement = 0
+                    previous = ""
+                else:
+                    plain_end = number
+        
+        if start <= len(lines):
+            if head:
+                kind, name = self._definition("\n".join(lines[head - 1:head + 2]))
+            else:
+                kind, name = ("block" if spans else "header"), ""
+            spans.append((start, len(lines), kind, name))
+        return self._contiguous(spans, 1, len(lines))
+    
+    def _indent_spans(self, lines: List[str]) -> List[Span]:
+        """
+        Cut a file at unindented lines following a blank line, and before
+        definitions at the outermost level holding several of them (inside
+        a wrapping module or namespace, for example).
+        """
+        depths: Dict[int, int] = {}
+        for line in lines:
+            stripped = line.lstrip()
+            if self.DEFINITION.match(stripped):
+                indent = len(line) - len(stripped)
+                depths[indent] = depths.get(indent, 0) + 1
+        outer = min((d for d, n in depths.items() if n > 1), default=0)
+        
+        starts = [1]
+        heads: Dict[int, int] = {}  # span start -> its definition line
+        blank = False
+        for number, line in enumerate(lines, 1):
+            stripped = line.lstrip()
+            if not stripped:
+                blank = True
+                continue
+            indent = len(line) - len(stripped)
+            if number > 1 and not self.CLOSING_LINE.match(line):
+                if indent <= outer and self.DEFINITION.match(stripped):
+                    # The comments right above a definition go with it
+                    first = number
+                    while first - 1 > starts[-1] and lines[first - 2].lstrip().startswith(self.COMMENT_STARTS):
+                        first -= 1
+                    if first > starts[-1]:
+                        starts.append(first)
+                    heads.setdefault(starts[-1], number)
+                elif blank and indent == 0:
+                    starts.append(number)
+            blank = False
+        
+        spans: List[Span] = []
+        for index, start in enumerate(starts):
+            end = starts[index + 1] - 1 if index + 1 < len(starts) else len(lines)
+            first = lines[heads.get(start, start) - 1]
+            if self.DEFINITION.match(first.lstrip()):
+                kind, name = self._definition(first)
+            else:
+                kind, name = ("block" if index else "header"), first.strip().lstrip("#").strip()[:40]
+            spans.append((start, end, kind, name))
+        return spans
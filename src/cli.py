@@ -0,0 +1,243 @@
+"""Headless command line interface.
+
+Drives FileManager, PromptBuilder and ClaudeAPIClient without importing any
+UI module, for use on build agents and in CI pipelines:
+
+    python main.py run --repo . --category backend=src/** \\
+        --instructions "Revise o código" [--dry-run]
+"""
+
+import argparse
+import os
+import sys
+from typing import List, Optional, Tuple
+from .config import config, CategoryConfig
+from .category_rules import CategoryRule, CategoryRules
+from .file_manager import FileManager
+from .prompt_builder import PromptBuilder, PromptStats
+
+
+def parse_category(value: str) -> Tuple[str, str]:
+    """Parse a CATEGORY=GLOB option."""
+    category, sep, pattern = value.partition("=")
+    if not sep or not category or not pattern:
+        raise argparse.ArgumentTypeError(f"expected CATEGORY=GLOB, got '{value}'")
+    if category not in CategoryConfig.CATEGORIES:
+        choices = ", ".join(CategoryConfig.CATEGORIES)
+        raise argparse.ArgumentTypeError(f"unknown category '{category}' (choose from {choices})")
+    return category, pattern
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser."""
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Generate a prompt from a repository and send it to Claude."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    run = commands.add_parser("run", help="build a prompt and stream the answer to stdout")
+    run.add_argument("--repo", required=True, help="repository root")
+    run.add_argument(
+        "--category", action="append", type=parse_category, default=[], metavar="CATEGORY=GLOB",
+        help="add files matching GLOB (relative to --repo) to CATEGORY; repeatable"
+    )
+    run.add_argument("--rules", help="file with category rules ('category: glob, !glob' per line)")
+    source = run.add_mutually_exclusive_group(required=True)
+    source.add_argument("--instructions", help="instructions for Claude")
+    source.add_argument("--instructions-file", help="file with the instructions ('-' for stdin)")
+    run.add_argument(
+        "--suggest", type=int, default=0, metavar="K",
+        help="also add the K files most relevant to the instructions, found by a local search index"
+    )
+    run.add_argument(
+        "--with-deps", type=int, default=0, metavar="N",
+        help="also add the project files the added files import, following N import hops"
+    )
+    run.add_argument("--dry-run", action="store_true", help="print the prompt and its stats, do not call the API")
+    run.add_argument("--token-budget", type=int, help="pack the files into this many prompt tokens")
+    run.add_argument("--layout", choices=["context_first", "request_first"], help="prompt layout")
+    run.add_argument("--max-tokens", type=int, help="maximum tokens for the answer")
+    run.add_argument("--no-cache", action="store_true", help="bypass the local response cache")
+    run.add_argument("--no-stream", action="store_true", help="print the answer only when complete")
+    run.add_argument("--api-key", help="API key (default: ANTHROPIC_API_KEY)")
+    return parser
+
+
+def load_rules(args: argparse.Namespace) -> CategoryRules:
+    """
+    Compile the --category options and the --rules file into one rule set.
+    
+    Raises:
+        OSError: If the rules file cannot be read
+        ValueError: If the rules are malformed
+    """
+    rules = [CategoryRule(category, [pattern]) for category, pattern in args.category]
+    excludes: List[str] = []
+    if args.rules:
+        with open(args.rules, 'r', encoding='utf-8') as f:
+            saved = CategoryRules.parse(f.read())
+        rules.extend(saved.rules)
+        excludes = saved.excludes
+    return CategoryRules(rules, excludes)
+
+
+def read_instructions(args: argparse.Namespace) -> str:
+    """Get the instructions from the command line, a file or stdin."""
+    if args.instructions is not None:
+        return args.instructions
+    if args.instructions_file == "-":
+        return sys.stdin.read()
+    with open(args.instructions_file, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def report(message: str):
+    """Print a status line to stderr, keeping stdout for the prompt or answer."""
+    print(message, file=sys.stderr, flush=True)
+
+
+def run(args: argparse.Namespace) -> int:
+    """Execute the run command."""
+    manager = FileManager()
+    if not manager.set_project_path(args.repo):
+        report(f"Erro: diretório inválido: {args.repo}")
+        return 2
+    manager.scan_project()
+    
+    try:
+        rules = load_rules(args)
+    except (OSError, ValueError) as e:
+        report(f"Erro nas regras: {e}")
+        return 2
+    
+    results = manager.apply_rules(rules)
+    skipped = [r for r in results if not r.added]
+    for result in skipped:
+        reason = "binário" if result.status == "binary" else result.error
+        report(f"Ignorado: {result.path} ({reason})")
+    truncated = sum(1 for r in results if r.truncated)
+    if truncated:
+        report(f"{truncated} arquivo(s) truncado(s) em {config.MAX_FILE_BYTES} bytes")
+    
+    try:
+        user_request = read_instructions(args).strip()
+    except OSError as e:
+        report(f"Erro ao ler instruções: {e}")
+        return 2
+    
+    if args.suggest:
+        indexed, removed = manager.update_search_index()
+        if indexed or removed:
+            report(f"Índice de busca: {indexed} arquivo(s) indexado(s), {removed} removido(s)")
+        suggested = [r for r in manager.suggest_files(user_request, args.suggest) if r.added]
+        for result in suggested:
+            report(f"Sugerido: {result.path} ({result.category})")
+    
+    if args.with_deps:
+        attached = [segment.path for segment in manager.code_segments]
+        for result in manager.add_with_dependencies(attached, args.with_deps):
+            if result.added:
+                report(f"Dependência: {result.path} ({result.category})")
+    
+    if not manager.get_segment_count():
+        report("Erro: nenhum arquivo corresponde às categorias informadas")
+        return 2
+    
+    segments = manager.code_segments
+    pack = None
+    if args.token_budget:
+        pack = PromptBuilder.pack(user_request, segments, args.token_budget)
+        if pack.has_omissions():
+            report(
+                f"Limite de contexto: {len(pack.truncated)} truncado(s), "
+                f"{len(pack.summarized)} resumido(s), {len(pack.dropped)} omitido(s)"
+            )
+    report(
+        f"{manager.get_segment_count()} arquivo(s), {manager.get_total_size()} bytes, "
+        f"~{manager.get_total_tokens()} tokens"
+    )
+    
+    if args.dry_run:
+        stats = PromptStats()
+        for chunk in stats.track(PromptBuilder.iter_prompt(user_request, segments, pack, args.layout)):
+            sys.stdout.write(chunk)
+        sys.stdout.flush()
+        stats = stats.to_dict()
+        report(f"Prompt: {stats['characters']} chars, {stats['lines']} linhas, ~{stats['estimated_tokens']} tokens")
+        return 0
+    
+    api_key = args.api_key or os.environ.get("ANTHROPIC_API_KEY", "")
+    if not api_key:
+        report("Erro: informe --api-key ou defina ANTHROPIC_API_KEY")
+        return 2
+    
+    # Imported here so --dry-run works without the SDK installed
+    from .api_client import ClaudeAPIClient
+    
+    client = ClaudeAPIClient()
+    response = client.connect(api_key)
+    if not response.success:
+        report(f"Erro de conexão: {response.error}")
+        return 1
+    
+    context = None
+    if (args.layout or config.PROMPT_LAYOUT) == "context_first":
+        context, prompt = PromptBuilder.split_prompt(user_request, segments, pack)
+    else:
+        prompt = "".join(PromptBuilder.iter_prompt(user_request, segments, pack, args.layout))
+    
+    use_cache = not args.no_cache
+    if args.no_stream:
+        response = client.send_message(prompt, args.max_tokens, use_cache=use_cache, context=context)
+        if response.success:
+            sys.stdout.write(response.content)
+    else:
+        def write(text: str):
+            sys.stdout.write(text)
+            sys.stdout.flush()
+        
+        response = client.stream_message(
+            prompt, write, args.max_tokens,
+            flush_interval=0, use_cache=use_cache, context=context
+        )
+    sys.stdout.write("\n")
+    sys.stdout.flush()
+    
+    if not response.success:
+        report(f"Erro: {response.error}")
+        return 1
+    
+    details = [f"{response.tokens_used or 0} tokens"]
+    if response.cached:
+        details.append("do cache de respostas")
+    if response.cache_read_tokens:
+        details.append(f"{response.cache_read_tokens} do cache de prompt")
+    if response.time_to_first_token is not None:
+        details.append(f"primeiro token em {response.time_to_first_token:.2f}s")
+    if response.tokens_per_second is not None:
+        details.append(f"{response.tokens_per_second:.1f} tokens/s")
+    report("Resposta: " + ", ".join(details))
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the command line interface.
+    
+    Args:
+        argv: Arguments without the program name (default sys.argv[1:])
+    
+    Returns:
+        Process exit code
+    """
+    args = build_parser().parse_args(argv)
+    if not args.category and not args.rules and not args.suggest:
+        report("Erro: informe ao menos um --category CATEGORY=GLOB, --rules ou --suggest")
+        return 2
+    try:
+        return run(args)
+    except BrokenPipeError:
+        # Output piped into e.g. head, which stopped reading
+        sys.stderr.close()
+        return 0
@@ -2,7 +2,7 @@
 
 import os
 from pathlib import Path
-from typing import Set, Dict
+from typing import Dict, Set, Tuple
 from dataclasses import dataclass
 
 
@@ -68,7 +68,37 @@ class AppConfig:
     # API settings
     DEFAULT_MODEL: str = "claude-sonnet-4-5-20250929"
     MAX_TOKENS: int = 8000
-    TEST_MAX_TOKENS: int = 10
+    API_BASE_URL: str = os.environ.get("ANTHROPIC_BASE_URL", "")  # empty uses the SDK default
+    STREAM_RESPONSES: bool = True
+    PROMPT_LAYOUT: str = "context_first"  # or "request_first"
+    PROMPT_CACHING: bool = True  # mark the code context as a cacheable prefix
+    STREAM_FLUSH_MS: int = 50  # minimum interval between UI updates while streaming
+    HTTP_POOL_SIZE: int = 10
+    HTTP_KEEPALIVE_SECONDS: float = 120.0
+    
+    # Background task settings
+    TASK_WORKERS: int = 4
+    
+    # Batch mode settings
+    BATCH_CONCURRENCY: int = 4  # requests beyond HTTP_POOL_SIZE wait for a connection
+    BATCH_GROUP_BY: str = "file"  # "file" or "category"
+    BATCH_MAX_RETRIES: int = 5
+    BATCH_BACKOFF_SECONDS: float = 2.0
+    
+    # Token counting settings
+    TOKENIZER: str = "approx"  # "approx" or "tiktoken"
+    TOKEN_CACHE_SIZE: int = 65536
+    PROMPT_CACHE_MAX_CHARS: int = 64 * 1024 * 1024  # rendered file blocks kept between previews
+    CONTEXT_TOKEN_BUDGET: int = 180000
+    MIN_TRUNCATED_TOKENS: int = 200
+    MAX_SUMMARIES: int = 50
+    CHUNK_MAX_LINES: int = 200  # longest chunk kept or omitted as a unit when truncating
+    
+    # Retrieval settings
+    SEARCH_TOP_K: int = 20  # files suggested for the instructions
+    SEARCH_MAX_BYTES: int = 256 * 1024  # bytes of each file that are indexed
+    SEARCH_EMBEDDING_MODEL: str = ""  # sentence-transformers model for semantic ranking; "" for BM25 only
+    IMPORT_PARSE_PROCESSES: int = 0  # processes parsing files for the import graph; 0 for one per CPU
     
     # UI Animation settings
     ANIMATION_DURATION: int = 200  # milliseconds
@@ -104,6 +134,20 @@ class AppConfig:
     # File settings
     CODE_EXTENSIONS: Set[str] = None
     IGNORE_DIRS: Set[str] = None
+    SCAN_MAX_WORKERS: int = 8
+    LOAD_WORKERS: int = 8  # threads reading files added in bulk
+    MAX_FILE_BYTES: int = 512 * 1024  # larger files keep their head and tail; 0 for no cap
+    FALLBACK_ENCODINGS: Tuple[str, ...] = ("cp1252", "latin-1")  # tried after UTF-8
+    CACHE_DIR: str = None
+    
+    # Response cache settings
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_BYTES: int = 50 * 1024 * 1024
+    RESPONSE_CACHE_TTL_SECONDS: float = 7 * 24 * 3600  # 0 keeps entries until evicted
+    
+    # Watcher settings
+    WATCH_DEBOUNCE_MS: int = 300
+    WATCH_POLL_INTERVAL_MS: int = 1000
     
     def __post_init__(self):
         """Initialize complex default values."""
@@ -121,6 +165,12 @@ class AppConfig:
                 'build', 'dist', '.idea', '.vscode', 'env', '.pytest_cache',
                 '.mypy_cache', 'coverage', '.tox', 'eggs', '.eggs'
             }
+        
+        if self.CACHE_DIR is None:
+            self.CACHE_DIR = os.environ.get(
+                'CODEX_CACHE_DIR',
+                str(Path.home() / '.codex' / 'cache')
+            )
 
 
 class CategoryConfig:
@@ -139,6 +189,25 @@ class CategoryConfig:
         'other': '🎯 Outro'
     }
     
+    # Higher priority categories are kept first when packing to a token budget
+    PRIORITIES = {
+        'backend': 9,
+        'api': 9,
+        'models': 8,
+        'database': 8,
+        'frontend': 7,
+        'utils': 6,
+        'config': 5,
+        'tests': 4,
+        'docs': 3,
+        'other': 2
+    }
+    
+    @classmethod
+    def get_priority(cls, category: str) -> int:
+        """Get packing priority for category."""
+        return cls.PRIORITIES.get(category, 1)
+    
     @classmethod
     def get_display_name(cls, category: str) -> str:
         """Get display name for category."""
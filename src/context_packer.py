@@ -0,0 +1,318 @@
+"""Token-budget-aware selection of code segments."""
+
+import os
+import re
+from typing import Dict, List, Optional, Set, Tuple
+from .chunker import CodeChunker, split_lines
+from .models import CodeChunk, CodeSegment, PackResult
+from .config import config, CategoryConfig
+from .prompt_builder import PromptBuilder
+from .tokenizer import CachedTokenCounter, get_token_counter
+
+
+class ContextPacker:
+    """
+    Fits code segments into a token budget.
+    
+    Segments are ranked by category priority and, within a priority, by
+    size, then added greedily while they fit. The best ranked segment that
+    does not fit is truncated to the remaining budget, keeping its best
+    ranked chunks when it is a code file and its head otherwise; the rest
+    are reduced to an outline of their definitions when that fits, or
+    dropped. Token counts come from the shared cached counter, so packing
+    thousands of already counted segments takes milliseconds.
+    
+    Files with the same content as an earlier one are left out of the
+    ranking; they cost only their cross-reference and are kept when the
+    file they repeat is kept whole.
+    """
+    
+    TRUNCATION_MARKER = "\n... [conteúdo truncado para caber no limite de contexto]"
+    OMISSION_MARKER = "... [linhas {start}-{end} omitidas para caber no limite de contexto] ...\n"
+    SUMMARY_HEADER = "# [apenas assinaturas - conteúdo omitido pelo limite de contexto]\n"
+    OUTLINE_PATTERN = re.compile(
+        r"^[ \t]*(?:@\w|(?:async\s+)?def\s|class\s|function\s|export\s|interface\s"
+        r"|type\s+\w+\s*=|struct\s|enum\s|impl\s|fn\s|func\s|module\s"
+        r"|(?:public|private|protected|internal|static)\s).*$",
+        re.MULTILINE
+    )
+    
+    def __init__(
+        self,
+        budget: int,
+        counter: Optional[CachedTokenCounter] = None,
+        priorities: Optional[Dict[str, int]] = None
+    ):
+        """
+        Initialize the packer.
+        
+        Args:
+            budget: Maximum tokens for the whole prompt
+            counter: Token counter (default is the shared cached counter)
+            priorities: Category priorities (default from CategoryConfig)
+        """
+        self.budget = budget
+        self.counter = counter or get_token_counter()
+        self.priorities = priorities or CategoryConfig.PRIORITIES
+        self.chunker = CodeChunker()
+    
+    def pack(self, user_request: str, code_segments: List[CodeSegment]) -> PackResult:
+        """
+        Choose the segments to emit for a request.
+        
+        Args:
+            user_request: The user's instructions
+            code_segments: Candidate segments (unselected ones are ignored)
+        
+        Returns:
+            PackResult with segments in their original order
+        """
+        selected = [s for s in code_segments if s.selected]
+        count = self.counter.count
+        footer = count(PromptBuilder.FILE_FOOTER)
+        counted = [self.counter.count_segment(s) for s in selected]
+        originals = self._find_copies(selected)
+        references = {
+            i: count(PromptBuilder.duplicate_block(selected[i], selected[j]))
+            for i, j in originals.items()
+        }
+        reserve = sum(references.values())
+        segments = [s for i, s in enumerate(selected) if i not in originals]
+        tokens = [t for i, t in enumerate(counted) if i not in originals]
+        costs = [
+            t + count(PromptBuilder.file_header(s)) + footer
+            for s, t in zip(segments, tokens)
+        ]
+        
+        base = (
+            count(PromptBuilder.HEADER)
+            + count(PromptBuilder.request_block(user_request))
+            + count(PromptBuilder.STRUCTURE_HEADER)
+            + count(PromptBuilder.FOOTER)
+            + sum(count(PromptBuilder.category_header(c)) for c in {s.category for s in selected})
+        )
+        
+        result = self._fit(segments, tokens, costs, self.budget - base - reserve)
+        # Reserve room for the notice listing what was left out, then refit
+        for _ in range(3):
+            if not result.has_omissions():
+                break
+            notice = count(PromptBuilder.omission_notice(result))
+            refit = self._fit(segments, tokens, costs, self.budget - base - reserve - notice)
+            unchanged = (refit.dropped, refit.truncated, refit.summarized) == (
+                result.dropped, result.truncated, result.summarized
+            )
+            result = refit
+            if unchanged:
+                break
+        
+        result.tokens += base
+        if originals:
+            self._restore_copies(result, selected, originals, references)
+        if result.has_omissions():
+            result.tokens += count(PromptBuilder.omission_notice(result))
+        return result
+    
+    def _find_copies(self, segments: List[CodeSegment]) -> Dict[int, int]:
+        """
+        Find segments repeating the content of another one.
+        
+        Segments are visited in the order PromptBuilder emits them, grouped
+        by category, so the original is the copy the prompt will show.
+        
+        Returns:
+            Index of each repeating segment mapped to the index of the
+            first segment with the same content
+        """
+        rank = {c: n for n, c in enumerate(dict.fromkeys(s.category for s in segments))}
+        order = sorted(range(len(segments)), key=lambda i: rank[segments[i].category])
+        first: Dict[bytes, int] = {}
+        copies: Dict[int, int] = {}
+        for i in order:
+            segment = segments[i]
+            if not segment.size:
+                continue
+            digest = self.counter.segment_digest(segment)
+            j = first.get(digest)
+            if j is not None and segments[j].content == segment.content:
+                copies[i] = j
+            else:
+                first.setdefault(digest, i)
+        return copies
+    
+    @staticmethod
+    def _restore_copies(
+        result: PackResult,
+        segments: List[CodeSegment],
+        originals: Dict[int, int],
+        references: Dict[int, int]
+    ):
+        """Put repeated segments back in order, kept only with their original."""
+        packed = {s.path: s for s in result.segments}
+        dropped = set(result.dropped)
+        result.segments = []
+        for i, segment in enumerate(segments):
+            if i not in originals:
+                if segment.path in packed:
+                    result.segments.append(packed[segment.path])
+                continue
+            original = segments[originals[i]]
+            if packed.get(original.path) is original:
+                result.segments.append(segment)
+                result.tokens += references[i]
+            else:
+                dropped.add(segment.path)
+        result.dropped = [s.path for s in segments if s.path in dropped]
+    
+    def _rank(self, segments: List[CodeSegment], costs: List[int]) -> List[int]:
+        """Order segment indexes from most to least worth including."""
+        return sorted(
+            range(len(segments)),
+            key=lambda i: (-self.priorities.get(segments[i].category, 1), costs[i], i)
+        )
+    
+    def _fit(
+        self,
+        segments: List[CodeSegment],
+        tokens: List[int],
+        costs: List[int],
+        available: int
+    ) -> PackResult:
+        """Greedily fill the available tokens."""
+        ranked = self._rank(segments, costs)
+        remaining = available
+        included: Set[int] = set()
+        for i in ranked:
+            if costs[i] <= remaining:
+                included.add(i)
+                remaining -= costs[i]
+        
+        replaced: Dict[int, Tuple[str, CodeSegment]] = {}
+        dropped: List[int] = []
+        summaries_tried = 0
+        for i in ranked:
+            if i in included:
+                continue
+            segment = segments[i]
+            framing = costs[i] - tokens[i]
+            
+            if not replaced and remaining - framing >= config.MIN_TRUNCATED_TOKENS:
+                shortened = self._truncate(segment, tokens[i], remaining - framing)
+                if shortened is not None:
+                    text, used = shortened
+                    replaced[i] = ('truncated', self._copy(segment, text))
+                    remaining -= used + framing
+                    continue
+            
+            if summaries_tried < config.MAX_SUMMARIES and remaining > framing:
+                summaries_tried += 1
+                text = self._outline(segment)
+                used = self.counter.count(text) if text else 0
+                if text and used + framing <= remaining:
+                    replaced[i] = ('summarized', self._copy(segment, text))
+                    remaining -= used + framing
+                    continue
+            
+            dropped.append(i)
+        
+        result = PackResult(segments=[], budget=self.budget, tokens=available - remaining)
+        for i, segment in enumerate(segments):
+            if i in included:
+                result.segments.append(segment)
+            elif i in replaced:
+                kind, shortened = replaced[i]
+                result.segments.append(shortened)
+                getattr(result, kind).append(segment.path)
+        result.dropped = [segments[i].path for i in sorted(dropped)]
+        return result
+    
+    def _truncate(
+        self,
+        segment: CodeSegment,
+        total: int,
+        max_tokens: int
+    ) -> Optional[Tuple[str, int]]:
+        """Cut a segment's content to fit max_tokens, keeping its best chunks or its head."""
+        content = segment.content
+        if os.path.splitext(segment.path)[1].lower() in config.CODE_EXTENSIONS:
+            chosen = self._select_chunks(segment.path, content, max_tokens)
+            if chosen is not None:
+                return chosen
+        target = max_tokens - self.counter.count(self.TRUNCATION_MARKER)
+        if target <= 0 or not content:
+            return None
+        
+        cut = int(len(content) * target / max(total, 1))
+        for _ in range(8):
+            newline = content.rfind("\n", 0, cut)
+            end = newline if newline > cut // 2 else cut
+            text = content[:end] + self.TRUNCATION_MARKER
+            tokens = self.counter.count(text)
+            if tokens <= max_tokens:
+                return text, tokens
+            cut = int(cut * 0.85)
+        return None
+    
+    def _select_chunks(self, path: str, content: str, max_tokens: int) -> Optional[Tuple[str, int]]:
+        """
+        Keep the best ranked chunks of a file that fit, in file order.
+        
+        Omitted runs of lines are replaced by a marker naming them, so the
+        model can tell where code is missing and ask for it.
+        
+        Returns:
+            (text, tokens), or None if the file has a single chunk or none fits
+        """
+        chunks = self.chunker.chunk(path, content)
+        if len(chunks) < 2:
+            return None
+        lines = split_lines(content, keepends=True)
+        marker = self.counter.count(self.OMISSION_MARKER.format(start=len(lines), end=len(lines)))
+        
+        chosen = []
+        used = 0
+        for chunk in CodeChunker.ranked(chunks):
+            # Each kept chunk may open one gap before it, plus the one at the end
+            tokens = self.counter.count(CodeChunker.text_of(lines, chunk)) + marker
+            if used + tokens + marker <= max_tokens:
+                chosen.append(chunk)
+                used += tokens
+        
+        while chosen:
+            text = self._join_chunks(lines, sorted(chosen, key=lambda c: c.start_line))
+            tokens = self.counter.count(text)
+            if tokens <= max_tokens:
+                return text, tokens
+            chosen.pop()
+        return None
+    
+    def _join_chunks(self, lines: List[str], chunks: List[CodeChunk]) -> str:
+        """Join chunks in file order, marking the lines left out between them."""
+        parts = []
+        line = 1
+        for chunk in chunks:
+            if chunk.start_line > line:
+                parts.append(self.OMISSION_MARKER.format(start=line, end=chunk.start_line - 1))
+            text = CodeChunker.text_of(lines, chunk)
+            parts.append(text if text.endswith("\n") else text + "\n")
+            line = chunk.end_line + 1
+        if line <= len(lines):
+            parts.append(self.OMISSION_MARKER.format(start=line, end=len(lines)))
+        return "".join(parts)
+    
+    def _outline(self, segment: CodeSegment) -> str:
+        """Reduce a segment to the lines declaring its definitions."""
+        lines = self.OUTLINE_PATTERN.findall(segment.content)
+        if not lines:
+            return ""
+        return self.SUMMARY_HEADER + "\n".join(line.rstrip() for line in lines)
+    
+    @staticmethod
+    def _copy(segment: CodeSegment, content: str) -> CodeSegment:
+        """Create an in-memory segment with replaced content."""
+        return CodeSegment(
+            path=segment.path,
+            category=segment.category,
+            content=content,
+            selected=True
+        )
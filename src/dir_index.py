@@ -0,0 +1,177 @@
+"""Persistent per-directory index used for incremental rescans."""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Set
+from .models import TreeNode
+from .config import config
+
+
+class DirectoryIndex:
+    """
+    On-disk cache of directory listings keyed by directory stat data.
+    
+    Each directory record stores its mtime, inode and size together with the
+    visible entries found when it was last listed. Adding, deleting or
+    renaming an entry changes the mtime of its parent directory, so a record
+    whose stat data still matches can be reused without listing it again.
+    Edits to the content of an existing file do not touch the directory, so
+    the files of a reused record are stat'ed again for their current size.
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, root: str, cache_dir: Optional[str] = None):
+        """
+        Initialize the index for a project root.
+        
+        Args:
+            root: Project directory the index belongs to
+            cache_dir: Directory holding index files (default from config)
+        """
+        self.root = root
+        self.cache_dir = cache_dir or config.CACHE_DIR
+        digest = hashlib.sha1(os.path.abspath(root).encode('utf-8')).hexdigest()
+        self.index_path = os.path.join(self.cache_dir, f"dirindex-{digest[:16]}.json")
+        
+        self._dirs: Dict[str, list] = {}
+        self._visited: Set[str] = set()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.listed = 0
+        self.reused = 0
+    
+    @staticmethod
+    def signature() -> list:
+        """Get the scan settings an index was built with."""
+        return [sorted(config.CODE_EXTENSIONS), sorted(config.IGNORE_DIRS)]
+    
+    def load(self) -> bool:
+        """
+        Load the index from disk.
+        
+        Returns:
+            True if a compatible index was loaded, False otherwise
+        """
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        
+        if (data.get('version') != self.VERSION
+                or data.get('root') != self.root
+                or data.get('signature') != self.signature()):
+            return False
+        
+        self._dirs = data.get('dirs', {})
+        return True
+    
+    def save(self) -> bool:
+        """
+        Write the index to disk if it changed since the last save.
+        
+        Returns:
+            True if the index is persisted, False on write errors
+        """
+        if not self._dirty:
+            return True
+        
+        data = {
+            'version': self.VERSION,
+            'root': self.root,
+            'signature': self.signature(),
+            'dirs': self._dirs
+        }
+        tmp_path = f"{self.index_path}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_path, self.index_path)
+        except OSError:
+            return False
+        
+        self._dirty = False
+        return True
+    
+    def begin_pass(self):
+        """Start a scan pass, resetting visit tracking and counters."""
+        self._visited = set()
+        self.listed = 0
+        self.reused = 0
+    
+    def end_pass(self):
+        """Finish a scan pass, dropping directories that were not reached."""
+        stale = [path for path in self._dirs if path not in self._visited]
+        if stale:
+            with self._lock:
+                for path in stale:
+                    del self._dirs[path]
+            self._dirty = True
+    
+    def lookup(self, path: str, st: os.stat_result) -> Optional[List[TreeNode]]:
+        """
+        Get the cached children of a directory.
+        
+        Args:
+            path: Directory path
+            st: Current stat result of the directory
+        
+        Returns:
+            Fresh child nodes with current file sizes if the record is
+            current, None otherwise
+        """
+        record = self._dirs.get(path)
+        if record is None or record[:3] != [st.st_mtime_ns, st.st_ino, st.st_size]:
+            return None
+        
+        join = os.path.join
+        children = []
+        resized = False
+        for entry in record[3]:
+            name, kind, size = entry
+            child_path = join(path, name)
+            if kind == 'f':
+                try:
+                    current = os.stat(child_path).st_size
+                except OSError:
+                    continue
+                if current != size:
+                    entry[2] = size = current
+                    resized = True
+            children.append(TreeNode(
+                name=name,
+                path=child_path,
+                is_dir=kind != 'f',
+                size=size,
+                is_link=kind == 'l'
+            ))
+        
+        with self._lock:
+            self._visited.add(path)
+            self.reused += 1
+            if resized:
+                self._dirty = True
+        return children
+    
+    def store(self, path: str, st: os.stat_result, children: List[TreeNode]):
+        """
+        Record a fresh listing of a directory.
+        
+        Args:
+            path: Directory path
+            st: Stat result taken before the directory was listed
+            children: Child nodes returned by the listing
+        """
+        entries = [
+            [c.name, ('l' if c.is_link else 'd') if c.is_dir else 'f', c.size]
+            for c in children
+        ]
+        with self._lock:
+            self._dirs[path] = [st.st_mtime_ns, st.st_ino, st.st_size, entries]
+            self._visited.add(path)
+            self.listed += 1
+            self._dirty = True
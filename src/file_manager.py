@@ -1,10 +1,20 @@
 """File management and scanning module."""
 
 import os
+import threading
 from pathlib import Path
-from typing import List, Optional, Set
-from .models import CodeSegment
-from .config import config
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+from .models import ChangeBatch, CodeSegment, IngestResult, TreeNode
+from .config import config, CategoryConfig
+from .scanner import RepositoryScanner
+from .dir_index import DirectoryIndex
+from .live_tree import LiveTree
+from .category_rules import CategoryRules, guess_category, load_rules_text
+from .ingest import FileIngestor
+from .import_graph import ImportGraph
+from .search_index import SearchIndex, create_embedder
+from .segment_store import SegmentStore
+from .tokenizer import get_token_counter
 
 
 class FileManager:
@@ -13,7 +23,20 @@ class FileManager:
     def __init__(self):
         """Initialize the file manager."""
         self.project_path: str = ""
-        self.code_segments: List[CodeSegment] = []
+        self.segments = SegmentStore()
+        self.project_tree: Optional[TreeNode] = None
+        self.scanner = RepositoryScanner()
+        self.dir_index: Optional[DirectoryIndex] = None
+        self.live_tree: Optional[LiveTree] = None
+        self.search_index: Optional[SearchIndex] = None
+        self.import_graph: Optional[ImportGraph] = None
+        self.ingestor = FileIngestor()
+        self._scan_lock = threading.Lock()
+    
+    @property
+    def code_segments(self) -> Sequence[CodeSegment]:
+        """Get the attached segments in the order they were added (read-only)."""
+        return self.segments.snapshot()
     
     def set_project_path(self, path: str) -> bool:
         """
@@ -27,9 +50,48 @@ class FileManager:
         """
         if os.path.isdir(path):
             self.project_path = path
+            self.dir_index = DirectoryIndex(path)
+            self.dir_index.load()
+            if self.search_index is not None:
+                self.search_index.close()
+                self.search_index = None
+            self.import_graph = None
             return True
         return False
     
+    def scan_project(self, path: Optional[str] = None) -> Optional[TreeNode]:
+        """
+        Scan directory and keep its tree as the project tree.
+        
+        Scans of the project path go through the persistent directory index,
+        so only directories changed since the previous scan are listed again.
+        Scans may run on worker threads; concurrent calls run one at a time.
+        A project scan finishing after another project was opened leaves the
+        project tree alone.
+        
+        Args:
+            path: Path to scan (uses project_path if None)
+            
+        Returns:
+            Root TreeNode, or None if there is no valid directory
+        """
+        scan_path = path or self.project_path
+        if not scan_path or not os.path.isdir(scan_path):
+            return None
+        
+        with self._scan_lock:
+            if scan_path == self.project_path and self.dir_index is not None:
+                root = self.scanner.scan(scan_path, index=self.dir_index)
+                self.dir_index.save()
+            else:
+                root = self.scanner.scan(scan_path)
+            
+            if path is None and scan_path != self.project_path:
+                return root
+            self.project_tree = root
+            self.live_tree = LiveTree(root, self.scanner)
+            return root
+    
     def scan_directory(self, path: Optional[str] = None) -> str:
         """
         Scan directory and return tree structure.
@@ -40,47 +102,51 @@ class FileManager:
         Returns:
             String representation of directory tree
         """
-        scan_path = path or self.project_path
-        if not scan_path or not os.path.isdir(scan_path):
+        root = self.scan_project(path)
+        if root is None:
             return "No valid directory to scan"
+        return RepositoryScanner.render_tree(root)
+    
+    def apply_changes(self, batch: ChangeBatch):
+        """
+        Apply a watcher change batch to the project tree and segments.
+        
+        An overflowed batch rescans the project through the directory
+        index. Meant to run on a worker thread; it waits for running scans.
+        
+        Args:
+            batch: Changed directories and files
+        """
+        if batch.overflow:
+            self.scan_project()
+        else:
+            with self._scan_lock:
+                if self.live_tree is not None:
+                    self.live_tree.apply(batch)
+        self.reload_segments(batch.files)
+    
+    def reload_segments(self, paths) -> int:
+        """
+        Refresh the stat data of segments whose files changed.
+        
+        Segment content is read lazily, so nothing is re-read here; the new
+        content is picked up the next time a prompt is assembled.
         
-        tree_lines = []
-        tree_lines.append(f"📂 {Path(scan_path).name}\n")
-        
-        def scan_dir(current_path: str, prefix: str = ""):
-            """Recursively scan directory."""
-            try:
-                items = sorted(
-                    Path(current_path).iterdir(),
-                    key=lambda x: (not x.is_dir(), x.name.lower())
-                )
-                
-                for idx, item in enumerate(items):
-                    if item.name in config.IGNORE_DIRS:
-                        continue
-                    
-                    is_last = idx == len(items) - 1
-                    connector = "└── " if is_last else "├── "
-                    
-                    if item.is_dir():
-                        tree_lines.append(f"{prefix}{connector}📁 {item.name}\n")
-                        extension = "    " if is_last else "│   "
-                        scan_dir(str(item), prefix + extension)
-                    elif item.suffix in config.CODE_EXTENSIONS:
-                        size = item.stat().st_size
-                        size_str = f"{size/1024:.1f}KB" if size > 1024 else f"{size}B"
-                        tree_lines.append(f"{prefix}{connector}📄 {item.name} ({size_str})\n")
-                        
-            except PermissionError:
-                pass
-        
-        scan_dir(scan_path)
-        return "".join(tree_lines)
+        Args:
+            paths: Paths of changed files
+            
+        Returns:
+            Number of segments updated
+        """
+        return sum(1 for path in set(paths) if self.segments.refresh(path))
     
     def add_file(self, filepath: str, category: str) -> bool:
         """
         Add a file to code segments.
         
+        Only the file's stat data and detected encoding are kept; binary
+        files and files already attached are skipped.
+        
         Args:
             filepath: Path to the file
             category: Category for the file
@@ -88,23 +154,172 @@ class FileManager:
         Returns:
             True if successful, False otherwise
         """
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            segment = CodeSegment(
-                path=filepath,
-                category=category,
-                content=content,
-                selected=True
-            )
+        if filepath in self.segments:
+            return False
+        result = self.ingestor.ingest_file(filepath, category)
+        return result.added and self.segments.add(result.segment)
+    
+    def add_files(self, files: Iterable[Tuple[str, str]]) -> List[IngestResult]:
+        """
+        Add many files, inspecting them on the ingestor's thread pool.
+        
+        Files already attached, or listed twice, are reported as duplicates
+        without being read.
+        
+        Args:
+            files: (path, category) pairs
             
-            self.code_segments.append(segment)
-            return True
+        Returns:
+            One IngestResult per file, in input order
+        """
+        results: List[Optional[IngestResult]] = []
+        pending: List[Tuple[str, str]] = []
+        slots: List[int] = []
+        seen: Set[str] = set()
+        for path, category in files:
+            key = self.segments.key(path)
+            if key in seen or path in self.segments:
+                existing = self.segments.get(path)
+                where = existing.category if existing is not None else category
+                results.append(IngestResult(
+                    path, category, "duplicate",
+                    error=f"já anexado em {CategoryConfig.get_display_name(where)}"
+                ))
+                continue
+            seen.add(key)
+            slots.append(len(results))
+            results.append(None)
+            pending.append((path, category))
+        
+        for slot, result in zip(slots, self.ingestor.ingest(pending)):
+            if result.added and not self.segments.add(result.segment):
+                # Attached by another task while this one was reading it
+                result = IngestResult(result.path, result.category, "duplicate", error="já anexado")
+            results[slot] = result
+        return results
+    
+    def apply_rules(self, rules: CategoryRules) -> List[IngestResult]:
+        """
+        Add every scanned file matched by a rule set to its category.
+        
+        Files already attached are skipped, so rules can be applied again
+        after a rescan to pick up new files only.
+        
+        Args:
+            rules: Compiled rule set
             
-        except Exception as e:
-            print(f"Error reading file {filepath}: {e}")
-            return False
+        Returns:
+            One IngestResult per matched file
+        """
+        if self.project_tree is None:
+            return []
+        
+        matches = [m for m in rules.apply(self.project_tree) if m[0] not in self.segments]
+        return self.add_files(matches)
+    
+    def update_search_index(self) -> Tuple[int, int]:
+        """
+        Index files of the project tree that are new or changed since the last update.
+        
+        The index (and the embedding model, when one is configured) is
+        opened on the first update, which is meant to run in the background.
+        
+        Returns:
+            (files indexed, files removed)
+        """
+        if self.project_tree is None:
+            return 0, 0
+        path, tree = self.project_path, self.project_tree
+        index = self.search_index
+        if index is None:
+            index = SearchIndex(path, embedder=create_embedder())
+            if path != self.project_path:
+                # Another project was opened while the model loaded
+                return 0, 0
+            self.search_index = index
+        return index.update(tree)
+    
+    def suggest_files(self, query: str, k: Optional[int] = None) -> List[IngestResult]:
+        """
+        Attach the project files most relevant to a request.
+        
+        Each file goes to the category the project's saved rules give it,
+        or to a category guessed from its path; files already attached are
+        left as they are.
+        
+        Args:
+            query: The user's instructions
+            k: Number of files to retrieve (default from config)
+        
+        Returns:
+            One IngestResult per retrieved file not yet attached
+        """
+        if self.search_index is None or not query.strip():
+            return []
+        paths = [p for p, _ in self.search_index.search(query, k or config.SEARCH_TOP_K)]
+        return self.add_files(self._categorize(p for p in paths if p not in self.segments))
+    
+    def build_import_graph(self) -> Optional[ImportGraph]:
+        """
+        Build the import graph of the project tree.
+        
+        Only files that changed since the last build are parsed again;
+        the graph is meant to be built in the background.
+        
+        Returns:
+            The graph, or None if no project was scanned
+        """
+        if self.project_tree is None:
+            return None
+        if self.import_graph is None:
+            self.import_graph = ImportGraph(self.project_path)
+        self.import_graph.build(self.project_tree)
+        return self.import_graph
+    
+    def add_with_dependencies(self, paths: Sequence[str], depth: int = 1) -> List[IngestResult]:
+        """
+        Attach files together with the project files they import.
+        
+        Imports are followed up to depth hops (1 for direct imports only).
+        Each new file goes to the category the saved rules give it, or to a
+        category guessed from its path.
+        
+        Args:
+            paths: Files to attach
+            depth: Number of import hops to follow
+        
+        Returns:
+            One IngestResult per file not yet attached, the given files first
+        """
+        graph = self.build_import_graph()
+        if graph is None:
+            return []
+        files = list(dict.fromkeys(paths))
+        files.extend(graph.closure(files, depth))
+        return self.add_files(self._categorize(p for p in files if p not in self.segments))
+    
+    def _categorize(self, paths: Iterable[str]) -> List[Tuple[str, str]]:
+        """Pair project files with their saved-rule or guessed category."""
+        try:
+            rules = CategoryRules.parse(load_rules_text(self.project_path))
+        except ValueError:
+            rules = CategoryRules([])
+        
+        prefix = len(self.project_path.rstrip(os.sep)) + 1
+        files = []
+        for path in paths:
+            rel = path[prefix:].replace(os.sep, "/")
+            files.append((path, rules.match(rel) or guess_category(rel)))
+        return files
+    
+    def remove_file(self, path: str) -> bool:
+        """
+        Remove one file from code segments.
+        
+        Returns:
+            True if the file was attached
+        """
+        return self.segments.remove(path) is not None
     
     def remove_files_by_category(self, category: str) -> int:
         """
@@ -116,12 +331,7 @@ class FileManager:
         Returns:
             Number of files removed
         """
-        initial_count = len(self.code_segments)
-        self.code_segments = [
-            s for s in self.code_segments 
-            if s.category != category
-        ]
-        return initial_count - len(self.code_segments)
+        return self.segments.remove_category(category)
     
     def get_files_by_category(self, category: str) -> List[CodeSegment]:
         """
@@ -133,20 +343,28 @@ class FileManager:
         Returns:
             List of code segments
         """
-        return [s for s in self.code_segments if s.category == category]
+        return list(self.segments.snapshot(category))
     
     def get_all_categories(self) -> Set[str]:
         """Get all categories currently in use."""
-        return {s.category for s in self.code_segments}
+        return self.segments.categories()
     
     def clear_all(self):
         """Clear all code segments."""
-        self.code_segments.clear()
+        self.segments.clear()
     
     def get_segment_count(self) -> int:
         """Get total number of segments."""
-        return len(self.code_segments)
+        return len(self.segments)
     
     def get_total_size(self) -> int:
         """Get total size of all segments in bytes."""
-        return sum(len(s.content) for s in self.code_segments)
+        return self.segments.size
+    
+    def get_total_tokens(self) -> int:
+        """
+        Get the total tokens of all segments.
+        
+        Only segments added or changed since the last call are counted.
+        """
+        return self.segments.count_tokens(get_token_counter().count_segment)
@@ -0,0 +1,432 @@
+"""Cross-file symbol table and import graph of a scanned project."""
+
+import ast
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from .models import TreeNode
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx', '.vue', '.svelte')
+PARSED_EXTENSIONS = ('.py',) + SCRIPT_EXTENSIONS
+
+# import x from 'a', import 'a', export * from 'a', require('a'), import('a')
+SCRIPT_IMPORT = re.compile(r"""\b(?:from|import|require)\s*\(?\s*(['"])([^'"\n]+)\1""")
+SCRIPT_EXPORT = re.compile(
+    r"\bexport\s+(?:default\s+)?(?:declare\s+)?(?:async\s+)?"
+    r"(?:function\*?|class|const|let|var|interface|type|enum)\s+([A-Za-z_$][\w$]*)"
+)
+# Fields of statement nodes holding nested statements
+STATEMENT_FIELDS = ('body', 'orelse', 'finalbody', 'handlers', 'cases')
+# Specifier prefixes that bundlers map to the source folder
+SOURCE_ALIASES = ('@/', '~/')
+
+
+def parse_python(text: str) -> Tuple[List[str], List[list]]:
+    """
+    Get a Python module's top-level names and imports.
+    
+    Imports inside functions count as well, since they are usually there
+    to load the module lazily rather than to avoid depending on it.
+    
+    Returns:
+        (symbols, imports), each import as [level, module, imported names]
+    
+    Raises:
+        SyntaxError: If the module does not parse
+    """
+    tree = ast.parse(text)
+    symbols = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            symbols.append(node.name)
+        elif isinstance(node, ast.Assign):
+            symbols.extend(t.id for t in node.targets if isinstance(t, ast.Name))
+        elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+            symbols.append(node.target.id)
+    
+    # Imports are statements, so expressions need not be walked
+    imports = []
+    stack = list(reversed(tree.body))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Import):
+            imports.extend([0, alias.name, []] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            imports.append([node.level, node.module or "", [alias.name for alias in node.names]])
+        else:
+            for name in STATEMENT_FIELDS:
+                stack.extend(reversed(getattr(node, name, ())))
+    return symbols, imports
+
+
+def parse_script(text: str) -> Tuple[List[str], List[str]]:
+    """
+    Get a JS/TS module's exported names and import specifiers.
+    
+    Returns:
+        (symbols, specifiers)
+    """
+    return SCRIPT_EXPORT.findall(text), [m.group(2) for m in SCRIPT_IMPORT.finditer(text)]
+
+
+def parse_source(path: str, data: bytes) -> list:
+    """
+    Parse a file's content by its extension (picklable, for worker processes).
+    
+    Returns:
+        [symbols, imports], both empty if the content does not parse
+    """
+    text = data.decode('utf-8', errors='replace')
+    try:
+        return list(parse_python(text) if path.endswith('.py') else parse_script(text))
+    except (SyntaxError, ValueError):
+        return [[], []]
+
+
+class ImportGraph:
+    """
+    Symbol table and import graph of a project's Python and JS/TS files.
+    
+    Files are read and hashed on a thread pool, and contents not seen
+    before are parsed on a process pool when there are many of them, as
+    parsing holds the GIL. Parses are cached on disk by content hash, and
+    the hash of each path by its mtime and size, so a rebuild reads only
+    files that changed and parses only contents it has not seen (a file
+    moved or copied is not parsed again).
+    
+    Python imports are resolved the way the interpreter would find them in
+    the project: relative imports from the importing package, absolute ones
+    from the folder above each top-level package (the project root, 'src'
+    and the like), preferring the candidate nearest to the importer. From
+    a package, imported names that are not submodules lead to the files of
+    that package defining them. JS/TS specifiers are resolved when they are
+    relative or use a source alias ('@/', '~/'), trying the usual
+    extensions and index files; package imports are left out.
+    """
+    
+    VERSION = 1
+    PROCESS_MIN_FILES = 200  # fewer new contents are parsed in this process
+    
+    def __init__(self, root: str, cache_dir: Optional[str] = None):
+        """
+        Initialize the graph for a project root.
+        
+        Args:
+            root: Project directory
+            cache_dir: Directory holding the parse cache (default from config)
+        """
+        self.root = root
+        self.cache_dir = cache_dir or config.CACHE_DIR
+        digest = hashlib.sha1(os.path.abspath(root).encode('utf-8')).hexdigest()
+        self.cache_path = os.path.join(self.cache_dir, f"importgraph-{digest[:16]}.json")
+        
+        self.edges: Dict[str, Set[str]] = {}
+        self.symbols: Dict[str, List[str]] = {}
+        self._stamps: Dict[str, list] = {}  # path -> [mtime_ns, size, content hash]
+        self._parsed: Dict[str, list] = {}  # content hash -> [symbols, imports]
+        self._root_package: List[str] = []
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._dirty = False
+        self.parsed = 0
+        self.reused = 0
+    
+    def load(self) -> bool:
+        """
+        Load the parse cache from disk.
+        
+        Returns:
+            True if a compatible cache was loaded, False otherwise
+        """
+        self._loaded = True
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get('version') != self.VERSION or data.get('root') != self.root:
+            return False
+        self._stamps = data.get('paths', {})
+        self._parsed = data.get('parsed', {})
+        return True
+    
+    def save(self) -> bool:
+        """
+        Write the parse cache to disk if it changed since the last save.
+        
+        Returns:
+            True if the cache is persisted, False on write errors
+        """
+        if not self._dirty:
+            return True
+        
+        data = {
+            'version': self.VERSION,
+            'root': self.root,
+            'paths': self._stamps,
+            'parsed': self._parsed
+        }
+        tmp_path = f"{self.cache_path}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            return False
+        
+        self._dirty = False
+        return True
+    
+    def build(self, root: TreeNode):
+        """
+        Rebuild the graph from a scanned tree and persist the parse cache.
+        
+        Args:
+            root: Root node of the scanned project
+        """
+        if not self._loaded:
+            self.load()
+        all_files = {node.path for node in root.iter_files()}
+        paths = [p for p in all_files if p.endswith(PARSED_EXTENSIONS)]
+        self.parsed = 0
+        self.reused = 0
+        
+        with ThreadPoolExecutor(max_workers=config.LOAD_WORKERS, thread_name_prefix="imports") as pool:
+            found = dict(zip(paths, pool.map(self._read, paths, chunksize=32)))
+        
+        digests: Dict[str, Optional[str]] = {}
+        new: Dict[str, Tuple[str, bytes]] = {}  # content hash -> (a path, content)
+        for path, read in found.items():
+            digests[path] = read[0] if read else None
+            if read and read[1] is not None:
+                if read[0] in new:
+                    self.reused += 1
+                else:
+                    new[read[0]] = (path, read[1])
+        self._parse(new)
+        
+        # Only the files still in the project are kept in the cache
+        self._stamps = {p: s for p, s in self._stamps.items() if p in digests}
+        live = {d for d in digests.values() if d is not None}
+        if len(live) != len(self._parsed):
+            self._parsed = {d: record for d, record in self._parsed.items() if d in live}
+            self._dirty = True
+        
+        self._link(digests, all_files)
+        self.save()
+    
+    def _read(self, path: str) -> Optional[Tuple[str, Optional[bytes]]]:
+        """
+        Get a file's content hash (thread-safe).
+        
+        Returns:
+            (hash, content) with the content only when it was never parsed,
+            or None if the file cannot be read
+        """
+        try:
+            st = os.stat(path)
+            stamp = self._stamps.get(path)
+            if stamp is not None and stamp[:2] == [st.st_mtime_ns, st.st_size] and stamp[2] in self._parsed:
+                with self._lock:
+                    self.reused += 1
+                return stamp[2], None
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        
+        digest = hashlib.sha1(data).hexdigest()
+        with self._lock:
+            self._stamps[path] = [st.st_mtime_ns, st.st_size, digest]
+            self._dirty = True
+            if digest in self._parsed:
+                self.reused += 1
+                return digest, None
+        return digest, data
+    
+    def _parse(self, new: Dict[str, Tuple[str, bytes]]):
+        """Parse new contents into the cache, on worker processes if there are many."""
+        if not new:
+            return
+        hashes = list(new)
+        paths = [new[d][0] for d in hashes]
+        contents = [new[d][1] for d in hashes]
+        
+        records = None
+        workers = config.IMPORT_PARSE_PROCESSES or os.cpu_count() or 1
+        if workers > 1 and len(hashes) >= self.PROCESS_MIN_FILES:
+            try:
+                # Forking a process that runs Tk and thread pools can deadlock
+                context = multiprocessing.get_context("spawn")
+                with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                    records = list(pool.map(parse_source, paths, contents, chunksize=16))
+            except (OSError, BrokenProcessPool) as e:
+                logger.warning("Parsing without worker processes: %s", e)
+        if records is None:
+            records = [parse_source(p, c) for p, c in zip(paths, contents)]
+        
+        self._parsed.update(zip(hashes, records))
+        self.parsed += len(hashes)
+        self._dirty = True
+    
+    def _link(self, digests: Dict[str, Optional[str]], all_files: Set[str]):
+        """Resolve every file's imports to project files."""
+        packages = {os.path.dirname(p) for p in digests if os.path.basename(p) == '__init__.py'}
+        # A project opened inside a package imports itself by its full name
+        self._root_package = []
+        folder = os.path.abspath(self.root)
+        while os.path.isfile(os.path.join(folder, '__init__.py')):
+            self._root_package.insert(0, os.path.basename(folder))
+            folder = os.path.dirname(folder)
+        
+        modules: Dict[str, List[str]] = {}
+        for path in digests:
+            if path.endswith('.py'):
+                for name in self._module_names(path, packages):
+                    modules.setdefault(name, []).append(path)
+        
+        self.symbols = {}
+        for path, digest in digests.items():
+            if digest is not None:
+                for name in self._parsed[digest][0]:
+                    self.symbols.setdefault(name, []).append(path)
+        
+        self.edges = {}
+        for path, digest in digests.items():
+            if digest is None:
+                continue
+            imports = self._parsed[digest][1]
+            if path.endswith('.py'):
+                targets = self._resolve_python(path, imports, modules, packages)
+            else:
+                targets = {t for t in (self._resolve_script(path, s, all_files) for s in imports) if t}
+            targets.discard(path)
+            self.edges[path] = targets
+    
+    def _module_names(self, path: str, packages: Set[str]) -> List[str]:
+        """Get the dotted names a Python file can be imported by."""
+        rel = os.path.relpath(path, self.root)
+        parts = rel[:-3].split(os.sep)
+        if parts[-1] == '__init__':
+            parts.pop()
+        parts = self._root_package + parts
+        names = ['.'.join(parts)] if parts else []
+        
+        # Below the folder holding its top-level package, as when that
+        # folder is on sys.path (src layouts, script folders)
+        top = os.path.dirname(path)
+        while top in packages and top != self.root:
+            top = os.path.dirname(top)
+        depth = len(os.path.relpath(top, self.root).split(os.sep)) if top != self.root else 0
+        depth += len(self._root_package)
+        if 0 < depth < len(parts):
+            names.append('.'.join(parts[depth:]))
+        return names
+    
+    def _resolve_python(
+        self,
+        path: str,
+        imports: List[list],
+        modules: Dict[str, List[str]],
+        packages: Set[str]
+    ) -> Set[str]:
+        """Resolve a Python file's imports."""
+        targets: Set[str] = set()
+        names = self._module_names(path, packages)
+        own = names[0].split('.') if names else []
+        package = own if os.path.basename(path) == '__init__.py' else own[:-1]
+        
+        for level, module, names in imports:
+            if level:
+                if level - 1 > len(package):
+                    continue
+                base = package[:len(package) - level + 1]
+                module = '.'.join(base + ([module] if module else []))
+            if not module:
+                continue
+            found = self._nearest(modules.get(module), path)
+            for name in names:
+                # 'from pkg import sub' names a submodule, or a symbol of pkg
+                submodule = self._nearest(modules.get(f"{module}.{name}"), path)
+                if submodule:
+                    targets.add(submodule)
+                elif found and os.path.basename(found) == '__init__.py':
+                    folder = os.path.dirname(found) + os.sep
+                    targets.update(p for p in self.symbols.get(name, ()) if p.startswith(folder))
+            if found:
+                targets.add(found)
+        return targets
+    
+    @staticmethod
+    def _nearest(candidates: Optional[List[str]], path: str) -> Optional[str]:
+        """Pick the candidate sharing the longest folder prefix with path."""
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            return candidates[0]
+        return max(candidates, key=lambda c: len(os.path.commonpath([c, path])))
+    
+    def _resolve_script(self, path: str, spec: str, all_files: Set[str]) -> Optional[str]:
+        """Resolve a JS/TS import specifier to a project file."""
+        if spec.startswith('.'):
+            base = os.path.normpath(os.path.join(os.path.dirname(path), spec))
+            bases = [base]
+        elif spec.startswith(SOURCE_ALIASES):
+            rest = spec[2:].replace('/', os.sep)
+            bases = [os.path.join(self.root, 'src', rest), os.path.join(self.root, rest)]
+        else:
+            return None
+        
+        for base in bases:
+            if base in all_files:
+                return base
+            for extension in SCRIPT_EXTENSIONS + ('.d.ts',):
+                if base + extension in all_files:
+                    return base + extension
+            for extension in SCRIPT_EXTENSIONS:
+                index = os.path.join(base, 'index' + extension)
+                if index in all_files:
+                    return index
+        return None
+    
+    def closure(self, paths: Iterable[str], depth: int) -> Dict[str, int]:
+        """
+        Get the files the given files depend on, directly or indirectly.
+        
+        Args:
+            paths: Starting files
+            depth: Number of import hops to follow (1 for direct imports)
+        
+        Returns:
+            Dependency path -> hops from the nearest starting file, in
+            breadth-first order; the starting files are not included
+        """
+        # Ordered, so the dependencies come out in the same order every run
+        start = dict.fromkeys(paths)
+        found: Dict[str, int] = {}
+        queue = deque((path, 0) for path in start)
+        while queue:
+            path, hops = queue.popleft()
+            if hops >= depth:
+                continue
+            for target in sorted(self.edges.get(path, ())):
+                if target not in start and target not in found:
+                    found[target] = hops + 1
+                    queue.append((target, hops + 1))
+        return found
+    
+    def definitions(self, name: str) -> List[str]:
+        """Get the files defining a top-level name."""
+        return list(self.symbols.get(name, ()))
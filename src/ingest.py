@@ -0,0 +1,151 @@
+"""Concurrent file ingestion with binary sniffing and encoding detection."""
+
+import codecs
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+from .models import CodeSegment, IngestResult
+from .config import config
+
+
+# Bytes found in text files: printable ASCII, high bytes and common controls
+TEXT_BYTES = bytes({7, 8, 9, 10, 11, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7f})
+
+
+def is_binary(head: bytes) -> bool:
+    """
+    Guess whether a file is binary from its first bytes.
+    
+    A NUL byte, or more than 30% of bytes outside TEXT_BYTES, marks the
+    file as binary, as file(1) and most editors do.
+    """
+    if not head:
+        return False
+    if b"\0" in head:
+        return True
+    return len(head.translate(None, TEXT_BYTES)) / len(head) > 0.3
+
+
+def detect_encoding(head: bytes) -> str:
+    """
+    Pick the encoding to decode a text file with.
+    
+    A byte order mark wins; otherwise UTF-8 is used if the head decodes
+    cleanly, then each of config.FALLBACK_ENCODINGS in turn. latin-1
+    decodes any byte, so it is the last resort.
+    
+    Args:
+        head: First bytes of the file
+    
+    Returns:
+        Python codec name
+    """
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    
+    try:
+        # Incremental, so a character cut at the end of the head is fine
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    
+    for encoding in config.FALLBACK_ENCODINGS:
+        try:
+            head.decode(encoding)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return 'latin-1'
+
+
+class FileIngestor:
+    """
+    Turns files into lazy segments on a thread pool.
+    
+    Each file is opened once to read its first SNIFF_BYTES: binaries are
+    skipped without reading further, the encoding is picked from the head,
+    and files over the size cap are marked to load as head plus tail. The
+    content itself is still read only when a prompt is assembled.
+    """
+    
+    SNIFF_BYTES = 8192
+    
+    def __init__(self, max_workers: Optional[int] = None, max_bytes: Optional[int] = None):
+        """
+        Initialize the ingestor.
+        
+        Args:
+            max_workers: Number of reader threads (default from config)
+            max_bytes: Per-file size cap, 0 for none (default from config)
+        """
+        self.max_workers = max_workers or config.LOAD_WORKERS
+        self.max_bytes = max_bytes if max_bytes is not None else config.MAX_FILE_BYTES
+    
+    def ingest_file(self, path: str, category: str) -> IngestResult:
+        """
+        Inspect one file and create its segment (thread-safe).
+        
+        Args:
+            path: Path to the file
+            category: Category for the file
+        
+        Returns:
+            IngestResult with the segment, or why the file was skipped
+        """
+        try:
+            with open(path, 'rb') as f:
+                st = os.fstat(f.fileno())
+                head = f.read(self.SNIFF_BYTES)
+        except OSError as e:
+            return IngestResult(path, category, "error", error=e.strerror or str(e))
+        
+        encoding = detect_encoding(head)
+        if not encoding.startswith('utf-16') and is_binary(head):
+            return IngestResult(path, category, "binary", size=st.st_size)
+        
+        # The cap is kept even for small files, in case they grow while attached
+        segment = CodeSegment(
+            path,
+            category,
+            size=st.st_size,
+            mtime=st.st_mtime,
+            encoding=encoding,
+            max_bytes=self.max_bytes or None
+        )
+        return IngestResult(
+            path,
+            category,
+            "added",
+            segment=segment,
+            encoding=encoding,
+            size=st.st_size,
+            truncated=segment.is_truncated
+        )
+    
+    def ingest(self, files: Iterable[Tuple[str, str]]) -> List[IngestResult]:
+        """
+        Inspect many files concurrently.
+        
+        Args:
+            files: (path, category) pairs
+        
+        Returns:
+            One IngestResult per file, in input order
+        """
+        files = list(files)
+        if not files:
+            return []
+        workers = max(1, min(self.max_workers, len(files)))
+        
+        # One contiguous slice per thread keeps per-file scheduling overhead out
+        size = -(-len(files) // workers)
+        slices = [files[i:i + size] for i in range(0, len(files), size)]
+        
+        def read(items):
+            return [self.ingest_file(path, category) for path, category in items]
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest") as pool:
+            return [result for part in pool.map(read, slices) for result in part]
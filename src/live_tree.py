@@ -0,0 +1,115 @@
+"""Incremental maintenance of the scanned project tree."""
+
+import os
+from typing import List, Optional
+from .models import ChangeBatch, TreeNode
+from .scanner import RepositoryScanner
+
+
+class LiveTree:
+    """
+    Keeps a scanned tree in step with disk changes.
+    
+    Changed directories are listed again and merged into the tree, keeping
+    the scanned subtrees of folders that are still there; changed files only
+    get their size updated. Folder sizes are refreshed along changed paths.
+    An overflowed batch is not handled here: callers rescan the project.
+    """
+    
+    def __init__(self, root: TreeNode, scanner: RepositoryScanner):
+        """
+        Initialize the live tree.
+        
+        Args:
+            root: Root node returned by RepositoryScanner.scan()
+            scanner: Scanner used to list changed directories
+        """
+        self.root = root
+        self.scanner = scanner
+    
+    def apply(self, batch: ChangeBatch):
+        """
+        Apply a batch of changes to the tree.
+        
+        Args:
+            batch: Changed directories and files
+        """
+        for path in sorted(batch.dirs, key=lambda p: p.count(os.sep)):
+            self._refresh_dir(path)
+        
+        for path in sorted(batch.files):
+            if os.path.dirname(path) not in batch.dirs:
+                self._refresh_file(path)
+    
+    def _locate(self, path: str) -> Optional[List[TreeNode]]:
+        """
+        Find a node by path.
+        
+        Returns:
+            Chain of nodes from the root to the node, or None if the path
+            is not part of the tree
+        """
+        rel = os.path.relpath(path, self.root.path)
+        if rel == os.curdir:
+            return [self.root]
+        if rel == os.pardir or rel.startswith(os.pardir + os.sep):
+            return None
+        
+        chain = [self.root]
+        for part in rel.split(os.sep):
+            parent = chain[-1]
+            if not parent.is_dir:
+                return None
+            for child in parent.children:
+                if child.name == part:
+                    chain.append(child)
+                    break
+            else:
+                return None
+        return chain
+    
+    @staticmethod
+    def _resize(chain: List[TreeNode]):
+        """Refresh folder sizes along a changed chain."""
+        for node in reversed(chain):
+            if node.is_dir:
+                node.size = sum(c.size for c in node.children)
+    
+    def _refresh_dir(self, path: str):
+        """Relist one directory, keeping the subtrees of folders still there."""
+        chain = self._locate(path)
+        if chain is None:
+            return
+        node = chain[-1]
+        if not node.is_dir or node.is_link:
+            return
+        
+        kept = {child.name: child for child in node.children if child.is_dir}
+        children = []
+        for fresh in self.scanner.list_directory(path):
+            old = kept.get(fresh.name)
+            if old is not None and fresh.is_dir and fresh.is_link == old.is_link:
+                fresh = old
+            elif fresh.is_dir and not fresh.is_link:
+                scanned = self.scanner.scan(fresh.path)
+                if scanned is not None:
+                    fresh.children = scanned.children
+                    fresh.size = scanned.size
+            children.append(fresh)
+        
+        node.children = children
+        self._resize(chain)
+    
+    def _refresh_file(self, path: str):
+        """Update the size of one modified file."""
+        chain = self._locate(path)
+        if chain is None or chain[-1].is_dir:
+            return
+        
+        try:
+            size = os.stat(path).st_size
+        except OSError:
+            return
+        if size != chain[-1].size:
+            chain[-1].size = size
+            self._resize(chain[:-1])
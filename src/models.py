@@ -1,27 +1,231 @@
 """Data models for the application."""
 
-from dataclasses import dataclass, asdict
-from typing import Optional
+import mmap
+import os
+from dataclasses import dataclass, asdict, field
+from typing import List, Optional, Set
 
 
-@dataclass
 class CodeSegment:
-    """Represents a code file segment."""
+    """
+    Represents a code file segment.
     
-    path: str
-    category: str
-    content: str
-    selected: bool = True
+    File-backed segments only keep path, size and mtime in memory; their
+    content is read from disk when accessed, so prompt assembly is the only
+    time the bytes are resident. Segments created with explicit content keep
+    that text instead.
+    
+    A file-backed segment is decoded with the encoding detected when it was
+    added, and when max_bytes is set a larger file is read as its head and
+    tail around an omission marker.
+    
+    version is bumped whenever the content changes, through the content
+    setter or a refresh that finds the file changed.
+    """
+    
+    __slots__ = (
+        'path', 'category', 'selected', 'size', 'mtime', '_content',
+        'encoding', 'max_bytes', 'version'
+    )
+    
+    MMAP_THRESHOLD = 256 * 1024
+    
+    def __init__(
+        self,
+        path: str,
+        category: str,
+        content: Optional[str] = None,
+        selected: bool = True,
+        size: Optional[int] = None,
+        mtime: Optional[float] = None,
+        encoding: str = 'utf-8',
+        max_bytes: Optional[int] = None
+    ):
+        """Initialize code segment."""
+        self.path = path
+        self.category = category
+        self.selected = selected
+        self._content = content
+        self.size = len(content) if size is None and content is not None else (size or 0)
+        self.mtime = mtime or 0.0
+        self.encoding = encoding
+        self.max_bytes = max_bytes
+        self.version = 0
+    
+    @classmethod
+    def from_file(cls, path: str, category: str, selected: bool = True) -> "CodeSegment":
+        """
+        Create a lazy UTF-8 segment from a file on disk.
+        
+        Args:
+            path: Path to the file
+            category: Category for the file
+            selected: Whether the segment is included in prompts
+            
+        Returns:
+            CodeSegment holding only the file's stat data
+            
+        Raises:
+            OSError: If the file cannot be accessed
+        """
+        st = os.stat(path)
+        return cls(path, category, selected=selected, size=st.st_size, mtime=st.st_mtime)
+    
+    @property
+    def content(self) -> str:
+        """Get segment content, reading it from disk if file-backed."""
+        if self._content is not None:
+            return self._content
+        return self.load()
+    
+    @content.setter
+    def content(self, value: str):
+        """Replace segment content with in-memory text."""
+        self._content = value
+        self.size = len(value)
+        self.version += 1
+    
+    @property
+    def is_lazy(self) -> bool:
+        """Check if content is read from disk on access."""
+        return self._content is None
+    
+    @property
+    def is_truncated(self) -> bool:
+        """Check if only the head and tail of the file are read."""
+        return self.is_lazy and self.max_bytes is not None and self.size > self.max_bytes
+    
+    def load(self, max_bytes: Optional[int] = None) -> str:
+        """
+        Read the file content without caching it.
+        
+        Large files are read through mmap; smaller ones with a single bounded
+        read. Files over the segment's own max_bytes keep their head and tail,
+        cut at line boundaries.
+        
+        Args:
+            max_bytes: Maximum number of bytes to read from the start
+                (default: the segment's cap, or the whole file)
+            
+        Returns:
+            Decoded file content, or an empty string if it cannot be read
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                if max_bytes is None and self.max_bytes is not None and size > self.max_bytes:
+                    return self._load_ends(f, size)
+                
+                limit = size if max_bytes is None else min(size, max_bytes)
+                if limit <= 0:
+                    return ""
+                if limit >= self.MMAP_THRESHOLD:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        data = mapped[:limit]
+                else:
+                    data = f.read(limit)
+        except (OSError, ValueError):
+            return ""
+        return data.decode(self.encoding, errors='replace')
+    
+    def _load_ends(self, f, size: int) -> str:
+        """Read the head and tail of an open file that exceeds max_bytes."""
+        head = f.read(self.max_bytes // 2)
+        f.seek(size - (self.max_bytes - len(head)))
+        tail = f.read()
+        
+        # Whole lines only, so code is not cut mid-statement
+        if not self.encoding.startswith('utf-16'):
+            cut = head.rfind(b"\n")
+            if cut > 0:
+                head = head[:cut + 1]
+            cut = tail.find(b"\n")
+            if 0 <= cut < len(tail) - 1:
+                tail = tail[cut + 1:]
+        
+        omitted = size - len(head) - len(tail)
+        marker = f"\n... [{omitted} bytes omitidos] ...\n\n"
+        return (
+            head.decode(self.encoding, errors='replace')
+            + marker
+            + tail.decode(self.encoding, errors='replace')
+        )
+    
+    def refresh(self) -> bool:
+        """
+        Update size and mtime from disk.
+        
+        Returns:
+            True if the file changed since the last refresh
+        """
+        if not self.is_lazy:
+            return False
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return False
+        changed = (st.st_size, st.st_mtime) != (self.size, self.mtime)
+        self.size, self.mtime = st.st_size, st.st_mtime
+        if changed:
+            self.version += 1
+        return changed
     
     def to_dict(self) -> dict:
         """Convert to dictionary."""
-        return asdict(self)
+        return {
+            'path': self.path,
+            'category': self.category,
+            'content': self.content,
+            'selected': self.selected,
+            'size': self.size,
+            'mtime': self.mtime,
+            'encoding': self.encoding
+        }
     
     @property
     def filename(self) -> str:
         """Get filename from path."""
         from pathlib import Path
         return Path(self.path).name
+    
+    def __repr__(self) -> str:
+        """Get debug representation."""
+        return (
+            f"CodeSegment(path={self.path!r}, category={self.category!r}, "
+            f"size={self.size}, selected={self.selected})"
+        )
+
+
+@dataclass
+class CodeChunk:
+    """Represents a run of whole lines of a file, cut at syntax boundaries."""
+    
+    start_line: int  # 1-based, inclusive
+    end_line: int  # 1-based, inclusive
+    kind: str  # "header", "class", "function", "method" or "block"
+    name: str = ""
+    score: float = 0.0
+    
+    @property
+    def line_count(self) -> int:
+        """Get the number of lines in the chunk."""
+        return self.end_line - self.start_line + 1
+
+
+@dataclass
+class PackResult:
+    """Represents segments packed into a token budget."""
+    
+    segments: List[CodeSegment]
+    budget: int
+    tokens: int = 0
+    dropped: List[str] = field(default_factory=list)
+    truncated: List[str] = field(default_factory=list)
+    summarized: List[str] = field(default_factory=list)
+    
+    def has_omissions(self) -> bool:
+        """Check if any segment was dropped or shortened."""
+        return bool(self.dropped or self.truncated or self.summarized)
 
 
 @dataclass
@@ -33,7 +237,77 @@ class APIResponse:
     error: Optional[str] = None
     model: Optional[str] = None
     tokens_used: Optional[int] = None
+    time_to_first_token: Optional[float] = None  # seconds, streaming only
+    tokens_per_second: Optional[float] = None  # output tokens, streaming only
+    cached: bool = False
+    cache_read_tokens: Optional[int] = None  # input tokens served from the prompt cache
+    cache_creation_tokens: Optional[int] = None  # input tokens written to the prompt cache
+    status_code: Optional[int] = None  # HTTP status of a failed request
+    retry_after: Optional[float] = None  # seconds the server asked to wait before retrying
     
     def to_dict(self) -> dict:
         """Convert to dictionary."""
         return asdict(self)
+
+
+@dataclass
+class TreeNode:
+    """Represents a file or directory found while scanning a project."""
+    
+    name: str
+    path: str
+    is_dir: bool
+    size: int = 0
+    is_link: bool = False
+    children: List["TreeNode"] = field(default_factory=list)
+    
+    def iter_files(self):
+        """Iterate over every file node below this node."""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node.is_dir:
+                stack.extend(reversed(node.children))
+            else:
+                yield node
+
+
+
+@dataclass
+class IngestResult:
+    """Represents the outcome of adding one file."""
+    
+    path: str
+    category: str
+    status: str  # "added", "binary", "duplicate" or "error"
+    segment: Optional[CodeSegment] = None
+    encoding: Optional[str] = None
+    size: int = 0
+    truncated: bool = False
+    error: Optional[str] = None
+    
+    @property
+    def added(self) -> bool:
+        """Check if the file became a segment."""
+        return self.status == "added"
+
+
+@dataclass
+class TreeRow:
+    """Represents one visible row of the project tree view."""
+    
+    node: TreeNode
+    depth: int
+
+
+@dataclass
+class ChangeBatch:
+    """Represents a debounced batch of filesystem changes."""
+    
+    dirs: Set[str] = field(default_factory=set)
+    files: Set[str] = field(default_factory=set)
+    overflow: bool = False
+    
+    def is_empty(self) -> bool:
+        """Check if the batch carries no changes."""
+        return not (self.dirs or self.files or self.overflow)
@@ -1,31 +1,198 @@
 """Prompt building and formatting module."""
 
+import os
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Dict
-from .models import CodeSegment
-from .config import CategoryConfig
+from typing import Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+from .models import CodeSegment, PackResult
+from .config import config, CategoryConfig
+from .tokenizer import CachedTokenCounter, TokenCounter, get_token_counter
 
 
 class PromptBuilder:
     """Builds formatted prompts for Claude API."""
     
+    EMPTY_PROMPT = "Nenhum código selecionado para análise."
+    HEADER = "# Análise e Modificação de Código\n"
+    STRUCTURE_HEADER = "\n## Estrutura do Código:\n"
+    FILE_FOOTER = "\n```\n"
+    OMISSION_LIST_LIMIT = 50
+    FOOTER = (
+        "\n## Instruções:\n"
+        "Analise o código fornecido e forneça uma resposta clara, "
+        "estruturada e detalhada conforme solicitado.\n"
+    )
+    
     @staticmethod
-    def build_prompt(user_request: str, code_segments: List[CodeSegment]) -> str:
+    def build_prompt(
+        user_request: str,
+        code_segments: List[CodeSegment],
+        token_budget: Optional[int] = None
+    ) -> str:
         """
         Build a formatted prompt from user request and code segments.
         
         Args:
             user_request: The user's instructions
             code_segments: List of code segments to include
+            token_budget: Pack segments to fit this many tokens (no limit if None)
             
         Returns:
             Formatted prompt string
         """
-        prompt_parts = []
+        pack = None
+        if token_budget is not None:
+            pack = PromptBuilder.pack(user_request, code_segments, token_budget)
+        return "".join(PromptBuilder.iter_prompt(user_request, code_segments, pack))
+    
+    @staticmethod
+    def pack(user_request: str, code_segments: List[CodeSegment], token_budget: int) -> PackResult:
+        """
+        Fit segments into a token budget.
+        
+        Args:
+            user_request: The user's instructions
+            code_segments: List of code segments to choose from
+            token_budget: Maximum tokens for the whole prompt
+            
+        Returns:
+            PackResult with the segments to emit and what was left out
+        """
+        from .context_packer import ContextPacker
+        return ContextPacker(token_budget).pack(user_request, code_segments)
+    
+    @staticmethod
+    def request_block(user_request: str) -> str:
+        """Get the user request section."""
+        return f"\n## Solicitação do Usuário:\n{user_request}\n"
+    
+    @staticmethod
+    def category_header(category: str) -> str:
+        """Get the heading emitted before a category's files."""
+        return f"\n### {CategoryConfig.get_display_name(category)}:\n"
+    
+    @staticmethod
+    def file_header(segment: CodeSegment) -> str:
+        """Get the heading and fence opening emitted before a file."""
+        return f"\n#### Arquivo: `{Path(segment.path).name}`\n```\n"
+    
+    @staticmethod
+    def duplicate_block(segment: CodeSegment, original: CodeSegment) -> str:
+        """Get the cross-reference emitted instead of a repeated file's content."""
+        return (
+            f"\n#### Arquivo: `{Path(segment.path).name}`\n"
+            f"(conteúdo idêntico a `{Path(original.path).name}` em "
+            f"{CategoryConfig.get_display_name(original.category)})\n"
+        )
+    
+    @staticmethod
+    def omission_notice(pack: PackResult) -> str:
+        """Get the section listing files left out or shortened by packing."""
+        lines = ["\n## Arquivos Ajustados ao Limite de Contexto:\n"]
+        listed = 0
+        for label, paths in (
+            ("truncado", pack.truncated),
+            ("apenas assinaturas", pack.summarized),
+            ("omitido", pack.dropped)
+        ):
+            for path in paths:
+                if listed == PromptBuilder.OMISSION_LIST_LIMIT:
+                    break
+                lines.append(f"- `{Path(path).name}` ({label})\n")
+                listed += 1
+        
+        total = len(pack.truncated) + len(pack.summarized) + len(pack.dropped)
+        if total > listed:
+            lines.append(f"- ... e mais {total - listed} arquivo(s) omitido(s)\n")
+        return "".join(lines)
+    
+    @staticmethod
+    def iter_prompt(
+        user_request: str,
+        code_segments: List[CodeSegment],
+        pack: Optional[PackResult] = None,
+        layout: Optional[str] = None,
+        cache: Optional["PromptCache"] = None
+    ) -> Iterator[str]:
+        """
+        Yield the formatted prompt chunk by chunk, in order.
         
-        # Header
-        prompt_parts.append("# Análise e Modificação de Código\n")
-        prompt_parts.append(f"\n## Solicitação do Usuário:\n{user_request}\n")
+        Segment content is read one file at a time, so the full prompt is
+        never held in memory unless the caller joins the chunks.
+        
+        Args:
+            user_request: The user's instructions
+            code_segments: List of code segments to include
+            pack: Packing result to emit instead of code_segments
+            layout: "context_first" puts the code before the request so the
+                prompt prefix stays the same across questions about the same
+                files; "request_first" puts the request right after the
+                header (default from config)
+            cache: Rendered blocks kept from previous builds
+            
+        Yields:
+            Prompt text chunks
+        """
+        if not PromptBuilder.has_context(code_segments, pack):
+            yield PromptBuilder.EMPTY_PROMPT
+            return
+        
+        if (layout or config.PROMPT_LAYOUT) == "context_first":
+            yield from PromptBuilder.iter_context(code_segments, pack, cache)
+            yield from PromptBuilder.iter_instructions(user_request)
+            return
+        
+        yield PromptBuilder.HEADER
+        yield PromptBuilder.request_block(user_request)
+        yield from PromptBuilder.iter_code(code_segments, pack, cache)
+        yield PromptBuilder.FOOTER
+    
+    @staticmethod
+    def has_context(code_segments: List[CodeSegment], pack: Optional[PackResult] = None) -> bool:
+        """Check if there is any selected code to put in a prompt."""
+        if pack is not None:
+            code_segments = pack.segments
+        return any(segment.selected for segment in code_segments)
+    
+    @staticmethod
+    def iter_context(
+        code_segments: List[CodeSegment],
+        pack: Optional[PackResult] = None,
+        cache: Optional["PromptCache"] = None
+    ) -> Iterator[str]:
+        """
+        Yield the stable part of a context-first prompt.
+        
+        It depends only on the attached files, so it can be sent as a
+        cacheable prefix shared by every question about them.
+        """
+        yield PromptBuilder.HEADER
+        yield from PromptBuilder.iter_code(code_segments, pack, cache)
+    
+    @staticmethod
+    def iter_instructions(user_request: str) -> Iterator[str]:
+        """Yield the variable part of a context-first prompt."""
+        yield PromptBuilder.request_block(user_request)
+        yield PromptBuilder.FOOTER
+    
+    @staticmethod
+    def iter_code(
+        code_segments: List[CodeSegment],
+        pack: Optional[PackResult] = None,
+        cache: Optional["PromptCache"] = None
+    ) -> Iterator[str]:
+        """
+        Yield the code structure section.
+        
+        A file whose content is identical to one already emitted gets a
+        cross-reference to it instead of a second copy; contents are keyed
+        by hash and compared in full on a hit.
+        
+        With a cache, each file is yielded as one block reused from the
+        previous build when the file did not change.
+        """
+        if pack is not None:
+            code_segments = pack.segments
         
         # Organize by category
         categories: Dict[str, List[CodeSegment]] = {}
@@ -35,27 +202,85 @@ class PromptBuilder:
                     categories[segment.category] = []
                 categories[segment.category].append(segment)
         
-        if not categories:
-            return "Nenhum código selecionado para análise."
-        
         # Add code structure
-        prompt_parts.append("\n## Estrutura do Código:\n")
+        yield PromptBuilder.STRUCTURE_HEADER
         
+        if cache is not None:
+            yield from cache.render(categories)
+            if pack is not None and pack.has_omissions():
+                yield PromptBuilder.omission_notice(pack)
+            return
+        
+        emitted: Dict[bytes, CodeSegment] = {}
         for category, segments in categories.items():
-            category_name = CategoryConfig.get_display_name(category)
-            prompt_parts.append(f"\n### {category_name}:\n")
+            yield PromptBuilder.category_header(category)
             
             for segment in segments:
-                filename = Path(segment.path).name
-                prompt_parts.append(f"\n#### Arquivo: `{filename}`\n")
-                prompt_parts.append(f"```\n{segment.content}\n```\n")
+                content = segment.content
+                if content:
+                    digest = CachedTokenCounter.content_hash(content)
+                    original = emitted.get(digest)
+                    if original is not None and original.content == content:
+                        yield PromptBuilder.duplicate_block(segment, original)
+                        continue
+                    emitted.setdefault(digest, segment)
+                yield PromptBuilder.file_header(segment)
+                yield content
+                yield PromptBuilder.FILE_FOOTER
         
-        # Footer instructions
-        prompt_parts.append("\n## Instruções:\n")
-        prompt_parts.append("Analise o código fornecido e forneça uma resposta clara, ")
-        prompt_parts.append("estruturada e detalhada conforme solicitado.\n")
+        if pack is not None and pack.has_omissions():
+            yield PromptBuilder.omission_notice(pack)
+    
+    @staticmethod
+    def split_prompt(
+        user_request: str,
+        code_segments: List[CodeSegment],
+        pack: Optional[PackResult] = None
+    ) -> Tuple[str, str]:
+        """
+        Build a context-first prompt as its cacheable and variable parts.
         
-        return "".join(prompt_parts)
+        Args:
+            user_request: The user's instructions
+            code_segments: List of code segments to include
+            pack: Packing result to emit instead of code_segments
+            
+        Returns:
+            Tuple of (code context, instructions); joined they equal the
+            context_first prompt
+        """
+        return (
+            "".join(PromptBuilder.iter_context(code_segments, pack)),
+            "".join(PromptBuilder.iter_instructions(user_request))
+        )
+    
+    @staticmethod
+    def write_prompt(
+        out: TextIO,
+        user_request: str,
+        code_segments: List[CodeSegment],
+        pack: Optional[PackResult] = None
+    ) -> Dict[str, int]:
+        """
+        Stream the formatted prompt into a writable text stream.
+        
+        Works with files opened in text mode and with sockets wrapped by
+        socket.makefile('w', encoding='utf-8').
+        
+        Args:
+            out: Text stream to write to
+            user_request: The user's instructions
+            code_segments: List of code segments to include
+            pack: Packing result to emit instead of code_segments
+            
+        Returns:
+            Statistics of the written prompt (same keys as get_prompt_stats)
+        """
+        stats = PromptStats()
+        for chunk in stats.track(PromptBuilder.iter_prompt(user_request, code_segments, pack)):
+            out.write(chunk)
+        out.flush()
+        return stats.to_dict()
     
     @staticmethod
     def build_docstring_prompt(code_segments: List[CodeSegment]) -> str:
@@ -129,9 +354,227 @@ class PromptBuilder:
         Returns:
             Dictionary with statistics
         """
+        stats = PromptStats()
+        stats.update(prompt)
+        return stats.to_dict()
+
+
+class PromptStats:
+    """Prompt statistics accumulated chunk by chunk."""
+    
+    def __init__(self, counter: Optional[TokenCounter] = None, cache: Optional["PromptCache"] = None):
+        """
+        Initialize empty statistics.
+        
+        Args:
+            counter: Token counter (default is the shared cached counter)
+            cache: Prompt cache whose blocks' statistics are memoized
+        """
+        self.counter = counter or get_token_counter()
+        self.cache = cache
+        self.characters = 0
+        self.newlines = 0
+        self.words = 0
+        self.tokens = 0
+        self._in_word = False
+    
+    def update(self, chunk: str):
+        """Add a chunk of prompt text to the statistics."""
+        if not chunk:
+            return
+        
+        measured = self.cache.get_stats(chunk) if self.cache is not None else None
+        if measured is None:
+            measured = (
+                len(chunk),
+                chunk.count('\n'),
+                len(chunk.split()),
+                self.counter.count(chunk)
+            )
+            if self.cache is not None:
+                self.cache.set_stats(chunk, measured)
+        
+        characters, newlines, words, tokens = measured
+        self.characters += characters
+        self.newlines += newlines
+        self.tokens += tokens
+        self.words += words
+        if self._in_word and not chunk[0].isspace():
+            # The chunk continues a word started by the previous one
+            self.words -= 1
+        self._in_word = not chunk[-1].isspace()
+    
+    def track(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Pass chunks through while accumulating their statistics."""
+        for chunk in chunks:
+            self.update(chunk)
+            yield chunk
+    
+    def to_dict(self) -> Dict[str, int]:
+        """Convert to the dictionary returned by get_prompt_stats."""
         return {
-            'characters': len(prompt),
-            'lines': prompt.count('\n') + 1,
-            'words': len(prompt.split()),
-            'estimated_tokens': len(prompt) // 4  # Rough estimate
+            'characters': self.characters,
+            'lines': self.newlines + 1,
+            'words': self.words,
+            'estimated_tokens': self.tokens
         }
+
+
+class PromptCache:
+    """
+    Rendered prompt blocks kept between builds.
+    
+    Each file's block (heading, content and closing fence) is cached by
+    path with a stamp of the segment version and, for file-backed segments,
+    the file's current size and mtime, so only files changed since the last
+    build are read again. Each category keeps the tuple of chunks it was
+    last rendered as, reused while its blocks stay the same.
+    
+    Cached blocks are the same string objects from build to build, so the
+    preview can diff two builds by identity, and their statistics are
+    memoized for PromptStats.
+    
+    Blocks are kept in least recently used order; after each build the
+    oldest are dropped until the cache holds at most max_chars characters.
+    """
+    
+    def __init__(self, max_chars: Optional[int] = None):
+        """
+        Initialize an empty cache.
+        
+        Args:
+            max_chars: Characters of blocks kept between builds (default from config)
+        """
+        self.max_chars = config.PROMPT_CACHE_MAX_CHARS if max_chars is None else max_chars
+        # path -> (stamp, block, content digest, content start, in-memory source)
+        self._blocks: "OrderedDict[str, Tuple[tuple, str, Optional[bytes], int, Optional[str]]]" = OrderedDict()
+        self._chars = 0
+        self._categories: Dict[str, Tuple[str, ...]] = {}
+        self._stats: Dict[int, Tuple[str, Tuple[int, int, int, int]]] = {}
+        self._block_ids: Set[int] = set()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def stamp(segment: CodeSegment) -> tuple:
+        """Get the key a cached block must match to be reused."""
+        if not segment.is_lazy:
+            return (segment.version, id(segment.content))
+        try:
+            st = os.stat(segment.path)
+            disk = (st.st_size, st.st_mtime_ns)
+        except OSError:
+            disk = None
+        return (segment.version, segment.encoding, segment.max_bytes, disk)
+    
+    def block(self, segment: CodeSegment) -> Tuple[tuple, str, Optional[bytes], int, Optional[str]]:
+        """Get a segment's cached block entry, rendering it if stale."""
+        stamp = self.stamp(segment)
+        entry = self._blocks.get(segment.path)
+        if entry is not None and entry[0] == stamp:
+            self.hits += 1
+            self._blocks.move_to_end(segment.path)
+            return entry
+        
+        self.misses += 1
+        if entry is not None:
+            self._forget(self._blocks.pop(segment.path))
+        content = segment.content
+        header = PromptBuilder.file_header(segment)
+        entry = (
+            stamp,
+            header + content + PromptBuilder.FILE_FOOTER,
+            CachedTokenCounter.content_hash(content) if content else None,
+            len(header),
+            None if segment.is_lazy else content
+        )
+        self._blocks[segment.path] = entry
+        self._block_ids.add(id(entry[1]))
+        self._chars += len(entry[1])
+        return entry
+    
+    @staticmethod
+    def _content(entry) -> str:
+        """Get the file content held in a block entry."""
+        return entry[1][entry[3]:len(entry[1]) - len(PromptBuilder.FILE_FOOTER)]
+    
+    def render(self, categories: Dict[str, List[CodeSegment]]) -> Iterator[str]:
+        """
+        Yield the category sections of the code structure.
+        
+        Repeated contents get a cross-reference, as in PromptBuilder.iter_code.
+        
+        Args:
+            categories: Selected segments grouped by category, in order
+        
+        Yields:
+            Category headings and file blocks
+        """
+        seen = set()
+        emitted: Dict[bytes, Tuple[CodeSegment, tuple]] = {}
+        for category, segments in categories.items():
+            chunks = [PromptBuilder.category_header(category)]
+            for segment in segments:
+                entry = self.block(segment)
+                seen.add(segment.path)
+                digest = entry[2]
+                if digest is not None:
+                    first = emitted.get(digest)
+                    if first is not None and self._content(first[1]) == self._content(entry):
+                        chunks.append(PromptBuilder.duplicate_block(segment, first[0]))
+                        continue
+                    emitted.setdefault(digest, (segment, entry))
+                chunks.append(entry[1])
+            
+            cached = self._categories.get(category)
+            if cached != tuple(chunks):
+                cached = self._categories[category] = tuple(chunks)
+            yield from cached
+        
+        self._prune(seen, set(categories))
+    
+    def _prune(self, paths, categories):
+        """Drop blocks of files and categories left out of the last build, then trim to size."""
+        if len(self._blocks) > len(paths):
+            for path in [p for p in self._blocks if p not in paths]:
+                self._forget(self._blocks.pop(path))
+        if len(self._categories) > len(categories):
+            for category in [c for c in self._categories if c not in categories]:
+                del self._categories[category]
+        
+        if self._chars > self.max_chars:
+            evicted = set()
+            while self._chars > self.max_chars and self._blocks:
+                _, entry = self._blocks.popitem(last=False)
+                evicted.add(id(entry[1]))
+                self._forget(entry)
+            # Categories holding an evicted block would keep it alive
+            for category in [c for c, chunks in self._categories.items()
+                             if any(id(chunk) in evicted for chunk in chunks)]:
+                del self._categories[category]
+    
+    def _forget(self, entry):
+        """Drop the accounting and memoized statistics of a removed block."""
+        self._chars -= len(entry[1])
+        self._block_ids.discard(id(entry[1]))
+        self._stats.pop(id(entry[1]), None)
+    
+    def get_stats(self, chunk: str) -> Optional[Tuple[int, int, int, int]]:
+        """Get the memoized statistics of a cached block."""
+        entry = self._stats.get(id(chunk))
+        if entry is not None and entry[0] is chunk:
+            return entry[1]
+        return None
+    
+    def set_stats(self, chunk: str, stats: Tuple[int, int, int, int]):
+        """Memoize the statistics of a chunk if it is a cached block."""
+        if id(chunk) in self._block_ids:
+            self._stats[id(chunk)] = (chunk, stats)
+    
+    def clear(self):
+        """Drop every cached block."""
+        self._blocks.clear()
+        self._categories.clear()
+        self._stats.clear()
+        self._block_ids.clear()
+        self._chars = 0
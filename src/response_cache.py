@@ -0,0 +1,211 @@
+"""Local cache of API responses."""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+from .models import APIResponse
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache of successful responses, keyed by request hash.
+    
+    Entries are evicted least recently used first once the stored text
+    exceeds max_bytes, and expire after ttl seconds when a TTL is set.
+    The database is opened on first use and may be shared across threads.
+    If it cannot be opened (an unwritable cache directory, say) the cache
+    stays disabled: every lookup misses and nothing is stored.
+    """
+    
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            path: SQLite file (default responses.sqlite3 in config.CACHE_DIR)
+            max_bytes: Size bound for cached text (default from config)
+            ttl: Seconds before an entry expires, 0 for never (default from config)
+        """
+        self.path = path or os.path.join(config.CACHE_DIR, "responses.sqlite3")
+        self.max_bytes = max_bytes if max_bytes is not None else config.RESPONSE_CACHE_MAX_BYTES
+        self.ttl = ttl if ttl is not None else config.RESPONSE_CACHE_TTL_SECONDS
+        self._db: Optional[sqlite3.Connection] = None
+        self._disabled = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+    
+    @staticmethod
+    def make_key(model: str, max_tokens: int, prompt: str) -> str:
+        """Get the cache key for a request."""
+        payload = json.dumps([model, max_tokens, prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8', errors='surrogatepass')).hexdigest()
+    
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """
+        Open the database, creating it if needed (call with the lock held).
+        
+        Returns:
+            The connection, or None if the cache is disabled
+        """
+        if self._db is None and not self._disabled:
+            db = None
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                db = sqlite3.connect(self.path, check_same_thread=False)
+                # Access-time updates on every hit should not wait for an fsync
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("PRAGMA synchronous=NORMAL")
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, content TEXT NOT NULL, model TEXT, "
+                    "tokens_used INTEGER, size INTEGER NOT NULL, "
+                    "created REAL NOT NULL, accessed REAL NOT NULL)"
+                )
+                db.execute(
+                    "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)"
+                )
+                db.commit()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning("Response cache disabled, cannot open %s: %s", self.path, e)
+                if db is not None:
+                    db.close()
+                self._disabled = True
+                return None
+            self._db = db
+        return self._db
+    
+    def get(self, key: str, request_bytes: int = 0) -> Optional[APIResponse]:
+        """
+        Look up a cached response.
+        
+        Args:
+            key: Key from make_key()
+            request_bytes: Size of the request, counted as saved on a hit
+        
+        Returns:
+            The cached APIResponse, or None on a miss or expired entry
+        """
+        now = time.time()
+        with self._lock:
+            try:
+                db = self._connect()
+                if db is None:
+                    self.misses += 1
+                    return None
+                row = db.execute(
+                    "SELECT content, model, tokens_used, size, created FROM responses WHERE key = ?",
+                    (key,)
+                ).fetchone()
+                if row is not None and self.ttl and now - row[4] > self.ttl:
+                    db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    db.commit()
+                    row = None
+                if row is None:
+                    self.misses += 1
+                    return None
+                
+                db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                db.commit()
+            except sqlite3.Error as e:
+                logger.warning("Error reading response cache: %s", e)
+                self.misses += 1
+                return None
+            
+            content, model, tokens_used, size, _ = row
+            self.hits += 1
+            self.bytes_saved += size + request_bytes
+        
+        return APIResponse(
+            success=True,
+            content=content,
+            model=model,
+            tokens_used=tokens_used,
+            cached=True
+        )
+    
+    def put(self, key: str, response: APIResponse):
+        """
+        Store a successful response and evict old entries past the size bound.
+        
+        Args:
+            key: Key from make_key()
+            response: Response to store (failures are ignored)
+        """
+        if not response.success or response.content is None:
+            return
+        
+        size = len(response.content.encode('utf-8', errors='surrogatepass'))
+        if size > self.max_bytes:
+            return
+        
+        now = time.time()
+        with self._lock:
+            try:
+                db = self._connect()
+                if db is None:
+                    return
+                db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, response.content, response.model, response.tokens_used, size, now, now)
+                )
+                self._evict(db)
+                db.commit()
+            except sqlite3.Error as e:
+                logger.warning("Error writing response cache: %s", e)
+    
+    def _evict(self, db: sqlite3.Connection):
+        """Delete least recently used entries until under max_bytes."""
+        if self.ttl:
+            db.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+        
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        excess = total - self.max_bytes
+        stale = []
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            stale.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        db.executemany("DELETE FROM responses WHERE key = ?", stale)
+    
+    def hit_rate(self) -> float:
+        """Get the fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+    
+    def clear(self):
+        """Delete every cached response."""
+        with self._lock:
+            try:
+                db = self._connect()
+                if db is None:
+                    return
+                db.execute("DELETE FROM responses")
+                db.commit()
+            except sqlite3.Error as e:
+                logger.warning("Error clearing response cache: %s", e)
+    
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
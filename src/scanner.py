@@ -0,0 +1,200 @@
+"""Parallel repository scanning module."""
+
+import os
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+from .models import TreeNode
+from .config import config
+from .dir_index import DirectoryIndex
+
+
+def format_size(size: int) -> str:
+    """Format a file size the way the project tree displays it."""
+    return f"{size/1024:.1f}KB" if size > 1024 else f"{size}B"
+
+
+def sort_key(node: TreeNode) -> tuple:
+    """Order tree entries with directories first, then by name."""
+    return (not node.is_dir, node.name.lower(), node.name)
+
+
+class RepositoryScanner:
+    """Walks a project tree with os.scandir and a thread pool."""
+    
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        code_extensions: Optional[Set[str]] = None,
+        ignore_dirs: Optional[Set[str]] = None
+    ):
+        """
+        Initialize the scanner.
+        
+        Args:
+            max_workers: Number of threads walking subtrees concurrently
+            code_extensions: File suffixes to include (default from config)
+            ignore_dirs: Entry names to skip (default from config)
+        """
+        self.max_workers = max_workers or config.SCAN_MAX_WORKERS
+        self.code_extensions = code_extensions or config.CODE_EXTENSIONS
+        self.ignore_dirs = ignore_dirs or config.IGNORE_DIRS
+    
+    def scan(self, root: str, index: Optional[DirectoryIndex] = None) -> Optional[TreeNode]:
+        """
+        Scan a directory tree.
+        
+        Every directory is listed by its own task, so sibling subtrees are
+        walked concurrently. Symlinked directories are listed as entries but
+        not descended into, which keeps link cycles from looping forever.
+        
+        With an index, directories whose stat data is unchanged reuse their
+        cached listing and only modified directories are listed again.
+        
+        Args:
+            root: Directory to scan
+            index: Optional DirectoryIndex for incremental rescans
+        
+        Returns:
+            Root TreeNode with sizes accumulated, or None if root is invalid
+        """
+        if not root or not os.path.isdir(root):
+            return None
+        
+        root_node = TreeNode(name=Path(root).name, path=root, is_dir=True)
+        
+        if index is None:
+            lister = self.list_directory
+        else:
+            lister = partial(self._list_indexed, index)
+            index.begin_pass()
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pending: Dict = {pool.submit(lister, root): root_node}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node = pending.pop(future)
+                    node.children = future.result()
+                    for child in node.children:
+                        if child.is_dir and not child.is_link:
+                            pending[pool.submit(lister, child.path)] = child
+        
+        if index is not None:
+            index.end_pass()
+        
+        self.accumulate_sizes(root_node)
+        return root_node
+    
+    def list_directory(self, path: str) -> List[TreeNode]:
+        """
+        List the visible entries of a single directory.
+        
+        Args:
+            path: Directory to list
+        
+        Returns:
+            Child nodes sorted with directories first, then by name
+        """
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except OSError:
+            return []
+        
+        children = []
+        for entry in entries:
+            if entry.name in self.ignore_dirs:
+                continue
+            
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            
+            if is_dir:
+                children.append(TreeNode(
+                    name=entry.name,
+                    path=entry.path,
+                    is_dir=True,
+                    is_link=entry.is_symlink()
+                ))
+            elif os.path.splitext(entry.name)[1] in self.code_extensions:
+                try:
+                    size = entry.stat().st_size
+                except OSError:
+                    continue
+                children.append(
+                    TreeNode(name=entry.name, path=entry.path, is_dir=False, size=size)
+                )
+        
+        children.sort(key=sort_key)
+        return children
+    
+    def _list_indexed(self, index: DirectoryIndex, path: str) -> List[TreeNode]:
+        """List a directory through the index, relisting it only if changed."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return []
+        
+        children = index.lookup(path, st)
+        if children is None:
+            children = self.list_directory(path)
+            index.store(path, st, children)
+        return children
+    
+    @staticmethod
+    def accumulate_sizes(root: TreeNode) -> int:
+        """Set each directory size to the total of the files below it."""
+        order = []
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if node.is_dir:
+                order.append(node)
+                stack.extend(c for c in node.children if c.is_dir)
+        
+        for node in reversed(order):
+            node.size = sum(c.size for c in node.children)
+        return root.size
+    
+    @staticmethod
+    def render_tree(root: TreeNode) -> str:
+        """
+        Render a scanned tree as the emoji tree text shown in the UI.
+        
+        Args:
+            root: Root node returned by scan()
+        
+        Returns:
+            String representation of directory tree
+        """
+        tree_lines = [f"📂 {root.name}\n"]
+        last = len(root.children) - 1
+        for idx, child in enumerate(root.children):
+            RepositoryScanner.render_node(child, "", idx == last, tree_lines)
+        return "".join(tree_lines)
+    
+    @staticmethod
+    def render_node(node: TreeNode, prefix: str, is_last: bool, tree_lines: List[str]):
+        """
+        Render a node and everything below it.
+        
+        Args:
+            node: Node to render
+            prefix: Indentation inherited from the parent directories
+            is_last: Whether the node is the last child of its parent
+            tree_lines: List the rendered lines are appended to
+        """
+        connector = "└── " if is_last else "├── "
+        if not node.is_dir:
+            tree_lines.append(f"{prefix}{connector}📄 {node.name} ({format_size(node.size)})\n")
+            return
+        
+        tree_lines.append(f"{prefix}{connector}📁 {node.name}\n")
+        child_prefix = prefix + ("    " if is_last else "│   ")
+        last = len(node.children) - 1
+        for idx, child in enumerate(node.children):
+            RepositoryScanner.render_node(child, child_prefix, idx == last, tree_lines)
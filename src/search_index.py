@@ -0,0 +1,404 @@
+"""Local retrieval index over the files of a scanned project."""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+from .models import TreeNode
+from .config import config
+from .ingest import detect_encoding, is_binary
+
+logger = logging.getLogger(__name__)
+
+# Words split at underscores, digits and camelCase humps ("HTTPServer" -> HTTP, Server)
+IDENTIFIER_PART = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[^\W\d_A-Z]+")
+COMBINING_MARK = re.compile(r"[\u0300-\u036f]")
+PLURAL_IES = re.compile(r"(?<=\w\w)ies\b")
+PLURAL_S = re.compile(r"(?<=\w\w[^\W\dsui])s\b")
+
+# Words of instructions that say nothing about which files are meant
+QUERY_STOPWORD_TEXT = """
+a o as os um uma uns umas de do da dos das no na nos nas em ao aos à às e ou que se por para com
+sem como mais menos muito pouco este esta isto esse essa isso aquele aquela eu voce você ele ela
+nos nós eles elas meu minha seu sua não nao sim quando onde porque qual quais ser estar ter fazer
+faça faz pode deve todo toda todos todas cada já ja também tambem só so entre sobre até ate mas
+the an of to in on at for with by from and or not is are be been it its this that these those
+as if then else when how what which who why all any each some no yes do does can should would
+please make use using code codigo código arquivo arquivos file files função funcao function
+analise analyze explique explain corrija fix melhore improve implemente implement adicione add
+crie create sugira suggest revise review
+"""
+
+# Characters from the start of a file (after its path) that are embedded
+MAX_EMBEDDED_CHARS = 2000
+WRITE_BATCH = 500
+
+
+def tokenize_code(text: str) -> List[str]:
+    """
+    Split text into lowercase identifier parts.
+    
+    snake_case, camelCase and PascalCase names are split into their words,
+    so "getUserName", "get_user_name" and "user name" share their terms.
+    Accents are removed and regular plurals reduced to the singular
+    ("categories", "usuários" -> category, usuario); digits and one-letter
+    parts are dropped.
+    
+    Args:
+        text: Source code or instructions
+    
+    Returns:
+        Terms in text order, repeats included
+    """
+    words = " ".join(IDENTIFIER_PART.findall(text)).lower()
+    if not words.isascii():
+        words = COMBINING_MARK.sub("", unicodedata.normalize("NFKD", words))
+    words = PLURAL_S.sub("", PLURAL_IES.sub("y", words))
+    return [word for word in words.split() if len(word) > 1]
+
+
+QUERY_STOPWORDS = frozenset(tokenize_code(QUERY_STOPWORD_TEXT))
+
+
+class LocalEmbedder:
+    """Sentence embeddings computed on the CPU by the optional sentence-transformers package."""
+    
+    def __init__(self, model: str):
+        """
+        Load an embedding model.
+        
+        Args:
+            model: sentence-transformers model name or local path
+        
+        Raises:
+            ImportError: If sentence-transformers is not installed
+        """
+        from sentence_transformers import SentenceTransformer
+        self.name = model
+        self.model = SentenceTransformer(model, device="cpu")
+    
+    def embed(self, texts: Sequence[str]):
+        """Get unit-length float32 vectors (a numpy matrix, one row per text)."""
+        vectors = self.model.encode(list(texts), batch_size=32, normalize_embeddings=True)
+        return vectors.astype("float32")
+
+
+def create_embedder(model: Optional[str] = None) -> Optional[LocalEmbedder]:
+    """
+    Create the embedder for semantic ranking.
+    
+    Args:
+        model: Model name (default from config); empty for none
+    
+    Returns:
+        The embedder, or None if none is configured or it cannot be loaded
+    """
+    model = config.SEARCH_EMBEDDING_MODEL if model is None else model
+    if not model:
+        return None
+    try:
+        return LocalEmbedder(model)
+    except Exception as e:
+        logger.warning("Embeddings unavailable (%s): %s", model, e)
+        return None
+
+
+class SearchIndex:
+    """
+    BM25 index of a project's files, persisted in SQLite.
+    
+    Files are split into identifier terms by tokenize_code and stored in an
+    FTS5 table, which ranks matches by BM25 with path terms weighted above
+    content. Each file's mtime and size are recorded, so an update after a
+    rescan reads only new and changed files and drops deleted ones; reading
+    and tokenizing run on a thread pool, writes in batched transactions.
+    
+    With an embedder, each file also gets a vector of its path and first
+    lines, and queries merge the BM25 ranking with the cosine ranking by
+    reciprocal rank fusion. This finds files named in other words than the
+    instructions use, at the cost of embedding every file once.
+    """
+    
+    VERSION = 1
+    PATH_WEIGHT = 4.0
+    COMMON_RATIO = 0.5
+    FUSION_K = 60
+    
+    def __init__(
+        self,
+        root: str,
+        cache_dir: Optional[str] = None,
+        embedder: Optional[LocalEmbedder] = None,
+        max_bytes: Optional[int] = None
+    ):
+        """
+        Initialize the index for a project root.
+        
+        Args:
+            root: Project directory the index belongs to
+            cache_dir: Directory holding index files (default from config)
+            embedder: Embedder for semantic ranking, None for BM25 only
+            max_bytes: Bytes of each file that are indexed (default from config)
+        """
+        self.root = root
+        self.embedder = embedder
+        self.max_bytes = max_bytes or config.SEARCH_MAX_BYTES
+        digest = hashlib.sha1(os.path.abspath(root).encode('utf-8')).hexdigest()
+        self.path = os.path.join(cache_dir or config.CACHE_DIR, f"searchindex-{digest[:16]}.sqlite3")
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._updating = threading.Lock()
+        self._closed = False
+        self._vectors = None  # (paths, matrix) loaded for semantic queries
+    
+    def signature(self) -> str:
+        """Get the settings the stored index must have been built with."""
+        model = self.embedder.name if self.embedder else ""
+        return f"{self.VERSION}:{self.max_bytes}:{model}"
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, rebuilding it if it is incompatible (call with the lock held)."""
+        if self._db is not None:
+            return self._db
+        
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = db.execute("SELECT value FROM meta WHERE key = 'signature'").fetchone()
+        if row is None or row[0] != self.signature():
+            db.execute("DROP TABLE IF EXISTS files")
+            db.execute("DROP TABLE IF EXISTS vocab")
+            db.execute("DROP TABLE IF EXISTS terms")
+            db.execute(
+                "CREATE TABLE files (id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, "
+                "mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, vector BLOB)"
+            )
+            db.execute(
+                "CREATE VIRTUAL TABLE terms USING fts5(name, body, "
+                "tokenize='unicode61 remove_diacritics 2')"
+            )
+            db.execute("CREATE VIRTUAL TABLE vocab USING fts5vocab(terms, 'row')")
+            db.execute(
+                "INSERT INTO terms (terms, rank) VALUES ('rank', ?)",
+                (f"bm25({self.PATH_WEIGHT}, 1.0)",)
+            )
+            db.execute("INSERT OR REPLACE INTO meta VALUES ('signature', ?)", (self.signature(),))
+            db.commit()
+        self._db = db
+        return db
+    
+    def close(self):
+        """Close the database; an update still running stops without writing."""
+        with self._lock:
+            self._closed = True
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+    
+    def __len__(self) -> int:
+        """Get the number of indexed files."""
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM files").fetchone()[0]
+    
+    def update(self, root: TreeNode) -> Tuple[int, int]:
+        """
+        Bring the index in line with a scanned tree.
+        
+        Args:
+            root: Root node of the scanned project
+        
+        Returns:
+            (files indexed, files removed)
+        """
+        # Updates started while one runs wait for it, then find little to do
+        with self._updating:
+            return self._update(root)
+    
+    def _update(self, root: TreeNode) -> Tuple[int, int]:
+        """Index new and changed files of a tree and drop missing ones."""
+        with self._lock:
+            if self._closed:
+                return 0, 0
+            known = {
+                path: (file_id, mtime_ns, size)
+                for path, file_id, mtime_ns, size
+                in self._connect().execute("SELECT path, id, mtime_ns, size FROM files")
+            }
+        
+        paths = [node.path for node in root.iter_files()]
+        removed = known.keys() - set(paths)
+        prefix = len(root.path.rstrip(os.sep)) + 1
+        
+        def read(path):
+            if self._closed:
+                return None
+            return self._read(path, prefix, known.get(path))
+        
+        indexed = 0
+        batch = []
+        with ThreadPoolExecutor(max_workers=config.LOAD_WORKERS) as pool:
+            for record in pool.map(read, paths, chunksize=64):
+                if record is not None:
+                    batch.append(record)
+                if len(batch) >= WRITE_BATCH:
+                    indexed += self._write(batch, known)
+                    batch = []
+        indexed += self._write(batch, known)
+        
+        if removed:
+            with self._lock:
+                if self._closed:
+                    return indexed, 0
+                db = self._connect()
+                for path in removed:
+                    file_id = known[path][0]
+                    db.execute("DELETE FROM files WHERE id = ?", (file_id,))
+                    db.execute("DELETE FROM terms WHERE rowid = ?", (file_id,))
+                db.commit()
+                self._vectors = None
+        return indexed, len(removed)
+    
+    def _read(self, path: str, prefix: int, stamp: Optional[tuple]) -> Optional[tuple]:
+        """Read and tokenize a file unless its stamp is unchanged (thread-safe)."""
+        try:
+            with open(path, 'rb') as f:
+                st = os.fstat(f.fileno())
+                if stamp is not None and stamp[1:] == (st.st_mtime_ns, st.st_size):
+                    return None
+                data = f.read(self.max_bytes)
+        except OSError:
+            return None
+        
+        name = " ".join(tokenize_code(path[prefix:]))
+        encoding = detect_encoding(data[:8192])
+        if not encoding.startswith('utf-16') and is_binary(data[:8192]):
+            # Recorded without content, so it is not read again until it changes
+            return path, st.st_mtime_ns, st.st_size, name, "", ""
+        text = data.decode(encoding, errors='replace')
+        excerpt = f"{path[prefix:]}\n{text[:MAX_EMBEDDED_CHARS]}" if self.embedder else ""
+        return path, st.st_mtime_ns, st.st_size, name, " ".join(tokenize_code(text)), excerpt
+    
+    def _write(self, batch: List[tuple], known: Dict[str, tuple]) -> int:
+        """Store a batch of read files in one transaction."""
+        if not batch:
+            return 0
+        vectors = [None] * len(batch)
+        if self.embedder is not None:
+            embedded = [i for i, record in enumerate(batch) if record[5]]
+            if embedded:
+                matrix = self.embedder.embed([batch[i][5] for i in embedded])
+                for i, row in zip(embedded, matrix):
+                    vectors[i] = row.tobytes()
+        
+        with self._lock:
+            if self._closed:
+                return 0
+            db = self._connect()
+            for (path, mtime_ns, size, name, body, _), vector in zip(batch, vectors):
+                old = known.get(path)
+                if old is not None:
+                    db.execute("DELETE FROM terms WHERE rowid = ?", (old[0],))
+                    db.execute(
+                        "UPDATE files SET mtime_ns = ?, size = ?, vector = ? WHERE id = ?",
+                        (mtime_ns, size, vector, old[0])
+                    )
+                    file_id = old[0]
+                else:
+                    file_id = db.execute(
+                        "INSERT INTO files (path, mtime_ns, size, vector) VALUES (?, ?, ?, ?)",
+                        (path, mtime_ns, size, vector)
+                    ).lastrowid
+                db.execute("INSERT INTO terms (rowid, name, body) VALUES (?, ?, ?)", (file_id, name, body))
+            db.commit()
+            self._vectors = None
+        return len(batch)
+    
+    @staticmethod
+    def query_terms(query: str, limit: int = 32) -> List[str]:
+        """Get the distinct searchable terms of a query, in order."""
+        terms = []
+        for term in tokenize_code(query):
+            if term not in QUERY_STOPWORDS and term not in terms:
+                terms.append(term)
+                if len(terms) == limit:
+                    break
+        return terms
+    
+    def search(self, query: str, k: int = 20) -> List[Tuple[str, float]]:
+        """
+        Find the files most relevant to a query.
+        
+        Args:
+            query: Free text, such as the user's instructions
+            k: Maximum number of files
+        
+        Returns:
+            (path, score) pairs, best first
+        """
+        ranked = self._lexical(query, k if self.embedder is None else max(4 * k, 100))
+        if self.embedder is None:
+            return ranked[:k]
+        
+        semantic = self._semantic(query, max(4 * k, 100))
+        scores: Dict[str, float] = {}
+        for ranking in (ranked, semantic):
+            for position, (path, _) in enumerate(ranking):
+                scores[path] = scores.get(path, 0.0) + 1.0 / (self.FUSION_K + position + 1)
+        return sorted(scores.items(), key=lambda item: -item[1])[:k]
+    
+    def _lexical(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """
+        Rank files by BM25 over the query terms.
+        
+        Terms in more than COMMON_RATIO of the files add little to a BM25
+        score but cost a pass over most of the index, so they are left out
+        unless no rarer term of the query is indexed.
+        """
+        terms = self.query_terms(query)
+        if not terms:
+            return []
+        with self._lock:
+            db = self._connect()
+            placeholders = ", ".join("?" * len(terms))
+            found = sorted(
+                (count, term) for term, count
+                in db.execute(f"SELECT term, doc FROM vocab WHERE term IN ({placeholders})", terms)
+            )
+            if not found:
+                return []
+            total = db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            kept = [term for count, term in found if count <= self.COMMON_RATIO * total] or [found[0][1]]
+            expression = " OR ".join(f'"{term}"' for term in kept)
+            rows = db.execute(
+                "SELECT files.path, -hits.rank FROM "
+                "(SELECT rowid, rank FROM terms WHERE terms MATCH ? ORDER BY rank LIMIT ?) AS hits "
+                "JOIN files ON files.id = hits.rowid ORDER BY hits.rank",
+                (expression, k)
+            ).fetchall()
+        return rows
+    
+    def _semantic(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """Rank files by cosine similarity to the query's embedding."""
+        import numpy as np
+        
+        with self._lock:
+            if self._vectors is None:
+                rows = self._connect().execute(
+                    "SELECT path, vector FROM files WHERE vector IS NOT NULL"
+                ).fetchall()
+                matrix = np.frombuffer(b"".join(r[1] for r in rows), dtype=np.float32)
+                self._vectors = ([r[0] for r in rows], matrix.reshape(len(rows), -1) if rows else matrix)
+            paths, matrix = self._vectors
+        if not paths:
+            return []
+        
+        scores = matrix @ self.embedder.embed([query])[0]
+        top = np.argpartition(-scores, min(k, len(paths)) - 1)[:k]
+        return [(paths[i], float(scores[i])) for i in top[np.argsort(-scores[top])]]
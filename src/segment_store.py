@@ -0,0 +1,257 @@
+"""Attached code segments indexed by path, category and content."""
+
+import os
+import threading
+from typing import Callable, Dict, Iterator, Optional, Set, Tuple
+from .models import CodeSegment
+from .tokenizer import CachedTokenCounter
+
+
+class SegmentStore:
+    """
+    Holds the attached segments in the order they were added.
+    
+    Segments are keyed by normalized path and grouped by category, so
+    looking up, adding or removing a file is O(1), removing a category
+    touches only its own files, and a file can only be attached once. The
+    total size, count and (once counted) tokens are kept as running totals.
+    
+    Segments with in-memory content are content-addressed: texts are keyed
+    by hash and compared on a hit, and identical texts share one string.
+    
+    Every change bumps version; snapshot() returns the same tuple until the
+    next change, so building prompts repeatedly does not copy the segments.
+    
+    The store is thread-safe: workers attach files while the UI thread
+    reads and removes them.
+    """
+    
+    def __init__(self):
+        """Initialize an empty store."""
+        self._segments: Dict[str, CodeSegment] = {}
+        self._categories: Dict[str, Dict[str, CodeSegment]] = {}
+        self._texts: Dict[bytes, str] = {}
+        self._text_refs: Dict[bytes, int] = {}
+        self._digests: Dict[str, bytes] = {}
+        self._tokens: Dict[str, int] = {}
+        self._uncounted: Dict[str, CodeSegment] = {}
+        self._snapshots: Dict[Optional[str], Tuple[CodeSegment, ...]] = {}
+        self.version = 0
+        self.size = 0
+        self.tokens = 0
+        self._lock = threading.RLock()
+    
+    @staticmethod
+    def key(path: str) -> str:
+        """Get the index key of a path."""
+        return os.path.normcase(os.path.abspath(path))
+    
+    def __len__(self) -> int:
+        """Get the number of segments."""
+        with self._lock:
+            return len(self._segments)
+    
+    def __iter__(self) -> Iterator[CodeSegment]:
+        """Iterate over a snapshot of the segments in insertion order."""
+        return iter(self.snapshot())
+    
+    def __contains__(self, path: str) -> bool:
+        """Check if a file is attached."""
+        key = self.key(path)
+        with self._lock:
+            return key in self._segments
+    
+    def get(self, path: str) -> Optional[CodeSegment]:
+        """Get the segment of a file, or None if it is not attached."""
+        key = self.key(path)
+        with self._lock:
+            return self._segments.get(key)
+    
+    def categories(self) -> Set[str]:
+        """Get the categories holding at least one segment."""
+        with self._lock:
+            return set(self._categories)
+    
+    def category_count(self, category: str) -> int:
+        """Get the number of segments in a category."""
+        with self._lock:
+            return len(self._categories.get(category, ()))
+    
+    def snapshot(self, category: Optional[str] = None) -> Tuple[CodeSegment, ...]:
+        """
+        Get the segments, or those of one category, as an immutable view.
+        
+        The tuple is cached until the store changes, so repeated calls
+        between changes are O(1).
+        
+        Args:
+            category: Category to restrict to (all segments if None)
+        
+        Returns:
+            Segments in insertion order
+        """
+        with self._lock:
+            view = self._snapshots.get(category)
+            if view is None:
+                source = self._segments if category is None else self._categories.get(category, {})
+                view = self._snapshots[category] = tuple(source.values())
+            return view
+    
+    def add(self, segment: CodeSegment) -> bool:
+        """
+        Attach a segment.
+        
+        Args:
+            segment: Segment to attach
+        
+        Returns:
+            True if added, False if its file is already attached
+        """
+        key = self.key(segment.path)
+        with self._lock:
+            if key in self._segments:
+                return False
+            self._segments[key] = segment
+            self._categories.setdefault(segment.category, {})[key] = segment
+            self._uncounted[key] = segment
+            self.size += segment.size
+            if not segment.is_lazy:
+                self._intern(key, segment)
+            self._changed()
+            return True
+    
+    def remove(self, path: str) -> Optional[CodeSegment]:
+        """
+        Detach a file.
+        
+        Returns:
+            The removed segment, or None if the file was not attached
+        """
+        key = self.key(path)
+        with self._lock:
+            segment = self._segments.pop(key, None)
+            if segment is None:
+                return None
+            
+            members = self._categories[segment.category]
+            del members[key]
+            if not members:
+                del self._categories[segment.category]
+            self._forget(key, segment)
+            self._changed()
+            return segment
+    
+    def remove_category(self, category: str) -> int:
+        """
+        Detach every segment of a category.
+        
+        Returns:
+            Number of segments removed
+        """
+        with self._lock:
+            members = self._categories.pop(category, None)
+            if not members:
+                return 0
+            for key, segment in members.items():
+                del self._segments[key]
+                self._forget(key, segment)
+            self._changed()
+            return len(members)
+    
+    def refresh(self, path: str) -> bool:
+        """
+        Update a segment's stat data after its file changed.
+        
+        Returns:
+            True if the file is attached and changed
+        """
+        key = self.key(path)
+        with self._lock:
+            segment = self._segments.get(key)
+            if segment is None:
+                return False
+            old_size = segment.size
+            if not segment.refresh():
+                return False
+            
+            self.size += segment.size - old_size
+            self.tokens -= self._tokens.pop(key, 0)
+            self._uncounted[key] = segment
+            self._changed()
+            return True
+    
+    def count_tokens(self, count: Callable[[CodeSegment], int]) -> int:
+        """
+        Count the tokens of segments not counted yet.
+        
+        Args:
+            count: Function counting one segment's tokens, such as
+                CachedTokenCounter.count_segment
+        
+        Returns:
+            Total tokens of all segments
+        """
+        with self._lock:
+            pending = list(self._uncounted.items())
+            self._uncounted.clear()
+        
+        # Counting may read files, so it runs without holding the lock
+        counted = [(key, segment, count(segment)) for key, segment in pending]
+        with self._lock:
+            for key, segment, tokens in counted:
+                # Skip segments removed, or changed again, while counting
+                if self._segments.get(key) is segment and key not in self._uncounted:
+                    self.tokens += tokens - self._tokens.get(key, 0)
+                    self._tokens[key] = tokens
+            return self.tokens
+    
+    def clear(self):
+        """Detach every segment."""
+        with self._lock:
+            self._segments.clear()
+            self._categories.clear()
+            self._texts.clear()
+            self._text_refs.clear()
+            self._digests.clear()
+            self._tokens.clear()
+            self._uncounted.clear()
+            self.size = 0
+            self.tokens = 0
+            self._changed()
+    
+    def _changed(self):
+        """Invalidate snapshots after a change."""
+        self.version += 1
+        self._snapshots.clear()
+    
+    def _forget(self, key: str, segment: CodeSegment):
+        """Take a removed segment out of the totals and content index."""
+        self.size -= segment.size
+        self.tokens -= self._tokens.pop(key, 0)
+        self._uncounted.pop(key, None)
+        self._release(key)
+    
+    def _intern(self, key: str, segment: CodeSegment):
+        """Share the segment's text with an identical one already held."""
+        text = segment.content
+        digest = CachedTokenCounter.content_hash(text)
+        held = self._texts.get(digest)
+        if held is None:
+            self._texts[digest] = text
+        elif held == text:
+            segment.content = held
+        else:
+            # Hash collision: keep the text unshared
+            return
+        self._text_refs[digest] = self._text_refs.get(digest, 0) + 1
+        self._digests[key] = digest
+    
+    def _release(self, key: str):
+        """Drop a removed segment's reference to its shared text."""
+        digest = self._digests.pop(key, None)
+        if digest is None:
+            return
+        self._text_refs[digest] -= 1
+        if not self._text_refs[digest]:
+            del self._text_refs[digest]
+            del self._texts[digest]
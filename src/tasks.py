@@ -0,0 +1,179 @@
+"""Background task execution for the Tk application."""
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+
+class Task:
+    """Handle for a task submitted to a TaskRunner."""
+    
+    def __init__(self, label: str, key: Optional[str] = None):
+        """
+        Initialize the task handle.
+        
+        Args:
+            label: Text shown while the task runs
+            key: Tasks sharing a key replace each other
+        """
+        self.label = label
+        self.key = key
+        self.future: Optional[Future] = None
+        self._cancelled = threading.Event()
+    
+    def cancel(self):
+        """Cancel the task; a running task finishes but its result is discarded."""
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+    
+    def is_cancelled(self) -> bool:
+        """Check if the task was cancelled (safe to poll from the task itself)."""
+        return self._cancelled.is_set()
+
+
+class TaskRunner:
+    """
+    Runs blocking work on a bounded thread pool and reports back on the UI thread.
+    
+    Callbacks are marshalled with root.after, so on_done, on_error and the
+    progress callback always run on the Tk main loop and may touch widgets.
+    Every running task is reported through the single progress callback,
+    and failures of tasks without their own on_error go to the error callback.
+    """
+    
+    def __init__(
+        self,
+        root,
+        on_progress: Optional[Callable[[List[str]], None]] = None,
+        max_workers: Optional[int] = None,
+        on_error: Optional[Callable[[str, Exception], None]] = None
+    ):
+        """
+        Initialize the runner.
+        
+        Args:
+            root: Tk root used to schedule callbacks on the main loop
+            on_progress: Called with the labels of running tasks whenever they change
+            max_workers: Size of the thread pool (default from config)
+            on_error: Called with (label, error) for failed tasks submitted
+                without on_error; such failures are logged if not given
+        """
+        self.root = root
+        self.on_progress = on_progress
+        self.on_error = on_error
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or config.TASK_WORKERS,
+            thread_name_prefix="task"
+        )
+        self._active: List[Task] = []
+        self._keyed: Dict[str, Task] = {}
+        self._closed = False
+    
+    def submit(
+        self,
+        func: Callable[..., Any],
+        *args,
+        on_done: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[Exception], None]] = None,
+        label: str = "",
+        key: Optional[str] = None
+    ) -> Task:
+        """
+        Run a function in the background.
+        
+        Must be called from the UI thread.
+        
+        Args:
+            func: Blocking function to run on a worker thread
+            *args: Arguments for func
+            on_done: Called on the UI thread with func's return value
+            on_error: Called on the UI thread with the exception func raised
+            label: Text shown by the progress surface while the task runs
+            key: Cancel any unfinished task submitted with the same key
+        
+        Returns:
+            Task handle that can be cancelled
+        """
+        if key is not None and key in self._keyed:
+            self.cancel(self._keyed[key])
+        
+        task = Task(label, key)
+        self._active.append(task)
+        if key is not None:
+            self._keyed[key] = task
+        self._report()
+        
+        task.future = self._executor.submit(func, *args)
+        task.future.add_done_callback(
+            lambda future: self._schedule(self._finish, task, on_done, on_error)
+        )
+        return task
+    
+    def cancel(self, task: Task):
+        """Cancel a task and stop reporting it as running."""
+        task.cancel()
+        self._forget(task)
+    
+    def is_running(self, key: str) -> bool:
+        """Check if an unfinished task with this key exists."""
+        return key in self._keyed
+    
+    def shutdown(self):
+        """Cancel pending tasks and stop scheduling callbacks."""
+        self._closed = True
+        for task in list(self._active):
+            task.cancel()
+        self._executor.shutdown(wait=False)
+    
+    def _schedule(self, callback: Callable, *args):
+        """Run a callback on the UI thread (called from worker threads)."""
+        if self._closed:
+            return
+        try:
+            self.root.after(0, callback, *args)
+        except RuntimeError:
+            # The main loop is gone
+            pass
+    
+    def _finish(
+        self,
+        task: Task,
+        on_done: Optional[Callable[[Any], None]],
+        on_error: Optional[Callable[[Exception], None]]
+    ):
+        """Deliver a finished task's outcome on the UI thread."""
+        if task.is_cancelled():
+            return
+        self._forget(task)
+        
+        error = task.future.exception()
+        if error is not None:
+            if on_error is not None:
+                on_error(error)
+            elif self.on_error is not None:
+                self.on_error(task.label, error)
+            else:
+                logger.error(
+                    "Background task %r failed", task.label,
+                    exc_info=(type(error), error, error.__traceback__)
+                )
+        elif on_done is not None:
+            on_done(task.future.result())
+    
+    def _forget(self, task: Task):
+        """Drop a task from the running set."""
+        if task in self._active:
+            self._active.remove(task)
+            if task.key is not None and self._keyed.get(task.key) is task:
+                del self._keyed[task.key]
+            self._report()
+    
+    def _report(self):
+        """Tell the progress surface which tasks are running."""
+        if self.on_progress is not None:
+            self.on_progress([t.label for t in self._active if t.label])
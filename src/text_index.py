@@ -0,0 +1,141 @@
+"""Line index over a large text, for viewing and searching it by line."""
+
+import re
+from array import array
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+
+NEWLINE = re.compile("\n")
+
+
+class TextIndex:
+    """
+    Holds a text and the offset where each of its lines starts.
+    
+    The offsets are kept in a typed array, 8 bytes per line, so the index
+    of a 50 MB prompt costs a few megabytes and is built in one pass of the
+    regex engine. Lines are sliced out of the text on demand; nothing is
+    split or copied per line.
+    
+    Appended text is kept as a list of parts with their start offsets, so
+    streaming an answer in does not copy the whole text on every chunk;
+    windows are sliced from the parts and the text is joined only when it
+    is asked for as a whole.
+    """
+    
+    def __init__(self, text: str = ""):
+        """Initialize the index with a text."""
+        self._parts: List[str] = []
+        self._starts = array('q')
+        self._length = 0
+        self.offsets = array('q', [0])
+        self.set_text(text)
+    
+    @property
+    def text(self) -> str:
+        """Get the whole text, joining appended parts once."""
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+            self._starts = array('q', [0])
+        return self._parts[0] if self._parts else ""
+    
+    def set_text(self, text: str):
+        """Replace the text and rebuild the line offsets."""
+        self._parts = [text] if text else []
+        self._starts = array('q', [0] if text else [])
+        self._length = len(text)
+        self.offsets = array('q', [0])
+        self.offsets.extend(m.end() for m in NEWLINE.finditer(text))
+    
+    def append(self, text: str):
+        """Add text at the end, indexing only the new lines."""
+        if not text:
+            return
+        base = self._length
+        self._parts.append(text)
+        self._starts.append(base)
+        self._length += len(text)
+        self.offsets.extend(base + m.end() for m in NEWLINE.finditer(text))
+    
+    def _slice(self, start: int, end: int) -> str:
+        """Get the text between two offsets without joining the parts."""
+        if len(self._parts) <= 1:
+            return self.text[start:end]
+        pieces = []
+        index = max(0, bisect_right(self._starts, start) - 1)
+        while index < len(self._parts) and self._starts[index] < end:
+            base = self._starts[index]
+            pieces.append(self._parts[index][max(0, start - base):end - base])
+            index += 1
+        return "".join(pieces)
+    
+    def clear(self):
+        """Remove the text."""
+        self.set_text("")
+    
+    def __len__(self) -> int:
+        """Get the number of lines; a final line break does not start a new one."""
+        if len(self.offsets) > 1 and self.offsets[-1] == self._length:
+            return len(self.offsets) - 1
+        return len(self.offsets)
+    
+    def line_start(self, line: int) -> int:
+        """Get the offset where a 0-based line starts."""
+        return self.offsets[line]
+    
+    def line_of(self, offset: int) -> int:
+        """Get the 0-based line holding an offset."""
+        return bisect_right(self.offsets, offset) - 1
+    
+    def window(self, first: int, count: int) -> str:
+        """
+        Get a run of lines as one string.
+        
+        Args:
+            first: 0-based first line
+            count: Maximum number of lines
+        
+        Returns:
+            The lines joined by line breaks, without a trailing one
+        """
+        if first >= len(self) or count <= 0:
+            return ""
+        start = self.offsets[first]
+        if first + count < len(self.offsets):
+            end = self.offsets[first + count] - 1
+        else:
+            end = self._length
+            if end > start and self._slice(end - 1, end) == "\n":
+                end -= 1
+        return self._slice(start, end)
+    
+    def find(
+        self,
+        query: str,
+        start: int = 0,
+        case_sensitive: bool = False
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Find the next occurrence of a string, wrapping around at the end.
+        
+        Args:
+            query: Text to look for
+            start: Offset to search from
+            case_sensitive: Match letter case exactly
+        
+        Returns:
+            (line, offset) of the match, or None if there is none
+        """
+        if not query:
+            return None
+        if case_sensitive or query.lower() == query.upper():
+            offset = self.text.find(query, start)
+            if offset < 0:
+                offset = self.text.find(query, 0, start + len(query))
+        else:
+            pattern = re.compile(re.escape(query), re.IGNORECASE)
+            found = pattern.search(self.text, start) or pattern.search(self.text, 0, start + len(query))
+            offset = found.start() if found else -1
+        if offset < 0:
+            return None
+        return self.line_of(offset), offset
@@ -1,4 +1,19 @@
-"""UI components package."""
+"""UI components package.
 
-from .pages import *
-from .widgets import *
+Names from the pages and widgets modules are resolved on first access, so
+importing one page module does not load every other page.
+"""
+
+import importlib
+
+_EXPORTING_MODULES = ("pages", "widgets")
+
+
+def __getattr__(name: str):
+    """Load a page or widget class from its submodule on first access."""
+    if not name.startswith("_"):
+        for module_name in _EXPORTING_MODULES:
+            module = importlib.import_module(f".{module_name}", __name__)
+            if hasattr(module, name):
+                return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
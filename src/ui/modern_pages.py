@@ -2,12 +2,12 @@
 
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
-from typing import Callable, Dict
+from typing import Callable, Dict, Iterable, Union
 from pathlib import Path
 from ..config import config, theme, CategoryConfig
 from .modern_widgets import (
     ModernCard, GradientButton, ModernInput, ModernTextArea,
-    IconLabel, ModernDivider, ModernProgressBar
+    IconLabel, ModernDivider, ModernProgressBar, ModernSwitch, LargeTextView
 )
 
 
@@ -164,7 +164,8 @@ class ModernPromptPage(ModernBasePage):
         on_copy: Callable,
         on_save: Callable,
         on_send: Callable,
-        on_clear: Callable
+        on_clear: Callable,
+        on_suggest: Callable
     ):
         """Initialize modern prompt page."""
         super().__init__(parent)
@@ -217,6 +218,15 @@ class ModernPromptPage(ModernBasePage):
             width=160
         ).pack(side="left", padx=config.SPACING_XS)
         
+        GradientButton(
+            btn_frame,
+            text="Sugerir Arquivos",
+            command=on_suggest,
+            variant="secondary",
+            icon="🔎",
+            width=170
+        ).pack(side="left", padx=config.SPACING_XS)
+        
         GradientButton(
             btn_frame,
             text="Copiar",
@@ -268,8 +278,21 @@ class ModernPromptPage(ModernBasePage):
             color="accent"
         ).grid(row=0, column=0, sticky="w", padx=config.SPACING_LG, pady=config.SPACING_MD)
         
-        self.prompt_preview = ModernTextArea(preview_card)
-        self.prompt_preview.grid(row=1, column=0, sticky="nsew", padx=config.SPACING_LG, pady=(0, config.SPACING_LG))
+        self.pack_switch = ModernSwitch(preview_card, text="Ajustar ao limite de contexto")
+        self.pack_switch.grid(row=0, column=1, sticky="e", padx=config.SPACING_SM, pady=config.SPACING_MD)
+        
+        self.cache_switch = ModernSwitch(preview_card, text="Usar cache de respostas")
+        self.cache_switch.grid(row=0, column=2, sticky="e", padx=config.SPACING_LG, pady=config.SPACING_MD)
+        if config.RESPONSE_CACHE_ENABLED:
+            self.cache_switch.select()
+        else:
+            self.cache_switch.configure(state="disabled")
+        
+        self.prompt_preview = LargeTextView(preview_card)
+        self.prompt_preview.grid(
+            row=1, column=0, columnspan=3, sticky="nsew",
+            padx=config.SPACING_LG, pady=(0, config.SPACING_LG)
+        )
         
         # Progress bar
         self.progress_bar = ModernProgressBar(self)
@@ -287,17 +310,31 @@ class ModernPromptPage(ModernBasePage):
     
     def get_prompt_preview(self) -> str:
         """Get prompt preview text."""
-        return self.prompt_preview.get("1.0", "end").strip()
+        return self.prompt_preview.get_text().strip()
+    
+    def set_prompt_preview(self, text: Union[str, Iterable[str]]):
+        """
+        Set prompt preview text, staying at the same line.
+        
+        Args:
+            text: Full text, or an iterable of chunks
+        """
+        if not isinstance(text, str):
+            text = "".join(text)
+        self.prompt_preview.set_text(text)
     
-    def set_prompt_preview(self, text: str):
-        """Set prompt preview text."""
-        self.prompt_preview.delete("1.0", "end")
-        self.prompt_preview.insert("1.0", text)
+    def is_packing_enabled(self) -> bool:
+        """Check if segments should be fitted into the context token budget."""
+        return bool(self.pack_switch.get())
+    
+    def is_cache_enabled(self) -> bool:
+        """Check if answers may come from the response cache."""
+        return bool(self.cache_switch.get())
     
     def clear_all(self):
         """Clear all text fields."""
         self.user_instructions.delete("1.0", "end")
-        self.prompt_preview.delete("1.0", "end")
+        self.prompt_preview.clear()
     
     def show_progress(self, show: bool):
         """Show or hide progress bar."""
@@ -319,7 +356,8 @@ class ModernResultPage(ModernBasePage):
         parent,
         on_copy: Callable,
         on_save: Callable,
-        on_apply: Callable
+        on_apply: Callable,
+        on_cancel: Callable
     ):
         """Initialize modern result page."""
         super().__init__(parent)
@@ -368,20 +406,47 @@ class ModernResultPage(ModernBasePage):
             width=120
         ).pack(side="left", padx=config.SPACING_XS)
         
+        # Shown only while a batch runs
+        self.on_cancel = on_cancel
+        self.cancel_btn = GradientButton(
+            btn_frame,
+            text="Cancelar lote",
+            command=self._cancel,
+            variant="danger",
+            icon="⏹",
+            width=140
+        )
+        
         # Result card
         result_card = ModernCard(self)
         result_card.grid(row=1, column=0, sticky="nsew")
         result_card.grid_rowconfigure(0, weight=1)
         result_card.grid_columnconfigure(0, weight=1)
         
-        self.result_text = ModernTextArea(result_card)
+        self.result_text = LargeTextView(result_card)
         self.result_text.grid(row=0, column=0, sticky="nsew", padx=config.SPACING_LG, pady=config.SPACING_LG)
     
     def get_result(self) -> str:
         """Get result text."""
-        return self.result_text.get("1.0", "end")
+        return self.result_text.get_text()
     
     def set_result(self, text: str):
         """Set result text."""
-        self.result_text.delete("1.0", "end")
-        self.result_text.insert("1.0", text)
+        self.result_text.set_text(text, keep_position=False)
+    
+    def append_result(self, text: str):
+        """Append text to the result, following the end while it is in view."""
+        self.result_text.append(text)
+    
+    def show_cancel(self, show: bool):
+        """Show or hide the batch cancel button."""
+        if show:
+            self.cancel_btn.configure(state="normal")
+            self.cancel_btn.pack(side="left", padx=config.SPACING_XS)
+        else:
+            self.cancel_btn.pack_forget()
+    
+    def _cancel(self):
+        """Disable the cancel button and request the cancellation."""
+        self.cancel_btn.configure(state="disabled")
+        self.on_cancel()
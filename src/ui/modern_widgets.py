@@ -1,8 +1,9 @@
 """Modern UI widgets with enhanced visual design."""
 
 import customtkinter as ctk
-from typing import Callable, Optional
+from typing import Callable, Optional, Tuple
 from ..config import config, theme
+from ..text_index import TextIndex
 
 
 class ModernCard(ctk.CTkFrame):
@@ -272,6 +273,169 @@ class ModernTextArea(ctk.CTkTextbox):
         self.configure(border_color=theme.BORDER)
 
 
+class LargeTextView(ctk.CTkFrame):
+    """
+    Read-only viewer for texts too large for a plain text area.
+    
+    The text lives in a TextIndex; the inner textbox only ever holds the
+    lines that fit in the viewport, replaced as the view scrolls, so Tk
+    lays out one screenful whatever the size of the text. The search field
+    finds matches through the index and scrolls to them.
+    """
+    
+    WHEEL_LINES = 3
+    
+    def __init__(self, parent, **kwargs):
+        """Initialize large text view."""
+        super().__init__(
+            parent,
+            corner_radius=config.RADIUS_MD,
+            border_width=2,
+            border_color=theme.BORDER,
+            fg_color=theme.BG_TERTIARY,
+            **kwargs
+        )
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+        
+        self.index = TextIndex()
+        self.first = 0
+        self._match: Optional[Tuple[int, int]] = None  # (line, offset)
+        
+        self.search_input = ModernInput(self, placeholder="Buscar (Enter para o próximo)", icon="🔍")
+        self.search_input.configure(height=32)
+        self.search_input.grid(
+            row=0, column=0, columnspan=2, sticky="ew",
+            padx=config.SPACING_SM, pady=(config.SPACING_SM, config.SPACING_XS)
+        )
+        self.search_input.bind("<Return>", lambda e: self.find_next())
+        
+        self.font = ctk.CTkFont(family=config.FONT_FAMILY, size=config.FONT_SIZE_NORMAL)
+        self.line_height = max(1, self.font.metrics("linespace"))
+        self.textbox = ctk.CTkTextbox(
+            self,
+            fg_color=theme.BG_TERTIARY,
+            text_color=theme.TEXT_PRIMARY,
+            font=self.font,
+            wrap="none",
+            activate_scrollbars=False
+        )
+        self.textbox.grid(row=1, column=0, sticky="nsew", padx=(config.SPACING_SM, 0), pady=(0, config.SPACING_SM))
+        self.textbox.tag_config("match", background=theme.PRIMARY)
+        self.textbox.configure(state="disabled")
+        
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=1, column=1, sticky="ns", pady=(0, config.SPACING_SM))
+        
+        self.textbox.bind("<Configure>", lambda e: self.redraw())
+        self.textbox.bind("<MouseWheel>", self._on_wheel)
+        self.textbox.bind("<Shift-MouseWheel>", self._on_shift_wheel)
+        self.textbox.bind("<Button-4>", lambda e: self.scroll(-self.WHEEL_LINES))
+        self.textbox.bind("<Button-5>", lambda e: self.scroll(self.WHEEL_LINES))
+        self.textbox.bind("<Prior>", lambda e: self.scroll(-self._visible_lines()))
+        self.textbox.bind("<Next>", lambda e: self.scroll(self._visible_lines()))
+        self.textbox.bind("<Control-f>", lambda e: self.search_input.focus_set())
+    
+    def get_text(self) -> str:
+        """Get the whole text."""
+        return self.index.text
+    
+    def set_text(self, text: str, keep_position: bool = True):
+        """
+        Show a text.
+        
+        Args:
+            text: Text to show
+            keep_position: Stay at the same line, as when the same document
+                is regenerated; otherwise go back to the top
+        """
+        self.index.set_text(text)
+        self._match = None
+        if not keep_position:
+            self.first = 0
+        self.redraw()
+    
+    def append(self, text: str):
+        """Add text at the end, following it if the end was in view."""
+        at_end = self.first + self._visible_lines() >= len(self.index)
+        self.index.append(text)
+        if at_end:
+            self.first = len(self.index)
+        self.redraw()
+    
+    def clear(self):
+        """Remove the text."""
+        self.set_text("", keep_position=False)
+    
+    def _visible_lines(self) -> int:
+        """Get how many lines fit in the viewport."""
+        return max(1, self.textbox.winfo_height() // self.line_height)
+    
+    def redraw(self):
+        """Put the lines in the viewport into the textbox."""
+        count = self._visible_lines()
+        total = len(self.index)
+        self.first = max(0, min(self.first, total - count))
+        
+        self.textbox.configure(state="normal")
+        self.textbox.delete("1.0", "end")
+        self.textbox.insert("1.0", self.index.window(self.first, count + 1))
+        if self._match is not None and self.first <= self._match[0] <= self.first + count:
+            self._highlight(self._match[0] - self.first + 1)
+        self.textbox.configure(state="disabled")
+        
+        if total > count:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + count) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+    
+    def _highlight(self, row: int):
+        """Mark the search match on a row of the textbox."""
+        query = self.search_input.get()
+        # Tk computes the column, which may differ from Python's for emoji
+        start = self.textbox.search(query, f"{row}.0", stopindex=f"{row}.end", nocase=True)
+        if start:
+            self.textbox.tag_add("match", start, f"{start}+{len(query)}c")
+    
+    def scroll(self, lines: int):
+        """Scroll by a number of lines."""
+        self.first += lines
+        self.redraw()
+    
+    def find_next(self):
+        """Scroll to the next match of the search field, wrapping around."""
+        query = self.search_input.get()
+        start = self._match[1] + 1 if self._match is not None else self.index.line_start(self.first)
+        self._match = self.index.find(query, start)
+        if self._match is not None:
+            line = self._match[0]
+            count = self._visible_lines()
+            if not self.first <= line < self.first + count:
+                self.first = line - count // 3
+        self.redraw()
+    
+    def _on_scrollbar(self, action: str, amount: str, unit: Optional[str] = None):
+        """Handle scrollbar drags and arrow clicks."""
+        if action == "moveto":
+            self.first = int(float(amount) * len(self.index))
+            self.redraw()
+        elif action == "scroll":
+            step = self._visible_lines() if unit == "pages" else 1
+            self.scroll(int(amount) * step)
+    
+    def _on_wheel(self, event):
+        """Scroll with the mouse wheel (Windows and macOS deltas)."""
+        if event.delta:
+            self.scroll(-self.WHEEL_LINES if event.delta > 0 else self.WHEEL_LINES)
+        return "break"
+    
+    def _on_shift_wheel(self, event):
+        """Scroll long lines sideways."""
+        if event.delta:
+            self.textbox.xview("scroll", -1 if event.delta > 0 else 1, "units")
+        return "break"
+
+
 class IconLabel(ctk.CTkLabel):
     """Label with icon and modern styling."""
     
@@ -2,10 +2,11 @@
 
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
-from typing import Callable, Dict
+from typing import Callable, Dict, List, Optional
 from pathlib import Path
 from ..config import CategoryConfig
-from .widgets import PageHeader, CategoryCard, ToolCard, ActionButton
+from ..models import TreeNode
+from .widgets import PageHeader, CategoryCard, ToolCard, ActionButton, TreeView
 
 
 class BasePage(ctk.CTkFrame):
@@ -145,7 +146,10 @@ class FilesPage(BasePage):
         on_open: Callable,
         on_refresh: Callable,
         on_add: Callable,
-        on_remove: Callable
+        on_remove: Callable,
+        on_watch: Optional[Callable] = None,
+        on_rules: Optional[Callable] = None,
+        on_add_deps: Optional[Callable[[int], None]] = None
     ):
         """Initialize files page."""
         super().__init__(parent)
@@ -162,6 +166,20 @@ class FilesPage(BasePage):
             fg_color="transparent",
             border_width=2
         )
+        if on_rules:
+            header.add_button(
+                "📐 Regras",
+                on_rules,
+                fg_color="transparent",
+                border_width=2
+            )
+        
+        self.watch_switch = None
+        if on_watch:
+            self.watch_switch = header.add_switch(
+                "👁️ Monitorar",
+                lambda: on_watch(self.watch_switch.get() == 1)
+            )
         
         # Project path label
         self.project_path_label = ctk.CTkLabel(
@@ -189,13 +207,41 @@ class FilesPage(BasePage):
             text="📁 Estrutura do Projeto",
             font=ctk.CTkFont(size=16, weight="bold")
         )
-        files_label.pack(pady=10)
+        files_label.pack(pady=(10, 0))
         
-        self.files_textbox = ctk.CTkTextbox(
+        files_hint = ctk.CTkLabel(
             files_panel,
-            font=ctk.CTkFont(size=12, family="Courier")
+            text="Marque arquivos e use \"← Adicionar\" em uma categoria",
+            font=ctk.CTkFont(size=12),
+            text_color=("gray40", "gray60")
         )
-        self.files_textbox.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        files_hint.pack(pady=(0, 5))
+        
+        if on_add_deps:
+            # Checked files plus the project files they import, N hops deep
+            deps_row = ctk.CTkFrame(files_panel, fg_color="transparent")
+            deps_row.pack(side="bottom", fill="x", padx=10, pady=(0, 10))
+            self.deps_depth = ctk.CTkOptionMenu(
+                deps_row,
+                values=["1", "2", "3", "4"],
+                width=60
+            )
+            self.deps_depth.pack(side="right")
+            ctk.CTkLabel(
+                deps_row,
+                text="Profundidade:",
+                font=ctk.CTkFont(size=12),
+                text_color=("gray40", "gray60")
+            ).pack(side="right", padx=(10, 5))
+            ctk.CTkButton(
+                deps_row,
+                text="🔗 Adicionar com dependências",
+                command=lambda: on_add_deps(int(self.deps_depth.get())),
+                height=32
+            ).pack(side="left", fill="x", expand=True)
+        
+        self.tree_view = TreeView(files_panel)
+        self.tree_view.pack(fill="both", expand=True, padx=10, pady=(0, 10))
         
         # Category panel
         category_panel = ctk.CTkFrame(content_frame)
@@ -228,10 +274,27 @@ class FilesPage(BasePage):
         """Set the project path display."""
         self.project_path_label.configure(text=f"📂 {path}")
     
-    def set_files_content(self, content: str):
-        """Set the files textbox content."""
-        self.files_textbox.delete("1.0", "end")
-        self.files_textbox.insert("1.0", content)
+    def set_tree(self, root: TreeNode, lister: Optional[Callable] = None):
+        """
+        Show the project tree.
+        
+        Args:
+            root: Root node; open folders and checks are kept for the same project
+            lister: Lists folders on first expansion when the tree is not scanned yet
+        """
+        self.tree_view.set_tree(root, lister)
+    
+    def get_checked_files(self) -> List[str]:
+        """Get the files checked in the tree."""
+        return self.tree_view.get_checked_files()
+    
+    def clear_checked(self):
+        """Uncheck every file in the tree."""
+        self.tree_view.clear_checked()
+    
+    def is_watching(self) -> bool:
+        """Check if the watch switch is on."""
+        return self.watch_switch is not None and self.watch_switch.get() == 1
     
     def get_category_widget(self, category: str) -> CategoryCard:
         """Get category widget by key."""
@@ -455,6 +518,14 @@ class DocsPage(BasePage):
         )
         title.grid(row=0, column=0, sticky="w", pady=(0, 20))
         
+        # Batch mode: one request per file (or category), merged into one report
+        self.batch_switch = ctk.CTkSwitch(
+            self,
+            text="Processar em lote",
+            font=ctk.CTkFont(size=13)
+        )
+        self.batch_switch.grid(row=0, column=0, sticky="e", pady=(0, 20))
+        
         # Tools frame
         tools_frame = ctk.CTkScrollableFrame(self)
         tools_frame.grid(row=1, column=0, sticky="nsew")
@@ -470,3 +541,7 @@ class DocsPage(BasePage):
         for icon, title_text, desc, command in tools:
             card = ToolCard(tools_frame, icon, title_text, desc, command)
             card.pack(fill="x", padx=10, pady=10)
+    
+    def is_batch_enabled(self) -> bool:
+        """Check if tools should run in batch mode."""
+        return bool(self.batch_switch.get())
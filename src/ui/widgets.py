@@ -1,7 +1,9 @@
 """Reusable UI widgets."""
 
 import customtkinter as ctk
-from typing import Callable, Optional
+from typing import Callable, List, Optional
+from ..models import TreeNode
+from ..visible_tree import VisibleTree
 
 
 class StatusIndicator(ctk.CTkLabel):
@@ -116,6 +118,18 @@ class PageHeader(ctk.CTkFrame):
         )
         btn.pack(side="left", padx=5)
         return btn
+    
+    def add_switch(self, text: str, command: Callable, **kwargs) -> ctk.CTkSwitch:
+        """Add a toggle switch to the header."""
+        switch = ctk.CTkSwitch(
+            self.button_frame,
+            text=text,
+            command=command,
+            font=ctk.CTkFont(size=13),
+            **kwargs
+        )
+        switch.pack(side="left", padx=5)
+        return switch
 
 
 class CategoryCard(ctk.CTkFrame):
@@ -182,6 +196,11 @@ class CategoryCard(ctk.CTkFrame):
         """Add a file to the list."""
         self.textbox.insert("end", f"✓ {filename}\n")
     
+    def add_files(self, filenames: List[str]):
+        """Add many files to the list with a single insert."""
+        if filenames:
+            self.textbox.insert("end", "".join(f"✓ {name}\n" for name in filenames))
+    
     def clear(self):
         """Clear all files."""
         self.textbox.delete("1.0", "end")
@@ -191,6 +210,140 @@ class CategoryCard(ctk.CTkFrame):
         return self.textbox.get("1.0", "end")
 
 
+class TreeView(ctk.CTkFrame):
+    """
+    Virtualized project tree with check boxes.
+    
+    Only the rows inside the viewport are drawn, reusing one canvas text
+    item per visible line, so scrolling and redraws cost the same for any
+    repository size. Directories expand on click; files (and directories,
+    through their box) are checked on click.
+    """
+    
+    ROW_PADDING = 4
+    TEXT_MARGIN = 6
+    WHEEL_ROWS = 3
+    
+    def __init__(self, parent, **kwargs):
+        """Initialize tree view."""
+        super().__init__(parent, **kwargs)
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+        
+        self.tree = VisibleTree()
+        self.first = 0
+        self.font = ctk.CTkFont(size=12, family="Courier")
+        self.row_height = self.font.metrics("linespace") + self.ROW_PADDING
+        self.char_width = max(1, self.font.measure("0"))
+        self._items: List[int] = []
+        
+        self.canvas = ctk.CTkCanvas(
+            self,
+            highlightthickness=0,
+            bd=0,
+            bg=self._apply_appearance_mode(self.cget("fg_color"))
+        )
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        
+        self.canvas.bind("<Configure>", lambda e: self.redraw())
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Button-4>", lambda e: self.scroll(-self.WHEEL_ROWS))
+        self.canvas.bind("<Button-5>", lambda e: self.scroll(self.WHEEL_ROWS))
+    
+    def set_tree(self, root: TreeNode, lister: Optional[Callable] = None):
+        """Show a tree, keeping the open folders and checks of the same project."""
+        if self.tree.root is None or self.tree.root.path != root.path:
+            self.first = 0
+        self.tree.set_root(root, lister)
+        self.redraw()
+    
+    def refresh(self):
+        """Rebuild the rows after the tree changed."""
+        self.tree.refresh()
+        self.redraw()
+    
+    def clear(self):
+        """Remove the tree."""
+        self.tree.clear()
+        self.first = 0
+        self.redraw()
+    
+    def _visible_rows(self) -> int:
+        """Get how many rows fit in the viewport."""
+        return max(1, self.canvas.winfo_height() // self.row_height)
+    
+    def redraw(self):
+        """Draw the rows in the viewport."""
+        count = self._visible_rows()
+        total = len(self.tree)
+        self.first = max(0, min(self.first, total - count))
+        rows = self.tree.window(self.first, count + 1)
+        
+        color = self._apply_appearance_mode(ctk.ThemeManager.theme["CTkLabel"]["text_color"])
+        while len(self._items) < count + 1:
+            y = len(self._items) * self.row_height + self.ROW_PADDING // 2
+            self._items.append(self.canvas.create_text(
+                self.TEXT_MARGIN, y, anchor="nw", font=self.font, fill=color
+            ))
+        
+        for slot, item in enumerate(self._items):
+            if slot < len(rows):
+                text = self.tree.format_row(rows[slot])
+                self.canvas.itemconfigure(item, text=text, fill=color, state="normal")
+            else:
+                self.canvas.itemconfigure(item, state="hidden")
+        
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + count) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+    
+    def scroll(self, rows: int):
+        """Scroll by a number of rows."""
+        self.first += rows
+        self.redraw()
+    
+    def _on_scrollbar(self, action: str, amount: str, unit: Optional[str] = None):
+        """Handle scrollbar drags and arrow clicks."""
+        if action == "moveto":
+            self.first = int(float(amount) * len(self.tree))
+            self.redraw()
+        elif action == "scroll":
+            step = self._visible_rows() if unit == "pages" else 1
+            self.scroll(int(amount) * step)
+    
+    def _on_wheel(self, event):
+        """Scroll with the mouse wheel (Windows and macOS deltas)."""
+        if event.delta:
+            self.scroll(-self.WHEEL_ROWS if event.delta > 0 else self.WHEEL_ROWS)
+    
+    def _on_click(self, event):
+        """Expand a folder or toggle a check box."""
+        index = self.first + event.y // self.row_height
+        column = (event.x - self.TEXT_MARGIN) // self.char_width
+        action = self.tree.hit(index, column)
+        if action == "expand":
+            self.tree.toggle_expanded(index)
+        elif action == "check":
+            self.tree.toggle_checked(index)
+        else:
+            return
+        self.redraw()
+    
+    def get_checked_files(self) -> List[str]:
+        """Get the paths of checked files."""
+        return self.tree.checked_files()
+    
+    def clear_checked(self):
+        """Uncheck everything."""
+        self.tree.clear_checked()
+        self.redraw()
+
+
 class ToolCard(ctk.CTkFrame):
     """Card widget for documentation tools."""
     
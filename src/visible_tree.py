@@ -0,0 +1,227 @@
+"""Flattened, lazily expanded view of the project tree."""
+
+from typing import Callable, Iterator, List, Optional, Set
+from .models import TreeNode, TreeRow
+from .scanner import format_size
+
+
+class VisibleTree:
+    """
+    Keeps the rows of the expanded part of a project tree.
+    
+    Rows exist only for the root and the children of expanded directories,
+    so memory and rebuild time follow what the user opened rather than the
+    size of the repository. With a lister, a directory is listed the first
+    time it is expanded instead of coming from a full scan.
+    
+    Row text has fixed columns: two characters of indentation per level, an
+    expand marker, then a check box, so a click can be mapped back to the
+    marker or box from its character column.
+    """
+    
+    INDENT = 2
+    MARKER_WIDTH = 2
+    CHECK_WIDTH = 4
+    
+    def __init__(self):
+        """Initialize an empty view."""
+        self.root: Optional[TreeNode] = None
+        self.lister: Optional[Callable[[str], List[TreeNode]]] = None
+        self.rows: List[TreeRow] = []
+        self.expanded: Set[str] = set()
+        self.checked: Set[str] = set()
+        self.checked_dirs: Set[str] = set()
+        self._listed: Set[str] = set()
+    
+    def __len__(self) -> int:
+        """Get the number of visible rows."""
+        return len(self.rows)
+    
+    def set_root(
+        self,
+        root: TreeNode,
+        lister: Optional[Callable[[str], List[TreeNode]]] = None
+    ):
+        """
+        Show a tree, keeping expanded and checked paths of the same project.
+        
+        Args:
+            root: Root node, scanned or with children still unlisted
+            lister: Lists a directory's children on first expansion
+                (e.g. RepositoryScanner.list_directory); None when the
+                tree was fully scanned
+        """
+        if self.root is None or self.root.path != root.path:
+            self.expanded.clear()
+            self.checked.clear()
+            self.checked_dirs.clear()
+            self.expanded.add(root.path)
+        
+        self.root = root
+        self.lister = lister
+        self._listed.clear()
+        self.refresh()
+    
+    def clear(self):
+        """Drop the tree and every row."""
+        self.root = None
+        self.rows = []
+        self.expanded.clear()
+        self.checked.clear()
+        self.checked_dirs.clear()
+        self._listed.clear()
+    
+    def refresh(self):
+        """Rebuild the rows, e.g. after the tree changed on disk."""
+        rows: List[TreeRow] = []
+        if self.root is not None:
+            self._append_subtree(self.root, 0, rows)
+        self.rows = rows
+    
+    def window(self, first: int, count: int) -> List[TreeRow]:
+        """Get the rows of a scroll window."""
+        return self.rows[first:first + count]
+    
+    def _children(self, node: TreeNode) -> List[TreeNode]:
+        """Get a directory's children, listing it first if needed."""
+        if self.lister is not None and node.path not in self._listed:
+            node.children = self.lister(node.path)
+            self._listed.add(node.path)
+        return node.children
+    
+    def _is_open(self, node: TreeNode) -> bool:
+        """Check if a directory shows its children."""
+        # Symlinked directories are never descended into, as in the scanner
+        return node.is_dir and not node.is_link and node.path in self.expanded
+    
+    def _append_subtree(self, node: TreeNode, depth: int, rows: List[TreeRow]):
+        """Append a node's row and the rows of its expanded descendants."""
+        stack = [(node, depth)]
+        while stack:
+            current, level = stack.pop()
+            rows.append(TreeRow(current, level))
+            if self._is_open(current):
+                stack.extend(
+                    (child, level + 1) for child in reversed(self._children(current))
+                )
+    
+    def _subtree_end(self, index: int) -> int:
+        """Get the index just past a row's visible descendants."""
+        depth = self.rows[index].depth
+        end = index + 1
+        while end < len(self.rows) and self.rows[end].depth > depth:
+            end += 1
+        return end
+    
+    def toggle_expanded(self, index: int) -> bool:
+        """
+        Expand or collapse the directory at a row.
+        
+        Args:
+            index: Row index
+        
+        Returns:
+            True if the rows changed
+        """
+        row = self.rows[index]
+        node = row.node
+        if not node.is_dir or node.is_link:
+            return False
+        
+        if node.path in self.expanded:
+            self.expanded.discard(node.path)
+            del self.rows[index + 1:self._subtree_end(index)]
+        else:
+            self.expanded.add(node.path)
+            rows: List[TreeRow] = []
+            self._append_subtree(node, row.depth, rows)
+            self.rows[index:index + 1] = rows
+        return True
+    
+    def _iter_files(self, node: TreeNode) -> Iterator[TreeNode]:
+        """Iterate over the files below a node, listing directories as needed."""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if not current.is_dir:
+                yield current
+            elif not current.is_link:
+                stack.extend(reversed(self._children(current)))
+    
+    def toggle_checked(self, index: int):
+        """
+        Check or uncheck the file at a row, or every file below a directory.
+        
+        Args:
+            index: Row index
+        """
+        node = self.rows[index].node
+        if not node.is_dir:
+            if node.path in self.checked:
+                self.checked.discard(node.path)
+            else:
+                self.checked.add(node.path)
+            return
+        
+        paths = {f.path for f in self._iter_files(node)}
+        if node.path in self.checked_dirs:
+            self.checked_dirs.discard(node.path)
+            self.checked -= paths
+        else:
+            self.checked_dirs.add(node.path)
+            self.checked |= paths
+    
+    def is_checked(self, node: TreeNode) -> bool:
+        """Check if a file, or a whole directory, is checked."""
+        return node.path in (self.checked_dirs if node.is_dir else self.checked)
+    
+    def checked_files(self) -> List[str]:
+        """Get the paths of checked files in a stable order."""
+        return sorted(self.checked)
+    
+    def clear_checked(self):
+        """Uncheck everything."""
+        self.checked.clear()
+        self.checked_dirs.clear()
+    
+    def check_column(self, row: TreeRow) -> int:
+        """Get the character column where a row's check box starts."""
+        return row.depth * self.INDENT + self.MARKER_WIDTH
+    
+    def hit(self, index: int, column: int) -> str:
+        """
+        Map a click to an action.
+        
+        Args:
+            index: Row index
+            column: Character column of the click
+        
+        Returns:
+            "check" for a file or a directory's check box, "expand" for the
+            rest of a directory row, "" when nothing applies
+        """
+        if not 0 <= index < len(self.rows):
+            return ""
+        
+        row = self.rows[index]
+        if not row.node.is_dir:
+            return "check"
+        start = self.check_column(row)
+        if start <= column < start + self.CHECK_WIDTH:
+            return "check"
+        return "expand"
+    
+    def format_row(self, row: TreeRow) -> str:
+        """Render the text of one row."""
+        node = row.node
+        indent = " " * (row.depth * self.INDENT)
+        check = "[x] " if self.is_checked(node) else "[ ] "
+        if not node.is_dir:
+            return f"{indent}  {check}📄 {node.name} ({format_size(node.size)})"
+        
+        if node.is_link:
+            marker = "  "
+        else:
+            marker = "- " if node.path in self.expanded else "+ "
+        icon = "📂" if row.depth == 0 else "📁"
+        return f"{indent}{marker}{check}{icon} {node.name}"
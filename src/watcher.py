@@ -0,0 +1,377 @@
+"""Filesystem watching with inotify and a polling fallback."""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+from .models import ChangeBatch
+from .config import config
+
+
+class FileWatcher(ABC):
+    """
+    Base class for watchers delivering debounced change batches.
+    
+    Backends report raw changes through _record(). A batch is handed to the
+    callback once no new change arrived for the debounce interval, or once
+    changes have been pending for the maximum latency. The callback runs on
+    the watcher thread; UI code should marshal it with root.after().
+    """
+    
+    def __init__(
+        self,
+        root: str,
+        on_batch: Callable[[ChangeBatch], None],
+        debounce_ms: Optional[int] = None
+    ):
+        """
+        Initialize the watcher.
+        
+        Args:
+            root: Project directory to watch
+            on_batch: Callback receiving each ChangeBatch
+            debounce_ms: Quiet period before delivering (default from config)
+        """
+        self.root = root
+        self.on_batch = on_batch
+        self.debounce = (debounce_ms or config.WATCH_DEBOUNCE_MS) / 1000
+        self.max_latency = max(self.debounce * 4, 1.0)
+        
+        self._files: Set[str] = set()
+        self._pending = ChangeBatch()
+        self._first_change = 0.0
+        self._last_change = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Start watching in a background thread."""
+        if self._thread is not None:
+            return
+        self._setup()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop watching and release backend resources."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        self._teardown()
+    
+    def set_files(self, paths: Iterable[str]):
+        """Set files whose content changes must be reported explicitly."""
+        with self._lock:
+            self._files = {os.path.normpath(p) for p in paths}
+    
+    def is_running(self) -> bool:
+        """Check if the watcher thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def _record(self, dirs: Iterable[str] = (), files: Iterable[str] = (), overflow: bool = False):
+        """Add raw changes to the pending batch."""
+        now = time.monotonic()
+        with self._lock:
+            if self._pending.is_empty():
+                self._first_change = now
+            self._pending.dirs.update(dirs)
+            self._pending.files.update(files)
+            self._pending.overflow = self._pending.overflow or overflow
+            self._last_change = now
+    
+    def _flush(self):
+        """Deliver the pending batch if it has settled."""
+        now = time.monotonic()
+        with self._lock:
+            if self._pending.is_empty():
+                return
+            quiet = now - self._last_change >= self.debounce
+            overdue = now - self._first_change >= self.max_latency
+            if not (quiet or overdue):
+                return
+            batch, self._pending = self._pending, ChangeBatch()
+        
+        self.on_batch(batch)
+    
+    def _run(self):
+        """Watcher thread loop."""
+        timeout = min(self.debounce, 0.1)
+        while not self._stop.is_set():
+            self._poll(timeout)
+            self._flush()
+    
+    def _iter_dirs(self, top: str) -> Iterable[str]:
+        """Iterate over watchable directories below top, including top."""
+        stack = [top]
+        while stack:
+            path = stack.pop()
+            yield path
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        if (entry.name not in config.IGNORE_DIRS
+                                and entry.is_dir(follow_symlinks=False)):
+                            stack.append(entry.path)
+            except OSError:
+                continue
+    
+    def _setup(self):
+        """Prepare backend resources."""
+    
+    def _teardown(self):
+        """Release backend resources."""
+    
+    @abstractmethod
+    def _poll(self, timeout: float):
+        """Wait up to timeout seconds for raw changes."""
+
+
+class InotifyWatcher(FileWatcher):
+    """Linux watcher using inotify through ctypes."""
+    
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    
+    WATCH_MASK = (
+        IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+        | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+    )
+    STRUCTURE_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+    EVENT_HEADER = struct.Struct("iIII")
+    
+    _libc = None
+    
+    @classmethod
+    def available(cls) -> bool:
+        """Check if inotify can be used on this platform."""
+        if not sys.platform.startswith("linux"):
+            return False
+        if cls._libc is None:
+            try:
+                libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+                libc.inotify_init1, libc.inotify_add_watch, libc.inotify_rm_watch
+            except (OSError, AttributeError):
+                return False
+            libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            cls._libc = libc
+        return True
+    
+    def __init__(self, *args, **kwargs):
+        """Initialize the inotify watcher."""
+        super().__init__(*args, **kwargs)
+        self._fd = -1
+        self._watches: Dict[int, str] = {}
+    
+    def _setup(self):
+        """Create the inotify instance and watch every project directory."""
+        if not self.available():
+            raise OSError("inotify is not available")
+        
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        
+        try:
+            self._add_tree(self.root)
+        except OSError:
+            self._teardown()
+            raise
+    
+    def _teardown(self):
+        """Close the inotify instance."""
+        if self._fd >= 0:
+            os.close(self._fd)
+        self._fd = -1
+        self._watches.clear()
+    
+    def _add_tree(self, top: str):
+        """Add watches for a directory and its subdirectories."""
+        for path in self._iter_dirs(top):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), self.WATCH_MASK)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                # Out of watches (ENOSPC) or the project root itself failed
+                if errno == 28 or path == self.root:
+                    raise OSError(errno, f"inotify_add_watch failed for {path}")
+                continue
+            self._watches[wd] = path
+    
+    def _poll(self, timeout: float):
+        """Read and translate pending inotify events."""
+        try:
+            ready, _, _ = select.select([self._fd], [], [], timeout)
+        except (OSError, ValueError):
+            self._stop.wait(timeout)
+            return
+        if not ready:
+            return
+        
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        
+        dirs, files, new_dirs = set(), set(), []
+        overflow = False
+        offset = 0
+        header = self.EVENT_HEADER
+        while offset + header.size <= len(data):
+            wd, mask, _, length = header.unpack_from(data, offset)
+            raw_name = data[offset + header.size:offset + header.size + length]
+            offset += header.size + length
+            
+            if mask & self.IN_Q_OVERFLOW:
+                overflow = True
+                continue
+            
+            parent = self._watches.get(wd)
+            if mask & self.IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            if parent is None:
+                continue
+            
+            name = os.fsdecode(raw_name.rstrip(b"\0"))
+            if not name:
+                if mask & (self.IN_DELETE_SELF | self.IN_MOVE_SELF):
+                    dirs.add(os.path.dirname(parent))
+                continue
+            if name in config.IGNORE_DIRS:
+                continue
+            
+            path = os.path.join(parent, name)
+            if mask & self.STRUCTURE_MASK:
+                dirs.add(parent)
+                if mask & self.IN_ISDIR and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    new_dirs.append(path)
+            elif not mask & self.IN_ISDIR:
+                files.add(path)
+        
+        for path in new_dirs:
+            try:
+                self._add_tree(path)
+            except OSError:
+                overflow = True
+        
+        if dirs or files or overflow:
+            self._record(dirs, files, overflow)
+
+
+class PollingWatcher(FileWatcher):
+    """Portable watcher comparing directory and file stat data periodically."""
+    
+    def __init__(self, *args, interval_ms: Optional[int] = None, **kwargs):
+        """
+        Initialize the polling watcher.
+        
+        Args:
+            interval_ms: Time between polls (default from config)
+        """
+        super().__init__(*args, **kwargs)
+        self.interval = (interval_ms or config.WATCH_POLL_INTERVAL_MS) / 1000
+        self._dir_state: Dict[str, Tuple[int, int]] = {}
+        self._file_state: Dict[str, Tuple[int, int]] = {}
+    
+    def _setup(self):
+        """Take the initial snapshot."""
+        self._dir_state = self._snapshot_dirs()
+        self._file_state = self._snapshot_files()
+    
+    def _snapshot_dirs(self) -> Dict[str, Tuple[int, int]]:
+        """Stat every watchable directory."""
+        state = {}
+        for path in self._iter_dirs(self.root):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            state[path] = (st.st_mtime_ns, st.st_ino)
+        return state
+    
+    def _snapshot_files(self) -> Dict[str, Tuple[int, int]]:
+        """Stat every explicitly watched file."""
+        with self._lock:
+            files = list(self._files)
+        state = {}
+        for path in files:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            state[path] = (st.st_mtime_ns, st.st_size)
+        return state
+    
+    def _poll(self, timeout: float):
+        """Compare a fresh snapshot against the previous one."""
+        if self._stop.wait(self.interval):
+            return
+        
+        dir_state = self._snapshot_dirs()
+        file_state = self._snapshot_files()
+        
+        dirs = {
+            p for p, s in dir_state.items()
+            if p in self._dir_state and self._dir_state[p] != s
+        }
+        # Added and removed directories are picked up by relisting the parent
+        dirs.update(os.path.dirname(p) for p in dir_state.keys() ^ self._dir_state.keys())
+        files = {
+            p for p, s in file_state.items()
+            if p in self._file_state and self._file_state[p] != s
+        }
+        
+        self._dir_state = dir_state
+        self._file_state = file_state
+        if dirs or files:
+            self._record(dirs, files)
+
+
+def create_watcher(
+    root: str,
+    on_batch: Callable[[ChangeBatch], None],
+    debounce_ms: Optional[int] = None
+) -> FileWatcher:
+    """
+    Create and start the best available watcher for this platform.
+    
+    Args:
+        root: Project directory to watch
+        on_batch: Callback receiving each ChangeBatch
+        debounce_ms: Quiet period before delivering (default from config)
+    
+    Returns:
+        A running InotifyWatcher on Linux, or a running PollingWatcher
+    """
+    if InotifyWatcher.available():
+        watcher = InotifyWatcher(root, on_batch, debounce_ms)
+        try:
+            watcher.start()
+            return watcher
+        except OSError:
+            pass
+    
+    watcher = PollingWatcher(root, on_batch, debounce_ms)
+    watcher.start()
+    return watcher